@@ -150,6 +150,20 @@
             files = "^(tasks\\.py|tests/test_tasks\\.py)$";
             pass_filenames = false;
           };
+          pytest-oci-publish = {
+            enable = true;
+            name = "pytest-oci-publish";
+            entry = "${pkgs.lib.getExe' python-env "pytest"} -q tests/test_oci_publish.py";
+            files = "^(pkgs/oci-publish/src/.*\\.py|tests/(test_oci_publish|oci_registry_stub)\\.py)$";
+            pass_filenames = false;
+          };
+          pytest-nethsm-exporter = {
+            enable = true;
+            name = "pytest-nethsm-exporter";
+            entry = "${pkgs.lib.getExe' python-env "pytest"} -q tests/test_nethsm_exporter.py";
+            files = "^(pkgs/nethsm-exporter/src/.*\\.py|tests/test_nethsm_exporter\\.py)$";
+            pass_filenames = false;
+          };
           # github actions linter
           actionlint.enable = true;
           # python linter
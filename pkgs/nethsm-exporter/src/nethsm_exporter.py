@@ -9,9 +9,14 @@ import argparse
 import os
 import re
 import sys
+import threading
 import time
-from dataclasses import dataclass
-from typing import cast, final, override
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field, replace
+from typing import Any, Literal, NamedTuple, cast, final, override
+from urllib.parse import parse_qs
+from wsgiref.simple_server import WSGIRequestHandler, make_server
 
 import requests
 import urllib3
@@ -21,102 +26,478 @@ from prometheus_client import (
     PLATFORM_COLLECTOR,
     PROCESS_COLLECTOR,
     REGISTRY,
-    start_http_server,
+    CollectorRegistry,
+    Metric,
+    make_wsgi_app,
 )
-from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.core import (
+    CounterMetricFamily,
+    GaugeMetricFamily,
+    InfoMetricFamily,
+)
+from prometheus_client.exposition import ThreadingWSGIServer
 from prometheus_client.registry import Collector
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
+from urllib3.util.retry import Retry
 
 # Suppress SSL warnings
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+DEFAULT_POLL_INTERVAL = 15.0
+FETCH_TIMEOUT = 5
+
+
+SEPARATOR_PATTERN = re.compile(r"[ .]")
+INVALID_PATTERN = re.compile(r"[^a-z0-9_]")
+
+
+@dataclass(frozen=True)
+class MetricRule:
+    """Maps the NetHSM metrics keys matching `pattern` into one family
+
+    The `label` group of the pattern, if any, becomes the value of the
+    `label` label. Info families fold every matching key into one series
+    labelled by the key.
+    """
+
+    pattern: str
+    name: str
+    kind: Literal["counter", "gauge", "info"]
+    documentation: str
+    label: str | None = None
+
+
+METRIC_RULES = (
+    MetricRule(
+        r"http response (?P<label>\d+)",
+        "nethsm_http_response",
+        "counter",
+        "HTTP responses by status code",
+        "code",
+    ),
+    MetricRule(
+        r"gc (?P<label>minor|major) collections",
+        "nethsm_gc_collections",
+        "counter",
+        "Garbage collections by heap generation",
+        "generation",
+    ),
+    MetricRule(
+        r"gc (?P<label>minor|promoted|major) words",
+        "nethsm_gc_allocated_words",
+        "counter",
+        "Words allocated by heap generation",
+        "generation",
+    ),
+    MetricRule(
+        r"gc compactions",
+        "nethsm_gc_compactions",
+        "counter",
+        "Heap compactions",
+    ),
+    MetricRule(
+        r"kv (?P<label>read|write|delete|list)",
+        "nethsm_kv_operations",
+        "counter",
+        "Key-value store operations by type",
+        "operation",
+    ),
+    MetricRule(
+        r"log (?P<label>errors|warnings)",
+        "nethsm_log_messages",
+        "counter",
+        "Log messages by level",
+        "level",
+    ),
+    MetricRule(
+        r"system state|(software|firmware) version",
+        "nethsm_system",
+        "info",
+        "NetHSM state and versions",
+    ),
+)
+
+
+class Translation(NamedTuple):
+    """Prometheus metric a NetHSM metrics key is exported as"""
+
+    name: str
+    kind: str
+    documentation: str
+    label_name: str | None = None
+    label: str | None = None
+
 
 def sanitize_metric_name(name: str) -> str:
     """Turn metric name into format that prometheus excepts"""
-    name = name.lower()
-    name = re.sub(r"[ .]", "_", name)
-    name = re.sub(r"[^a-z0-9_]", "", name)
-    return f"nethsm_{name}"
+    name = SEPARATOR_PATTERN.sub("_", name.lower())
+    return f"nethsm_{INVALID_PATTERN.sub('', name)}"
+
+
+FAMILY_TYPES = {"counter": CounterMetricFamily, "gauge": GaugeMetricFamily}
+
+
+def translate(key: str, value: str) -> Translation | None:
+    """Translate a NetHSM metrics key, or None if it cannot be exported
+
+    Keys no rule matches are exported as gauges of their own.
+    """
+    for rule in METRIC_RULES:
+        if match := re.fullmatch(rule.pattern, key):
+            break
+    else:
+        rule, match = None, None
+    if rule is not None and rule.kind == "info":
+        label_name = sanitize_metric_name(key).removeprefix("nethsm_")
+        return Translation(rule.name, rule.kind, rule.documentation, label_name)
+    try:
+        _ = float(value)
+    except ValueError:
+        return None
+    if rule is None or match is None:
+        return Translation(sanitize_metric_name(key), "gauge", key)
+    if rule.label is None:
+        return Translation(rule.name, rule.kind, rule.documentation)
+    return Translation(
+        rule.name, rule.kind, rule.documentation, rule.label, match["label"]
+    )
+
+
+@final
+class CountingHTTPSConnectionPool(urllib3.HTTPSConnectionPool):
+    """HTTPS connection pool counting the connections it opens
+
+    urllib3 reopens a dropped pooled connection in place, so its own
+    `num_connections` only counts connection objects, not handshakes.
+    """
+
+    def __init__(self, host: str, port: int | None = None, **kwargs: Any):
+        super().__init__(host, port, **kwargs)
+        self.num_connects = 0
+
+    @override
+    def _get_conn(self, timeout: float | None = None) -> Any:
+        conn = super()._get_conn(timeout)
+        if getattr(conn, "sock", None) is None:
+            self.num_connects += 1
+        return conn
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """Latest metrics fetched from the NetHSM"""
+
+    data: dict[str, str] | None = None
+    up: bool = False
+    success_time: float = 0.0
+    attempt_time: float = 0.0
 
 
 @final
-class HSMCollector(Collector):  # pylint: disable=too-few-public-methods
-    """Custom prometheus collector"""
+class HSMCollector(Collector):  # pylint: disable=too-many-instance-attributes
+    """Custom prometheus collector
+
+    A background poller fetches the NetHSM metrics every `interval` seconds
+    and scrapes are served from the latest snapshot, so the load on the HSM
+    does not grow with the number of Prometheus replicas. With an interval
+    of 0 every scrape fetches, and concurrent scrapes share one fetch.
+
+    Fetches share one keep-alive session, so the HSM only pays for a TLS
+    handshake when the connection was lost.
+    """
 
-    def __init__(self, host: str, username: str, password: str):
+    def __init__(
+        self,
+        host: str,
+        username: str,
+        password: str,
+        interval: float = DEFAULT_POLL_INTERVAL,
+        timeout: float = FETCH_TIMEOUT,
+    ):
         self.host = host
         self.username = username
         self.password = password
+        self.interval = interval
+        self.timeout = timeout
+        self.snapshot = Snapshot()
+        self.session = requests.Session()
+        self.session.auth = HTTPBasicAuth(username, password)
+        # A kept-alive connection the HSM closed is retried once on a new one.
+        self._adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=1,
+            max_retries=Retry(total=1, connect=1, read=1, status=0),
+        )
+        self._adapter.poolmanager.pool_classes_by_scheme = {
+            **self._adapter.poolmanager.pool_classes_by_scheme,
+            "https": CountingHTTPSConnectionPool,
+        }
+        self.session.mount("https://", self._adapter)
+        self._closed_connections = (0, 0)
+        self.translations: dict[str, Translation | None] = {}
+        self._lock = threading.Lock()
+        self._in_flight: threading.Event | None = None
+        self._stop = threading.Event()
 
-    @override
-    def collect(self):
-        """This gets run on GET /metrics"""
+    def fetch(self) -> dict[str, str]:
+        """Fetch the raw metrics from the NetHSM"""
+        logger.info(f"Collecting metrics from {self.host}...")
         try:
-            logger.info(f"Collecting metrics from {self.host}...")
-            response = requests.get(
+            # verify per request: a session default loses to REQUESTS_CA_BUNDLE
+            response = self.session.get(
                 f"https://{self.host}/api/v1/metrics",
-                auth=HTTPBasicAuth(self.username, self.password),
                 verify=False,
-                timeout=5,
+                timeout=self.timeout,
             )
-
             response.raise_for_status()
-            data = cast(dict[str, str], response.json())
+            return cast(dict[str, str], response.json())
+        except requests.exceptions.ConnectionError:
+            # Drop the pooled connection so the next fetch starts afresh.
+            self._closed_connections = self.connections()
+            self._adapter.close()
+            raise
+
+    def connections(self) -> tuple[int, int]:
+        """Connections opened and requests sent over the session so far"""
+        opened, sent = self._closed_connections
+        pools = self._adapter.poolmanager.pools
+        for key in pools.keys():
+            if pool := pools.get(key):
+                opened += cast(CountingHTTPSConnectionPool, pool).num_connects
+                sent += pool.num_requests
+        return opened, sent
+
+    def refresh(self) -> Snapshot:
+        """Fetch a new snapshot, joining a fetch that is already in flight"""
+        with self._lock:
+            in_flight = self._in_flight
+            leader = in_flight is None
+            if in_flight is None:
+                in_flight = self._in_flight = threading.Event()
+        if not leader:
+            _ = in_flight.wait()
+            return self.snapshot
+
+        now = time.time()
+        try:
+            self.snapshot = Snapshot(self.fetch(), True, now, now)
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.error(f"Error collecting metrics: {e}")
+            self.snapshot = replace(self.snapshot, up=False, attempt_time=now)
+        finally:
+            with self._lock:
+                self._in_flight = None
+            in_flight.set()
+        return self.snapshot
+
+    def start(self) -> None:
+        """Start polling the NetHSM in a background thread"""
+        threading.Thread(
+            target=self._poll, name=f"nethsm-poller-{self.host}", daemon=True
+        ).start()
 
-            # Mark scrape as successful
-            yield GaugeMetricFamily(
-                "nethsm_up",
-                "Whether scraping NetHSM was successful",
-                value=1,
+    def stop(self) -> None:
+        """Stop the background poller"""
+        self._stop.set()
+
+    def _poll(self) -> None:
+        while not self._stop.is_set():
+            _ = self.refresh()
+            _ = self._stop.wait(self.interval)
+
+    def describe(self):
+        """Skip the fetch prometheus_client would run to learn metric names"""
+        return []
+
+    @property
+    def fetching(self) -> bool:
+        """Whether a fetch from the NetHSM is in flight"""
+        return self._in_flight is not None
+
+    @override
+    def collect(self):
+        """This gets run on GET /metrics"""
+        snapshot = self.snapshot
+        if self.interval <= 0 or not snapshot.attempt_time:
+            snapshot = self.refresh()
+        yield from self.families(snapshot)
+
+    def families(self, snapshot: Snapshot) -> Iterator[Metric]:
+        """Metric families for a snapshot"""
+        # Whether the latest fetch was successful
+        yield GaugeMetricFamily(
+            "nethsm_up",
+            "Whether scraping NetHSM was successful",
+            value=1 if snapshot.up else 0,
+        )
+
+        opened, sent = self.connections()
+        connections = CounterMetricFamily(
+            "nethsm_exporter_connections",
+            "Requests to the NetHSM by whether they opened a new connection",
+            labels=["state"],
+        )
+        connections.add_metric(["new"], opened)
+        connections.add_metric(["reused"], max(0, sent - opened))
+        yield connections
+        if not snapshot.success_time:
+            return
+
+        yield GaugeMetricFamily(
+            "nethsm_last_success_timestamp",
+            "Unix time of the last successful NetHSM fetch",
+            value=snapshot.success_time,
+        )
+        yield GaugeMetricFamily(
+            "nethsm_snapshot_age_seconds",
+            "Seconds since the served NetHSM metrics were fetched",
+            value=time.time() - snapshot.success_time,
+        )
+
+        yield from self.mapped_families(snapshot.data or {})
+
+    def mapped_families(self, data: dict[str, str]) -> Iterator[Metric]:
+        """Metric families of the NetHSM metrics keys, per METRIC_RULES"""
+        translations = self.translations
+        if not data.keys() <= translations.keys():
+            # The key set is stable: only new firmware adds keys.
+            translations = self.translations = translations | {
+                key: translate(key, value)
+                for key, value in data.items()
+                if key not in translations
+            }
+
+        # One pass over the keys fills every family, which are then emitted.
+        families: dict[str, Metric] = {}
+        info: dict[tuple[str, str], dict[str, str]] = {}
+        for key, value in data.items():
+            if (translation := translations[key]) is None:
+                continue
+            if translation.kind == "info":
+                family_key = (translation.name, translation.documentation)
+                labels = info.setdefault(family_key, {})
+                labels[cast(str, translation.label_name)] = value
+                continue
+            try:
+                metric_value = float(value)
+            except ValueError:
+                continue
+
+            if (family := families.get(translation.name)) is None:
+                family = families[translation.name] = FAMILY_TYPES[translation.kind](
+                    translation.name,
+                    translation.documentation,
+                    labels=[translation.label_name] if translation.label_name else [],
+                )
+            family.add_metric(
+                [translation.label] if translation.label is not None else [],
+                metric_value,
             )
 
-            http_response_family = GaugeMetricFamily(
-                "nethsm_http_response",
-                "HTTP responses by status code",
-                labels=["code"],
+        yield from families.values()
+        for (name, documentation), labels in info.items():
+            yield InfoMetricFamily(name, documentation, labels)
+
+
+@final
+class MultiHSMCollector(Collector):
+    """Collector for several NetHSMs, labelled by `instance`
+
+    Each scrape collects every HSM concurrently and waits at most
+    `timeout` seconds for each. An HSM that is slower than that is reported
+    down with its last snapshot instead of delaying the others. Polled HSMs
+    keep serving their snapshot while the poller fetches; without a poller,
+    or before its first snapshot, an HSM whose fetch is still hanging is
+    reported down right away.
+    """
+
+    def __init__(self, collectors: list[HSMCollector], timeout: float = FETCH_TIMEOUT):
+        self.collectors = collectors
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=len(collectors), thread_name_prefix="nethsm-collect"
+        )
+
+    def describe(self):
+        """Skip the fetch prometheus_client would run to learn metric names"""
+        return []
+
+    @override
+    def collect(self):
+        """Merge the metric families of every HSM"""
+        pending = {
+            collector: self._executor.submit(list, collector.collect())
+            for collector in self.collectors
+            if not (
+                collector.fetching
+                and (collector.interval <= 0 or not collector.snapshot.attempt_time)
             )
+        }
+        _ = wait(pending.values(), timeout=self.timeout)
 
-            for key, value in data.items():
-                try:
-                    metric_value = float(value)
-                except ValueError:
-                    continue
-
-                if (
-                    key.startswith("http response ")
-                    and (code := key.split(" ")[-1]).isdigit()
-                ):
-                    http_response_family.add_metric([code], metric_value)
-                else:
-                    metric_name = sanitize_metric_name(key)
-                    yield GaugeMetricFamily(
-                        metric_name,
-                        key,
-                        value=metric_value,
+        merged: dict[str, Metric] = {}
+        for collector in self.collectors:
+            future = pending.get(collector)
+            if future is not None and future.done() and not future.exception():
+                families = future.result()
+            else:
+                logger.error(f"Timed out collecting metrics from {collector.host}")
+                families = collector.families(replace(collector.snapshot, up=False))
+            for family in families:
+                target = merged.setdefault(
+                    family.name,
+                    Metric(family.name, family.documentation, family.type),
+                )
+                target.samples += [
+                    sample._replace(
+                        labels={**sample.labels, "instance": collector.host}
                     )
+                    for sample in family.samples
+                ]
+        yield from merged.values()
 
-            if http_response_family.samples:
-                yield http_response_family
 
-        except (
-            requests.exceptions.HTTPError,
-            requests.exceptions.ConnectionError,
-        ) as e:
-            logger.error(f"Error collecting metrics: {e}")
+def make_app(collectors: dict[str, HSMCollector]) -> Callable[..., Iterable[bytes]]:
+    """WSGI app serving /metrics and /probe?target=<host>
+
+    Only configured hosts can be probed, so the credentials are never sent
+    to an arbitrary target.
+    """
+    metrics_app = make_wsgi_app(REGISTRY)
+
+    def app(
+        environ: dict[str, Any], start_response: Callable[..., Any]
+    ) -> Iterable[bytes]:
+        if environ.get("PATH_INFO") != "/probe":
+            return cast(Iterable[bytes], metrics_app(environ, start_response))
+        target = parse_qs(environ.get("QUERY_STRING", "")).get("target", [""])[0]
+        if target not in collectors:
+            start_response("400 Bad Request", [("Content-Type", "text/plain")])
+            return [f"Unknown target: {target!r}\n".encode()]
+        registry = CollectorRegistry()
+        registry.register(collectors[target])
+        return cast(Iterable[bytes], make_wsgi_app(registry)(environ, start_response))
+
+    return app
 
-            yield GaugeMetricFamily(
-                "nethsm_up",
-                "Whether scraping NetHSM was successful",
-                value=0,
-            )
+
+class QuietHandler(WSGIRequestHandler):
+    """Request handler that does not log every scrape"""
+
+    @override
+    def log_message(self, format: str, *_args: Any) -> None:
+        return
 
 
 @dataclass
 class Args(argparse.Namespace):
     """Argument namespace for type checking"""
 
-    hsm_host: str = ""
+    hsm_host: list[str] = field(default_factory=list)
     port: int = 8000
+    poll_interval: float = DEFAULT_POLL_INTERVAL
+    fetch_timeout: float = FETCH_TIMEOUT
 
 
 if __name__ == "__main__":
@@ -124,7 +505,9 @@ if __name__ == "__main__":
     _ = parser.add_argument(
         "--hsm-host",
         required=True,
-        help="NetHSM hostname",
+        action="extend",
+        nargs="+",
+        help="NetHSM hostname; several hosts are labelled by instance",
     )
     _ = parser.add_argument(
         "--port",
@@ -132,6 +515,18 @@ if __name__ == "__main__":
         default=8000,
         help="Port to expose Prometheus metrics on",
     )
+    _ = parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=DEFAULT_POLL_INTERVAL,
+        help="Seconds between NetHSM fetches; 0 fetches on every scrape",
+    )
+    _ = parser.add_argument(
+        "--fetch-timeout",
+        type=float,
+        default=FETCH_TIMEOUT,
+        help="Seconds to wait for each NetHSM",
+    )
     args = parser.parse_args(namespace=Args)
 
     nethsm_username: str | None = os.getenv("NETHSM_USER")
@@ -148,11 +543,32 @@ if __name__ == "__main__":
     REGISTRY.unregister(PLATFORM_COLLECTOR)
     REGISTRY.unregister(PROCESS_COLLECTOR)
 
-    # add our custom collector
-    REGISTRY.register(HSMCollector(args.hsm_host, nethsm_username, nethsm_password))
+    # add our custom collectors
+    hsm_collectors = {
+        host: HSMCollector(
+            host,
+            nethsm_username,
+            nethsm_password,
+            args.poll_interval,
+            args.fetch_timeout,
+        )
+        for host in dict.fromkeys(args.hsm_host)
+    }
+    if len(hsm_collectors) == 1:
+        REGISTRY.register(next(iter(hsm_collectors.values())))
+    else:
+        REGISTRY.register(
+            MultiHSMCollector(list(hsm_collectors.values()), args.fetch_timeout)
+        )
+    if args.poll_interval > 0:
+        for hsm_collector in hsm_collectors.values():
+            hsm_collector.start()
 
-    _ = start_http_server(args.port)
-    logger.info("Prometheus exporter running on :8000/metrics")
+    server = make_server(
+        "", args.port, make_app(hsm_collectors), ThreadingWSGIServer, QuietHandler
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logger.info(f"Prometheus exporter running on :{args.port}/metrics and /probe")
 
     try:
         # keep alive
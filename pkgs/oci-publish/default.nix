@@ -3,8 +3,10 @@
 {
   lib,
   makeWrapper,
+  openssl,
   oras,
   python3Packages,
+  zstd,
   ...
 }:
 python3Packages.buildPythonApplication rec {
@@ -25,7 +27,13 @@ python3Packages.buildPythonApplication rec {
 
   postFixup = ''
     wrapProgram "$out/bin/${pname}" \
-      --prefix PATH : "${lib.makeBinPath [ oras ]}"
+      --prefix PATH : "${
+        lib.makeBinPath [
+          openssl
+          oras
+          zstd
+        ]
+      }"
   '';
 
   meta.mainProgram = pname;
@@ -3,22 +3,54 @@
 # SPDX-FileCopyrightText: 2026 TII (SSRC) and the Ghaf contributors
 # SPDX-License-Identifier: Apache-2.0
 
-# pylint: disable=too-many-locals, too-many-arguments
+# pylint: disable=too-many-locals, too-many-arguments, too-many-lines
 
 """Publish Ghaf OCI target artifacts."""
 
 import argparse
-from collections.abc import Iterator
-from contextlib import contextmanager
+import base64
+from collections.abc import Callable, Iterator
+from concurrent.futures import (
+    FIRST_EXCEPTION,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+from contextlib import AbstractContextManager, ExitStack, contextmanager, nullcontext
+from dataclasses import dataclass, field, replace
+from email.message import Message
+from email.utils import parsedate_to_datetime
+import fcntl
+from functools import cached_property
+import glob
+import gzip
+import hashlib
+import hmac
+import http.client
 import json
+import multiprocessing
 import os
+import queue
+import random
 import re
+import shutil
+import signal
+import socket
+import socketserver
+import ssl
 import subprocess
 import sys
 import tarfile
 import tempfile
+import threading
+import time
 from pathlib import Path
-from typing import Any, NoReturn
+from typing import Any, BinaryIO, NoReturn, Protocol
+from urllib.parse import urlencode, urlsplit
+import uuid
+import weakref
+import zlib
 
 
 DETACHED_SIGNATURE_MEDIA_TYPE = "application/vnd.ghaf.signature.v1"
@@ -26,11 +58,24 @@ TARGET_ARTIFACT_TYPE = "application/vnd.ghaf.image.v1"
 TARGET_CONFIG_MEDIA_TYPE = "application/vnd.ghaf.manifest.v1+json"
 TEST_RESULTS_ARTIFACT_TYPE = "application/vnd.ghaf.test-results.v1"
 TEST_RESULTS_MEDIA_TYPE = "application/x-tar"
+TEST_RESULTS_GZIP_MEDIA_TYPE = "application/vnd.oci.image.layer.v1.tar+gzip"
+TEST_RESULTS_ZSTD_MEDIA_TYPE = "application/vnd.oci.image.layer.v1.tar+zstd"
+# codec -> (layer media type, layer title, default level, maximum level)
+TEST_RESULTS_CODECS: dict[str, tuple[str, str, int, int]] = {
+    "none": (TEST_RESULTS_MEDIA_TYPE, "test-results.tar", 0, 0),
+    "gzip": (TEST_RESULTS_GZIP_MEDIA_TYPE, "test-results.tar.gz", 6, 9),
+    "zstd": (TEST_RESULTS_ZSTD_MEDIA_TYPE, "test-results.tar.zst", 3, 19),
+}
 RELEASE_ATTESTATION_ARTIFACT_TYPE = "application/vnd.ghaf.release-attestation.v1+json"
 SYSUPDATE_MANIFEST_MEDIA_TYPE = "application/vnd.ghaf.ota.manifest.v1+json"
 SYSUPDATE_KERNEL_MEDIA_TYPE = "application/vnd.ghaf.ota.uki.v1+efi"
 SYSUPDATE_ROOT_MEDIA_TYPE = "application/vnd.ghaf.ota.root.v1+raw"
 SYSUPDATE_VERITY_MEDIA_TYPE = "application/vnd.ghaf.ota.verity.v1+raw"
+SYSUPDATE_ROOT_INDEX_MEDIA_TYPE = "application/vnd.ghaf.ota.root.chunks.v1+json"
+SYSUPDATE_ROOT_CHUNK_MEDIA_TYPE = "application/vnd.ghaf.ota.root.chunk.v1"
+# Content-defined chunking of root images only cuts at filesystem block
+# boundaries; see chunk_file().
+ROOT_CHUNK_BLOCK_SIZE = 4096
 SYSUPDATE_MEDIA_TYPES = {
     "root": SYSUPDATE_ROOT_MEDIA_TYPE,
     "verity": SYSUPDATE_VERITY_MEDIA_TYPE,
@@ -50,15 +95,128 @@ REFERRER_DESCRIPTIONS = {
     "sbom_spdx": "SPDX SBOM",
     "sbom_csv": "CSV SBOM",
 }
+ATTESTATION_ROLES = ("provenance", "sbom_cyclonedx", "sbom_spdx", "sbom_csv")
+DEFAULT_REFERRER_WORKERS = len(ATTESTATION_ROLES)
 REPOSITORY_COMPONENT_PATTERN = re.compile(r"^[a-z0-9]+(?:(?:[._]|__|-+)[a-z0-9]+)*$")
 SOURCE_REF_ANNOTATION = "org.ghaf.source.ref"
 TARGET_ANNOTATION = "org.ghaf.target"
+OCI_MANIFEST_MEDIA_TYPE = "application/vnd.oci.image.manifest.v1+json"
+OCI_INDEX_MEDIA_TYPE = "application/vnd.oci.image.index.v1+json"
+OCI_EMPTY_MEDIA_TYPE = "application/vnd.oci.empty.v1+json"
+MANIFEST_ACCEPT = ", ".join(
+    (
+        OCI_MANIFEST_MEDIA_TYPE,
+        OCI_INDEX_MEDIA_TYPE,
+        "application/vnd.docker.distribution.manifest.v2+json",
+        "application/vnd.docker.distribution.manifest.list.v2+json",
+    )
+)
+TITLE_ANNOTATION = "org.opencontainers.image.title"
+CREATED_ANNOTATION = "org.opencontainers.image.created"
+REF_NAME_ANNOTATION = "org.opencontainers.image.ref.name"
+BACKENDS = ("native", "oras")
+DEFAULT_BACKEND = os.environ.get("OCI_PUBLISH_BACKEND", "native")
+DEFAULT_REGISTRY = "registry.vedenemo.dev"
+DEFAULT_USERNAME = "jenkins"
+DEFAULT_UPLOAD_CHUNK_SIZE = 64 * 1024 * 1024
+DEFAULT_BLOB_WORKERS = 4
+DIGEST_CACHE_NAME = "digests.json"
+DIGEST_READ_SIZE = 4 * 1024 * 1024
+UPLOAD_STATE_NAME = "uploads.json"
+PUBLISH_PROGRESS_NAME = "progress.json"
+UPLOAD_RANGE_PATTERN = re.compile(r"^(?:bytes=)?0-(-?\d+)$")
+HTTP_BLOCK_SIZE = 1024 * 1024
+HTTP_POOL_SIZE = 8
+HTTP_TIMEOUT = 300
+# Transient registry failures are retried with jittered exponential backoff.
+DEFAULT_RETRIES = 4
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 30.0
+RETRY_AFTER_LIMIT = 300.0
+ORAS_STATUS_PATTERN = re.compile(r"status code (\d{3})")
+ORAS_RESET_PATTERN = re.compile(
+    r"connection reset|broken pipe|unexpected EOF|connection refused", re.IGNORECASE
+)
+# Blob placement into OCI layouts, in the order "auto" tries them.
+LAYOUT_LINK_MODES = ("auto", "reflink", "hardlink", "copy")
+DEFAULT_LAYOUT_LINK = os.environ.get("OCI_LAYOUT_LINK", "auto")
+FICLONE = 0x40049409
+# Certificates used by verify-signature for each kind of signed file.
+SIGNATURE_CERTIFICATE_ENV = {"image": "IMG_CERT", "attestation": "PROV_CERT"}
+DEFAULT_VERIFY_WORKERS = os.cpu_count() or 1
+DEFAULT_SESSION_CACHE = os.environ.get("OCI_SESSION_CACHE", "")
+DEFAULT_SESSION_TTL = 3600
+SESSION_RECORD_NAME = "session.json"
+SESSION_KEY_NAME = "key"
+DEFAULT_DAEMON_SOCKET = os.environ.get("OCI_PUBLISH_SOCKET") or os.path.join(
+    os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir(),
+    f"oci-publish-{os.getuid()}.sock",
+)
+DEFAULT_DAEMON_JOBS = 4
+DAEMON_JOB_HISTORY = 256
+# Job arguments holding paths, resolved against the client's directory.
+JOB_PATH_ARGS = ("target_dir", "result_json", "results_dir", "trace_json")
+JOB_PATH_LIST_ARGS = ("target_dirs", "globs")
+# Options that configure the local session and are meaningless to a daemon.
+SESSION_ARGS = (
+    "backend",
+    "chunk_size",
+    "session_cache",
+    "session_ttl",
+    "blob_workers",
+    "max_bandwidth",
+    "layout_link",
+    "retries",
+    "socket",
+    "daemon",
+    "handler",
+)
+# Session options a daemon job must share with the daemon that runs it.
+DAEMON_SETTING_ARGS = (
+    "backend",
+    "chunk_size",
+    "blob_workers",
+    "max_bandwidth",
+    "layout_link",
+    "retries",
+)
+
+
+class PublishError(SystemExit):
+    """Fatal publish error, exiting with status 1 unless handled."""
+
+    def __init__(self, message: str):
+        super().__init__(1)
+        self.message = message
+
+    def __str__(self) -> str:
+        return self.message
+
+
+class RegistryError(PublishError):
+    """Registry request failure, carrying the HTTP status when there is one.
+
+    5xx and 429 responses and dropped connections are `transient` and worth
+    retrying; `retry_after` holds the delay a 429 or 503 asked for.
+    """
+
+    def __init__(
+        self,
+        message: str,
+        *,
+        status: int | None = None,
+        retry_after: float | None = None,
+        transient: bool = False,
+    ):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+        self.transient = transient or status == 429 or (status or 0) >= 500
 
 
 def fail(message: str) -> NoReturn:
-    """Exit with an error message."""
-    print(f"Error: {message}", file=sys.stderr)
-    sys.exit(1)
+    """Abort the current publish with an error message."""
+    raise PublishError(message)
 
 
 def read_json(path: Path) -> Any:
@@ -75,6 +233,37 @@ def write_json(path: Path, data: Any) -> None:
         handle.write("\n")
 
 
+def state_dir() -> Path:
+    """Return the private directory holding publish state between runs.
+
+    Target directories are served and archived as build outputs, so state
+    is kept out of them: in $OCI_PUBLISH_STATE_DIR, or else under
+    $XDG_CACHE_HOME or ~/.cache.
+    """
+    configured = os.environ.get("OCI_PUBLISH_STATE_DIR")
+    if configured:
+        return Path(configured).expanduser()
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "oci-publish"
+
+
+def state_file(directory: Path, name: str) -> Path:
+    """Return the state file `name` kept for `directory`."""
+    resolved = directory.resolve()
+    key = hashlib.sha256(str(resolved).encode()).hexdigest()[:16]
+    return state_dir() / f"{resolved.name}-{key}" / name
+
+
+def write_json_atomic(path: Path, data: Any) -> None:
+    """Write JSON through a temporary file so readers never see partial data."""
+    temporary = path.with_name(f".{path.name}.{uuid.uuid4().hex}")
+    try:
+        write_json(temporary, data)
+        os.replace(temporary, path)
+    finally:
+        temporary.unlink(missing_ok=True)
+
+
 def run_command(
     args: list[str], *, cwd: Path | None = None, stdin_text: str | None = None
 ) -> subprocess.CompletedProcess[str]:
@@ -96,9 +285,78 @@ def run_command(
         fail(f"command '{args[0]}' is not installed")
 
 
+def retry_after_seconds(value: str) -> float | None:
+    """Parse a Retry-After header given as seconds or as an HTTP date."""
+    value = value.strip()
+    if not value:
+        return None
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Jittered exponential backoff for transient registry failures."""
+
+    retries: int = DEFAULT_RETRIES
+    base_delay: float = RETRY_BASE_DELAY
+    max_delay: float = RETRY_MAX_DELAY
+
+    def delay(self, attempt: int, error: RegistryError) -> float:
+        """Return the pause before retry `attempt`, counted from 1.
+
+        A Retry-After from the registry is honoured; otherwise the delay is
+        drawn uniformly up to an exponentially growing cap ("full jitter"),
+        so concurrent uploads that failed together do not retry in lockstep.
+        """
+        if error.retry_after is not None:
+            return min(error.retry_after, RETRY_AFTER_LIMIT)
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling)
+
+    def call(
+        self, operation: str, function: Callable[..., Any], *args: Any, **kwargs: Any
+    ) -> Any:
+        """Run one registry operation, retrying it while it fails transiently."""
+        attempt = 0
+        while True:
+            try:
+                return function(*args, **kwargs)
+            except RegistryError as error:
+                attempt += 1
+                if not error.transient or attempt > self.retries:
+                    raise
+                delay = self.delay(attempt, error)
+                print(
+                    f"[!] {operation} failed: {error}; "
+                    f"retry {attempt}/{self.retries} in {delay:.1f}s"
+                )
+                time.sleep(delay)
+
+
+def run_oras_command(
+    args: list[str], *, cwd: Path | None = None
+) -> subprocess.CompletedProcess[str]:
+    """Run ORAS, classifying failures by the status or error it reports."""
+    try:
+        return run_command(["oras", *args], cwd=cwd)
+    except PublishError as error:
+        status = ORAS_STATUS_PATTERN.search(error.message)
+        raise RegistryError(
+            error.message,
+            status=int(status.group(1)) if status else None,
+            transient=bool(ORAS_RESET_PATTERN.search(error.message)),
+        ) from error
+
+
 def run_oras(args: list[str], *, cwd: Path | None = None) -> dict[str, Any]:
     """Run an ORAS command that returns JSON."""
-    result = run_command(["oras", *args, "--format", "json"], cwd=cwd)
+    result = run_oras_command([*args, "--format", "json"], cwd=cwd)
     return json.loads(result.stdout)
 
 
@@ -125,169 +383,2771 @@ def normalize_repository(repository: str) -> str:
     return normalized
 
 
+def file_digest(path: Path) -> str:
+    """Return the sha256 OCI digest of a file.
+
+    The file is read in one sequential pass into a single reusable buffer,
+    so memory use stays bounded regardless of the image size.
+    """
+    digest = hashlib.sha256()
+    buffer = bytearray(DIGEST_READ_SIZE)
+    view = memoryview(buffer)
+    with path.open("rb", buffering=0) as handle:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(handle.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        while size := handle.readinto(buffer):
+            digest.update(view[:size])
+    return f"sha256:{digest.hexdigest()}"
+
+
+def file_identity(path: Path) -> dict[str, int]:
+    """Return the stat fields that identify one version of a file."""
+    stat = path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "inode": stat.st_ino}
+
+
+class DigestCache:
+    """Persistent file digest index stored in a JSON state file.
+
+    Entries are keyed by the resolved path and are only reused while the
+    file size, mtime and inode are unchanged, so retries and republishes of
+    the same target do not read the images again. New entries are kept in
+    memory until `flush`, which publishers call once per artifact.
+    Instances are shared while in use and dropped once no publish holds
+    them, so a long-running daemon does not accumulate them.
+    """
+
+    _instances: weakref.WeakValueDictionary[Path, "DigestCache"] = (
+        weakref.WeakValueDictionary()
+    )
+    _instances_lock = threading.Lock()
+
+    def __init__(self, index_path: Path | None = None):
+        self.index_path = index_path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = self._load()
+        self._dirty = False
+
+    @classmethod
+    def for_directory(cls, directory: Path) -> "DigestCache":
+        """Return the shared cache of the files in `directory`."""
+        index_path = state_file(directory, DIGEST_CACHE_NAME)
+        with cls._instances_lock:
+            cache = cls._instances.get(index_path)
+            if cache is None:
+                cache = cls._instances[index_path] = cls(index_path)
+            return cache
+
+    def digest(self, path: Path) -> str:
+        """Return the digest of `path`, hashing it only when it changed."""
+        resolved = path.resolve()
+        identity = file_identity(resolved)
+        digest = self.lookup(resolved, identity)
+        if digest is not None:
+            return digest
+
+        digest = file_digest(resolved)
+        with self._lock:
+            self.misses += 1
+        self.remember(resolved, identity, digest)
+        return digest
+
+    def lookup(self, path: Path, identity: dict[str, int]) -> str | None:
+        """Return the cached digest of `path` while `identity` still matches."""
+        with self._lock:
+            entry = self._entries.get(str(path.resolve()))
+            if entry and all(
+                entry.get(name) == value for name, value in identity.items()
+            ):
+                self.hits += 1
+                return entry["digest"]
+        return None
+
+    def remember(self, path: Path, identity: dict[str, int], digest: str) -> None:
+        """Record a digest computed elsewhere for the file version `identity`."""
+        with self._lock:
+            self._entries[str(path.resolve())] = {**identity, "digest": digest}
+            self._dirty = True
+
+    def flush(self) -> None:
+        """Persist new entries atomically; an unwritable index stays in memory.
+
+        Entries another process saved meanwhile are kept.
+        """
+        with self._lock:
+            if self.index_path is None or not self._dirty:
+                return
+            self._entries = {**self._load(), **self._entries}
+            try:
+                write_json_atomic(
+                    self.index_path, {"version": 1, "files": self._entries}
+                )
+                self._dirty = False
+            except OSError:
+                pass
+
+    def _load(self) -> dict[str, dict[str, Any]]:
+        if self.index_path is None or not self.index_path.is_file():
+            return {}
+        try:
+            return dict(read_json(self.index_path).get("files", {}))
+        except (OSError, ValueError, AttributeError):
+            return {}
+
+
+class UploadState:
+    """Checkpoints of in-progress chunked uploads, kept in the state dir.
+
+    Every acknowledged chunk updates the checkpoint, so a re-run after a
+    dropped connection resumes the upload session at the last offset the
+    registry confirmed instead of starting the blob from zero. Like
+    `DigestCache`, instances are only shared while an upload holds them.
+    """
+
+    _instances: weakref.WeakValueDictionary[Path, "UploadState"] = (
+        weakref.WeakValueDictionary()
+    )
+    _instances_lock = threading.Lock()
+
+    def __init__(self, state_path: Path | None = None):
+        self.state_path = state_path
+        self._lock = threading.Lock()
+        self._uploads: dict[str, dict[str, Any]] = {}
+        if state_path is not None and state_path.is_file():
+            try:
+                self._uploads = dict(read_json(state_path).get("uploads", {}))
+            except (OSError, ValueError, AttributeError):
+                self._uploads = {}
+
+    @classmethod
+    def for_directory(cls, directory: Path) -> "UploadState":
+        """Return the shared upload state of the files in `directory`."""
+        state_path = state_file(directory, UPLOAD_STATE_NAME)
+        with cls._instances_lock:
+            state = cls._instances.get(state_path)
+            if state is None:
+                state = cls._instances[state_path] = cls(state_path)
+            return state
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Return the checkpoint of an upload, if one was recorded."""
+        with self._lock:
+            checkpoint = self._uploads.get(key)
+            return dict(checkpoint) if checkpoint else None
+
+    def update(self, key: str, *, location: str, offset: int) -> None:
+        """Record the session location and the acknowledged offset."""
+        with self._lock:
+            self._uploads[key] = {"location": location, "offset": offset}
+            self._save()
+
+    def clear(self, key: str) -> None:
+        """Forget a finished or abandoned upload."""
+        with self._lock:
+            if self._uploads.pop(key, None) is not None:
+                self._save()
+
+    def _save(self) -> None:
+        if self.state_path is None:
+            return
+        try:
+            if self._uploads:
+                write_json_atomic(
+                    self.state_path, {"version": 1, "uploads": self._uploads}
+                )
+            else:
+                self.state_path.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+
+class PublishProgress:
+    """Completed steps of a target publish, kept in the state dir.
+
+    The primary push, each referrer and the tagging record their output as
+    they finish, so a re-run after a failure skips straight past them. A
+    record only applies while the fingerprint of the target files and
+    options matches, and it is dropped once the publish completes.
+    """
+
+    def __init__(
+        self,
+        state_path: Path | None = None,
+        key: str = "",
+        fingerprint: str = "",
+        *,
+        resume: bool = True,
+    ):
+        self.state_path = state_path
+        self.key = key
+        self.fingerprint = fingerprint
+        self.resumed: list[str] = []
+        self._lock = threading.Lock()
+        self._steps: dict[str, Any] = {}
+        if resume:
+            record = self._records().get(key) or {}
+            if record.get("fingerprint") == fingerprint:
+                self._steps = dict(record.get("steps", {}))
+
+    @property
+    def completed(self) -> list[str]:
+        """Steps recorded as done, in completion order."""
+        with self._lock:
+            return list(self._steps)
+
+    def run(
+        self, step: str, function: Callable[..., Any], *args: Any, **kwargs: Any
+    ) -> Any:
+        """Return the recorded output of `step`, or run and record it."""
+        with self._lock:
+            if step in self._steps:
+                self.resumed.append(step)
+                return self._steps[step]
+        output = function(*args, **kwargs)
+        with self._lock:
+            self._steps[step] = output
+            self._save()
+        return output
+
+    def finish(self) -> None:
+        """Forget the steps of a publish that completed."""
+        with self._lock:
+            self._steps = {}
+            self._save()
+
+    def _records(self) -> dict[str, Any]:
+        if self.state_path is None or not self.state_path.is_file():
+            return {}
+        try:
+            return dict(read_json(self.state_path).get("publishes", {}))
+        except (OSError, ValueError, AttributeError):
+            return {}
+
+    def _save(self) -> None:
+        if self.state_path is None:
+            return
+        records = self._records()
+        if self._steps:
+            records[self.key] = {"fingerprint": self.fingerprint, "steps": self._steps}
+        else:
+            records.pop(self.key, None)
+        try:
+            if records:
+                write_json_atomic(self.state_path, {"version": 1, "publishes": records})
+            else:
+                self.state_path.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+
+def bytes_digest(data: bytes) -> str:
+    """Return the sha256 OCI digest of a byte string."""
+    return f"sha256:{hashlib.sha256(data).hexdigest()}"
+
+
+class DigestingWriter:
+    """Write-only file object that hashes a stream and hands it on in chunks.
+
+    Producers such as a streaming `tarfile` write into it; every full chunk of
+    `chunk_size` bytes is passed to `sink`, so memory use stays bounded by one
+    chunk and nothing is staged on disk.
+    """
+
+    def __init__(self, sink: Callable[[bytes], None], chunk_size: int):
+        self._sink = sink
+        self._chunk_size = chunk_size
+        self._buffer = bytearray()
+        self._hash = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        """Hash `data` and forward every completed chunk."""
+        self._hash.update(data)
+        self.size += len(data)
+        self._buffer += data
+        while len(self._buffer) >= self._chunk_size:
+            self._sink(bytes(self._buffer[: self._chunk_size]))
+            del self._buffer[: self._chunk_size]
+        return len(data)
+
+    def flush(self) -> None:
+        """Forward the buffered tail of the stream."""
+        if self._buffer:
+            self._sink(bytes(self._buffer))
+            self._buffer.clear()
+
+    @property
+    def digest(self) -> str:
+        """Return the OCI digest of everything written so far."""
+        return f"sha256:{self._hash.hexdigest()}"
+
+
+class Writable(Protocol):  # pylint: disable=too-few-public-methods
+    """Sink accepted by stream producers, e.g. a file or `DigestingWriter`."""
+
+    def write(self, data: bytes, /) -> int:
+        """Write `data`, returning the number of bytes consumed."""
+
+
+StreamProducer = Callable[[Writable], None]
+
+
+@dataclass(frozen=True)
+class Blob:
+    """A blob to upload, backed either by a file or by in-memory data."""
+
+    media_type: str
+    digest: str
+    size: int
+    path: Path | None = None
+    data: bytes | None = None
+    title: str | None = None
+    offset: int | None = None
+
+    @classmethod
+    def from_file(
+        cls,
+        path: Path,
+        media_type: str,
+        title: str | None = None,
+        *,
+        cache: DigestCache | None = None,
+    ) -> "Blob":
+        """Describe a file-backed blob."""
+        if not path.is_file():
+            fail(f"file to publish is missing: {path}")
+        return cls(
+            media_type=media_type,
+            digest=cache.digest(path) if cache else file_digest(path),
+            size=path.stat().st_size,
+            path=path,
+            title=title,
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes, media_type: str) -> "Blob":
+        """Describe an in-memory blob."""
+        return cls(
+            media_type=media_type,
+            digest=bytes_digest(data),
+            size=len(data),
+            data=data,
+        )
+
+    def payload(self) -> bytes | None:
+        """Return in-memory content, reading a file slice when `offset` is set.
+
+        Whole files stay on disk and are streamed by the clients instead.
+        """
+        if self.data is not None or self.offset is None:
+            return self.data
+        with blob_path(self).open("rb") as handle:
+            handle.seek(self.offset)
+            return handle.read(self.size)
+
+    def descriptor(self) -> dict[str, Any]:
+        """Return the OCI descriptor of this blob."""
+        descriptor: dict[str, Any] = {
+            "mediaType": self.media_type,
+            "digest": self.digest,
+            "size": self.size,
+        }
+        if self.title:
+            descriptor["annotations"] = {TITLE_ANNOTATION: self.title}
+        return descriptor
+
+
+EMPTY_CONFIG = Blob.from_bytes(b"{}", OCI_EMPTY_MEDIA_TYPE)
+
+
+def chunk_file(path: Path, average_size: int) -> dict[str, Any]:
+    """Split a file into content-defined chunks and return its chunk index.
+
+    Root images are filesystem images, so changes between versions move
+    content by whole blocks. Cut points are therefore only considered at
+    ROOT_CHUNK_BLOCK_SIZE boundaries: a chunk ends after a block whose
+    crc32 matches a mask, giving chunks of roughly `average_size` bounded
+    to a quarter and four times that. A boundary depends only on the block
+    before it, so unchanged regions keep their chunks and digests even
+    when earlier content grows or shrinks by whole blocks. Checking one
+    crc32 per block instead of a byte-wise rolling hash keeps the scan at
+    hashing speed in Python.
+    """
+    block_size = ROOT_CHUNK_BLOCK_SIZE
+    min_size = max(average_size // 4, block_size)
+    max_size = max(average_size * 4, min_size)
+    spread = max((average_size - min_size) // block_size, 1)
+    mask = (1 << (spread.bit_length() - 1)) - 1
+
+    whole = hashlib.sha256()
+    chunk = hashlib.sha256()
+    chunk_size = 0
+    chunks = []
+    with path.open("rb") as handle:
+        while data := handle.read(DIGEST_READ_SIZE):
+            whole.update(data)
+            view = memoryview(data)
+            for start in range(0, len(data), block_size):
+                block = view[start : start + block_size]
+                chunk.update(block)
+                chunk_size += len(block)
+                if chunk_size >= max_size or (
+                    chunk_size >= min_size and zlib.crc32(block) & mask == 0
+                ):
+                    chunks.append(
+                        {"digest": f"sha256:{chunk.hexdigest()}", "size": chunk_size}
+                    )
+                    chunk = hashlib.sha256()
+                    chunk_size = 0
+    if chunk_size:
+        chunks.append({"digest": f"sha256:{chunk.hexdigest()}", "size": chunk_size})
+
+    return {
+        "version": 1,
+        "mediaType": SYSUPDATE_ROOT_MEDIA_TYPE,
+        "digest": f"sha256:{whole.hexdigest()}",
+        "size": sum(item["size"] for item in chunks),
+        "blockSize": block_size,
+        "averageSize": average_size,
+        "chunks": chunks,
+    }
+
+
+def chunk_blobs(path: Path, title: str, average_size: int) -> list[Blob]:
+    """Describe a file as its chunk index blob followed by its unique chunks.
+
+    Chunks are file slices read only when uploaded, so the registry or
+    layout receives just the chunks it does not hold yet.
+    """
+    if not path.is_file():
+        fail(f"file to publish is missing: {path}")
+    index = chunk_file(path, average_size)
+    index_blob = Blob.from_bytes(
+        json.dumps(index, separators=(",", ":")).encode(),
+        SYSUPDATE_ROOT_INDEX_MEDIA_TYPE,
+    )
+    blobs = [replace(index_blob, title=f"{title}.chunks.json")]
+    seen = set()
+    offset = 0
+    for item in index["chunks"]:
+        if item["digest"] not in seen:
+            seen.add(item["digest"])
+            blobs.append(
+                Blob(
+                    media_type=SYSUPDATE_ROOT_CHUNK_MEDIA_TYPE,
+                    digest=item["digest"],
+                    size=item["size"],
+                    path=path,
+                    offset=offset,
+                )
+            )
+        offset += item["size"]
+    return blobs
+
+
+@dataclass(frozen=True)
+class Reference:
+    """A parsed OCI reference."""
+
+    registry: str
+    repository: str
+    tag: str = ""
+    digest: str = ""
+
+    @property
+    def reference(self) -> str:
+        """Return the tag or digest part used in API paths."""
+        return self.digest or self.tag
+
+
+def parse_reference(reference: str) -> Reference:
+    """Split `[registry/]repository(:tag|@digest)` into its parts."""
+    name, _, digest = reference.partition("@")
+    tag = ""
+    if ":" in name.rsplit("/", 1)[-1]:
+        name, tag = name.rsplit(":", 1)
+
+    registry = ""
+    first, separator, rest = name.partition("/")
+    if separator and ("." in first or ":" in first or first == "localhost"):
+        registry, name = first, rest
+
+    if not name or not (tag or digest):
+        fail(f"invalid OCI reference '{reference}': expected a tag or digest")
+    return Reference(registry=registry, repository=name, tag=tag, digest=digest)
+
+
+def image_manifest(
+    *,
+    artifact_type: str,
+    config: dict[str, Any],
+    layers: list[dict[str, Any]],
+    annotations: dict[str, str],
+    subject: dict[str, Any] | None = None,
+) -> bytes:
+    """Render an OCI image manifest the way `oras push` and `oras attach` do."""
+    manifest: dict[str, Any] = {
+        "schemaVersion": 2,
+        "mediaType": OCI_MANIFEST_MEDIA_TYPE,
+        "artifactType": artifact_type,
+        "config": config,
+        "layers": layers,
+    }
+    if subject:
+        manifest["subject"] = subject
+    manifest["annotations"] = {
+        CREATED_ANNOTATION: time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        **{key: value for key, value in annotations.items() if value},
+    }
+    return json.dumps(manifest, separators=(",", ":")).encode()
+
+
+def referrer_manifest(
+    subject: dict[str, Any],
+    artifact_type: str,
+    layers: list["Blob"],
+    annotations: dict[str, str],
+) -> bytes:
+    """Render an `oras attach` style referrer manifest for a subject."""
+    return image_manifest(
+        artifact_type=artifact_type,
+        config={**EMPTY_CONFIG.descriptor(), "data": "e30="},
+        layers=[layer.descriptor() for layer in layers],
+        annotations=annotations,
+        subject=subject,
+    )
+
+
+def manifest_content(data: bytes) -> dict[str, Any]:
+    """Return a manifest without its creation timestamp, for comparisons."""
+    manifest = json.loads(data)
+    manifest.get("annotations", {}).pop(CREATED_ANNOTATION, None)
+    return manifest
+
+
+def referrer_descriptor(data: bytes, digest: str) -> dict[str, Any]:
+    """Return the index descriptor used to list a referrer manifest."""
+    manifest = json.loads(data)
+    descriptor = {
+        "mediaType": manifest.get("mediaType", OCI_MANIFEST_MEDIA_TYPE),
+        "digest": digest,
+        "size": len(data),
+        "artifactType": manifest.get("artifactType")
+        or manifest.get("config", {}).get("mediaType", ""),
+    }
+    if manifest.get("annotations"):
+        descriptor["annotations"] = manifest["annotations"]
+    return descriptor
+
+
+def referrers_tag(digest: str) -> str:
+    """Return the referrers tag schema fallback tag for a subject digest."""
+    algorithm, _, encoded = digest.partition(":")
+    return f"{algorithm}-{encoded}"
+
+
+class BandwidthLimiter:  # pylint: disable=too-few-public-methods
+    """Token bucket capping the combined upload rate of all threads."""
+
+    def __init__(self, rate: int):
+        self.rate = rate
+        self._allowance = float(rate)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, size: int) -> None:
+        """Reserve `size` bytes of bandwidth, sleeping off any debt."""
+        with self._lock:
+            now = time.monotonic()
+            self._allowance = min(
+                float(self.rate), self._allowance + (now - self._last) * self.rate
+            )
+            self._last = now
+            self._allowance -= size
+            delay = -self._allowance / self.rate if self._allowance < 0 else 0.0
+        if delay > 0:
+            time.sleep(delay)
+
+
+class ThrottledReader:
+    """File wrapper charging every read against a bandwidth limiter."""
+
+    def __init__(self, handle: BinaryIO, limiter: BandwidthLimiter):
+        self._handle = handle
+        self._limiter = limiter
+
+    def read(self, size: int = -1) -> bytes:
+        """Read from the file once bandwidth is available."""
+        data = self._handle.read(size)
+        if data:
+            self._limiter.consume(len(data))
+        return data
+
+    def tell(self) -> int:
+        """Return the current file offset."""
+        return self._handle.tell()
+
+    def seek(self, offset: int) -> int:
+        """Move the file offset, e.g. to replay a request body."""
+        return self._handle.seek(offset)
+
+
+@dataclass(frozen=True)
+class HttpResponse:
+    """A fully read HTTP response."""
+
+    status: int
+    headers: Message
+    body: bytes
+
+
+class RegistryClient:  # pylint: disable=too-many-instance-attributes
+    """OCI distribution API client with pooled keep-alive connections.
+
+    Connections to the registry are kept open and shared between threads,
+    so a publish pays the TCP and TLS handshakes once per pooled connection
+    instead of once per ORAS process.
+    """
+
+    def __init__(
+        self,
+        registry: str,
+        *,
+        username: str = "",
+        password: str = "",
+        plain_http: bool = False,
+        pool_size: int = HTTP_POOL_SIZE,
+        chunk_size: int = DEFAULT_UPLOAD_CHUNK_SIZE,
+        limiter: BandwidthLimiter | None = None,
+    ):
+        self.registry = registry
+        self.chunk_size = chunk_size
+        self.limiter = limiter
+        self.stats = {"connections": 0, "requests": 0}
+        self._username = username
+        self._password = password
+        self._scheme = "http" if plain_http else "https"
+        self._pool: list[http.client.HTTPConnection] = []
+        self._pool_size = pool_size
+        self._lock = threading.Lock()
+        self._referrers_tag_lock = threading.Lock()
+        self._authorization: dict[str, str] = {}
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        with self._lock:
+            pool, self._pool = self._pool, []
+        for connection in pool:
+            connection.close()
+
+    @property
+    def authorizations(self) -> dict[str, str]:
+        """Bearer authorizations obtained so far, keyed by repository."""
+        with self._lock:
+            return dict(self._authorization)
+
+    @authorizations.setter
+    def authorizations(self, value: dict[str, str]) -> None:
+        with self._lock:
+            self._authorization.update(value)
+
+    def _open(self, scheme: str, host: str) -> http.client.HTTPConnection:
+        with self._lock:
+            self.stats["connections"] += 1
+        if scheme == "http":
+            return http.client.HTTPConnection(
+                host, timeout=HTTP_TIMEOUT, blocksize=HTTP_BLOCK_SIZE
+            )
+        return http.client.HTTPSConnection(
+            host,
+            timeout=HTTP_TIMEOUT,
+            blocksize=HTTP_BLOCK_SIZE,
+            context=ssl.create_default_context(),
+        )
+
+    def _acquire(self) -> tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            if self._pool:
+                return self._pool.pop(), True
+        return self._open(self._scheme, self.registry), False
+
+    def _release(self, connection: http.client.HTTPConnection) -> None:
+        with self._lock:
+            if len(self._pool) < self._pool_size:
+                self._pool.append(connection)
+                return
+        connection.close()
+
+    def _send(
+        self,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        body: bytes | BinaryIO | ThrottledReader | None,
+    ) -> HttpResponse:
+        split = urlsplit(url)
+        path = f"{split.path}?{split.query}" if split.query else split.path
+        foreign = bool(split.netloc) and split.netloc != self.registry
+        body_start = body.tell() if hasattr(body, "tell") else 0
+
+        for attempt in range(2):
+            if foreign:
+                connection, reused = self._open(split.scheme, split.netloc), False
+            else:
+                connection, reused = self._acquire()
+            with self._lock:
+                self.stats["requests"] += 1
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+            except (
+                http.client.RemoteDisconnected,
+                BrokenPipeError,
+                ConnectionResetError,
+            ) as error:
+                connection.close()
+                # The registry may close idle keep-alive connections at any
+                # time; retry once on a fresh connection before giving up.
+                if reused and attempt == 0:
+                    if hasattr(body, "seek"):
+                        body.seek(body_start)
+                    continue
+                raise RegistryError(
+                    f"{method} {url}: {error}", transient=True
+                ) from error
+            except (OSError, http.client.HTTPException) as error:
+                connection.close()
+                raise RegistryError(
+                    f"{method} {url}: {error}",
+                    transient=isinstance(error, ConnectionError),
+                ) from error
+
+            if foreign or response.will_close:
+                connection.close()
+            else:
+                self._release(connection)
+            return HttpResponse(response.status, response.headers, data)
+
+        raise AssertionError("unreachable")
+
+    def _basic_authorization(self) -> str:
+        if not self._username:
+            return ""
+        token = base64.b64encode(f"{self._username}:{self._password}".encode())
+        return f"Basic {token.decode()}"
+
+    def _authenticate(self, repository: str, challenge: str) -> bool:
+        """Fetch a bearer token for a `WWW-Authenticate: Bearer` challenge."""
+        scheme, _, params = challenge.partition(" ")
+        if scheme.lower() != "bearer":
+            return False
+        fields = dict(re.findall(r'(\w+)="([^"]*)"', params))
+        if "realm" not in fields:
+            return False
+        query = urlencode(
+            {key: fields[key] for key in ("service", "scope") if key in fields}
+        )
+        headers = {}
+        if basic := self._basic_authorization():
+            headers["Authorization"] = basic
+        response = self._send(
+            "GET",
+            f"{fields['realm']}?{query}" if query else fields["realm"],
+            headers,
+            None,
+        )
+        if response.status != 200:
+            raise RegistryError(
+                f"registry token request failed: HTTP {response.status}",
+                status=response.status,
+            )
+        payload = json.loads(response.body)
+        token = payload.get("token") or payload.get("access_token")
+        if not token:
+            raise RegistryError("registry token response did not contain a token")
+        with self._lock:
+            self._authorization[repository] = f"Bearer {token}"
+        return True
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        repository: str = "",
+        headers: dict[str, str] | None = None,
+        body: bytes | BinaryIO | ThrottledReader | None = None,
+        expected: tuple[int, ...] = (200,),
+    ) -> HttpResponse:
+        """Send an authenticated request and check the response status."""
+        body_start = body.tell() if hasattr(body, "tell") else 0
+        for attempt in range(2):
+            request_headers = dict(headers or {})
+            with self._lock:
+                authorization = self._authorization.get(repository)
+            authorization = authorization or self._basic_authorization()
+            if authorization:
+                request_headers["Authorization"] = authorization
+            if body is None and method in ("PUT", "POST", "PATCH"):
+                request_headers.setdefault("Content-Length", "0")
+
+            response = self._send(method, url, request_headers, body)
+            if (
+                response.status == 401
+                and attempt == 0
+                and self._authenticate(
+                    repository, response.headers.get("WWW-Authenticate", "")
+                )
+            ):
+                if hasattr(body, "seek"):
+                    body.seek(body_start)
+                continue
+            break
+
+        if response.status not in expected:
+            raise RegistryError(
+                f"{method} {url}: HTTP {response.status} {error_detail(response.body)}".rstrip(),
+                status=response.status,
+                retry_after=retry_after_seconds(
+                    response.headers.get("Retry-After", "")
+                ),
+            )
+        return response
+
+    def ping(self) -> None:
+        """Check that the registry accepts the configured credentials."""
+        self.request("GET", "/v2/")
+
+    def blob_exists(self, repository: str, digest: str) -> bool:
+        """Return whether the registry already holds a blob."""
+        response = self.request(
+            "HEAD",
+            f"/v2/{repository}/blobs/{digest}",
+            repository=repository,
+            expected=(200, 404),
+        )
+        return response.status == 200
+
+    def _start_upload(self, repository: str) -> str:
+        response = self.request(
+            "POST",
+            f"/v2/{repository}/blobs/uploads/",
+            repository=repository,
+            expected=(202,),
+        )
+        return response.headers["Location"]
+
+    def _resume_upload(
+        self, repository: str, blob: Blob, checkpoint: dict[str, Any] | None
+    ) -> tuple[str, int] | None:
+        """Ask the registry how much of a checkpointed upload it holds."""
+        if not checkpoint or checkpoint.get("offset", 0) <= 0:
+            return None
+        try:
+            response = self.request(
+                "GET", checkpoint["location"], repository=repository, expected=(204,)
+            )
+        except RegistryError:
+            # The session expired or was garbage collected: start over.
+            return None
+        match = UPLOAD_RANGE_PATTERN.fullmatch(response.headers.get("Range", ""))
+        if not match:
+            return None
+        offset = int(match.group(1)) + 1
+        if not 0 < offset <= blob.size:
+            return None
+        return response.headers.get("Location") or checkpoint["location"], offset
+
+    def push_blob(
+        self, repository: str, blob: Blob, *, state: UploadState | None = None
+    ) -> None:
+        """Upload a blob, monolithically or in resumable `chunk_size` chunks."""
+        octet_stream = {"Content-Type": "application/octet-stream"}
+        data = blob.payload()
+
+        if data is not None or blob.size <= self.chunk_size:
+            location = self._start_upload(repository)
+            with ExitStack() as stack:
+                body: bytes | BinaryIO | ThrottledReader
+                if data is not None:
+                    body = data
+                    if self.limiter:
+                        self.limiter.consume(blob.size)
+                else:
+                    body = stack.enter_context(blob_path(blob).open("rb"))
+                    if self.limiter:
+                        body = ThrottledReader(body, self.limiter)
+                self.request(
+                    "PUT",
+                    upload_url(location, digest=blob.digest),
+                    repository=repository,
+                    headers={**octet_stream, "Content-Length": str(blob.size)},
+                    body=body,
+                    expected=(201,),
+                )
+            return
+
+        key = f"{self.registry}/{repository}@{blob.digest}"
+        resumed = self._resume_upload(
+            repository, blob, state.get(key) if state else None
+        )
+        if resumed:
+            location, offset = resumed
+            print(
+                f"[+] Resuming upload of {blob.title or blob.digest} at byte {offset}"
+            )
+        else:
+            location, offset = self._start_upload(repository), 0
+
+        with blob_path(blob).open("rb") as handle:
+            handle.seek(offset)
+            while chunk := handle.read(self.chunk_size):
+                if self.limiter:
+                    self.limiter.consume(len(chunk))
+                response = self.request(
+                    "PATCH",
+                    location,
+                    repository=repository,
+                    headers={
+                        **octet_stream,
+                        "Content-Length": str(len(chunk)),
+                        "Content-Range": f"{offset}-{offset + len(chunk) - 1}",
+                    },
+                    body=chunk,
+                    expected=(202,),
+                )
+                location = response.headers["Location"]
+                offset += len(chunk)
+                if state:
+                    state.update(key, location=location, offset=offset)
+        self.request(
+            "PUT",
+            upload_url(location, digest=blob.digest),
+            repository=repository,
+            expected=(201,),
+        )
+        if state:
+            state.clear(key)
+
+    def push_stream(
+        self, repository: str, media_type: str, produce: StreamProducer, title: str
+    ) -> Blob:
+        """Upload a blob generated on the fly, digesting it as chunks are sent.
+
+        The digest is only known once `produce` returns, so the content goes
+        out in `chunk_size` PATCH requests and the closing PUT names it.
+        """
+        location = self._start_upload(repository)
+        offset = 0
+
+        def send(chunk: bytes) -> None:
+            nonlocal location, offset
+            if self.limiter:
+                self.limiter.consume(len(chunk))
+            response = self.request(
+                "PATCH",
+                location,
+                repository=repository,
+                headers={
+                    "Content-Type": "application/octet-stream",
+                    "Content-Length": str(len(chunk)),
+                    "Content-Range": f"{offset}-{offset + len(chunk) - 1}",
+                },
+                body=chunk,
+                expected=(202,),
+            )
+            location = response.headers["Location"]
+            offset += len(chunk)
+
+        writer = DigestingWriter(send, self.chunk_size)
+        produce(writer)
+        writer.flush()
+        self.request(
+            "PUT",
+            upload_url(location, digest=writer.digest),
+            repository=repository,
+            expected=(201,),
+        )
+        return Blob(
+            media_type=media_type, digest=writer.digest, size=writer.size, title=title
+        )
+
+    def get_manifest(
+        self, repository: str, reference: str
+    ) -> tuple[bytes, str, str] | None:
+        """Return the manifest bytes, media type and digest, if present."""
+        response = self.request(
+            "GET",
+            f"/v2/{repository}/manifests/{reference}",
+            repository=repository,
+            headers={"Accept": MANIFEST_ACCEPT},
+            expected=(200, 404),
+        )
+        if response.status == 404:
+            return None
+        digest = response.headers.get("Docker-Content-Digest") or bytes_digest(
+            response.body
+        )
+        return response.body, response.headers.get("Content-Type", ""), digest
+
+    def get_blob(self, repository: str, digest: str) -> bytes:
+        """Download a blob into memory; meant for small blobs such as chunks."""
+        response = self.request(
+            "GET",
+            f"/v2/{repository}/blobs/{digest}",
+            repository=repository,
+            expected=(200, 302, 307),
+        )
+        if response.status != 200:
+            # Registries redirect blob downloads to pre-signed storage URLs,
+            # which must not receive the registry credentials.
+            location = response.headers["Location"]
+            response = self._send("GET", location, {}, None)
+            if response.status != 200:
+                raise RegistryError(
+                    f"GET {location}: HTTP {response.status}", status=response.status
+                )
+        return response.body
+
+    def resolve(self, repository: str, reference: str) -> dict[str, Any] | None:
+        """Return the descriptor of a manifest, if present."""
+        response = self.request(
+            "HEAD",
+            f"/v2/{repository}/manifests/{reference}",
+            repository=repository,
+            headers={"Accept": MANIFEST_ACCEPT},
+            expected=(200, 404),
+        )
+        if response.status == 404:
+            return None
+        digest = response.headers.get("Docker-Content-Digest")
+        size = response.headers.get("Content-Length")
+        if not digest or not size:
+            stored = self.get_manifest(repository, reference)
+            if stored is None:
+                return None
+            data, media_type, digest = stored
+            return {"mediaType": media_type, "digest": digest, "size": len(data)}
+        return {
+            "mediaType": response.headers.get("Content-Type", ""),
+            "digest": digest,
+            "size": int(size),
+        }
+
+    def put_manifest(
+        self,
+        repository: str,
+        reference: str,
+        data: bytes,
+        media_type: str,
+        *,
+        subject: str | None = None,
+    ) -> str:
+        """Upload a manifest and return its digest."""
+        response = self.request(
+            "PUT",
+            f"/v2/{repository}/manifests/{reference}",
+            repository=repository,
+            headers={"Content-Type": media_type, "Content-Length": str(len(data))},
+            body=data,
+            expected=(201,),
+        )
+        digest = response.headers.get("Docker-Content-Digest") or bytes_digest(data)
+        if subject and not response.headers.get("OCI-Subject"):
+            self._add_referrers_tag(
+                repository, subject, referrer_descriptor(data, digest)
+            )
+        return digest
+
+    def _add_referrers_tag(
+        self, repository: str, subject: str, descriptor: dict[str, Any]
+    ) -> None:
+        """Maintain the referrers tag schema for registries without the API."""
+        tag = referrers_tag(subject)
+        with self._referrers_tag_lock:
+            stored = self.get_manifest(repository, tag)
+            index = (
+                json.loads(stored[0])
+                if stored
+                else {
+                    "schemaVersion": 2,
+                    "mediaType": OCI_INDEX_MEDIA_TYPE,
+                    "manifests": [],
+                }
+            )
+            if any(
+                item["digest"] == descriptor["digest"] for item in index["manifests"]
+            ):
+                return
+            index["manifests"].append(descriptor)
+            self.put_manifest(
+                repository, tag, json.dumps(index).encode(), OCI_INDEX_MEDIA_TYPE
+            )
+
+    def referrers(self, repository: str, digest: str) -> list[dict[str, Any]]:
+        """List referrers of a manifest, falling back to the referrers tag."""
+        response = self.request(
+            "GET",
+            f"/v2/{repository}/referrers/{digest}",
+            repository=repository,
+            headers={"Accept": OCI_INDEX_MEDIA_TYPE},
+            expected=(200, 404),
+        )
+        if response.status == 200:
+            return json.loads(response.body).get("manifests", [])
+        stored = self.get_manifest(repository, referrers_tag(digest))
+        return json.loads(stored[0]).get("manifests", []) if stored else []
+
+
+def error_detail(body: bytes) -> str:
+    """Extract OCI error messages from a registry error response body."""
+    try:
+        errors = json.loads(body).get("errors", [])
+        return "; ".join(
+            f"{error.get('code', '')}: {error.get('message', '')}" for error in errors
+        )
+    except (ValueError, AttributeError):
+        return body.decode("utf-8", "replace").strip()[:200]
+
+
+def upload_url(location: str, **params: str) -> str:
+    """Append query parameters to an upload session location."""
+    separator = "&" if "?" in location else "?"
+    return f"{location}{separator}{urlencode(params)}"
+
+
+def blob_path(blob: Blob) -> Path:
+    """Return the backing file of a file-backed blob."""
+    if blob.path is None:
+        raise AssertionError(f"blob {blob.digest} is not file-backed")
+    return blob.path
+
+
+def reflink_file(source: Path, destination: Path) -> None:
+    """Clone a file with FICLONE, sharing extents until either copy changes."""
+    with source.open("rb") as src, destination.open("wb") as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+
+
+def place_file(source: Path, destination: Path, mode: str = "auto") -> str:
+    """Create `destination` with the contents of `source` as cheaply as possible.
+
+    Reflinks are preferred: they cost no space and stay independent of the
+    source. Hardlinks are as cheap but alias the source inode, so rewriting
+    the source in place would change the blob; they are only used when the
+    source and destination share a filesystem. Anything else falls back to
+    a copy. Returns the method that was used.
+    """
+    if mode in ("auto", "reflink"):
+        try:
+            reflink_file(source, destination)
+            return "reflink"
+        except OSError:
+            destination.unlink(missing_ok=True)
+    if mode in ("auto", "hardlink"):
+        try:
+            os.link(source, destination)
+            return "hardlink"
+        except OSError:
+            pass
+    shutil.copyfile(source, destination)
+    return "copy"
+
+
+class LayoutClient:
+    """OCI image layout backend used when OCI_LAYOUT_PATH is set.
+
+    Tags are recorded as `<repository>:<tag>` reference names so a single
+    layout can hold several repositories. File-backed blobs are placed with
+    reflinks or hardlinks where the filesystem allows, see `place_file`.
+    """
+
+    # A layout has no registry; references into it carry none.
+    registry = ""
+
+    def __init__(self, root: Path, link_mode: str = "auto"):
+        if link_mode not in LAYOUT_LINK_MODES:
+            fail(f"unsupported layout link mode: {link_mode}")
+        self.root = root
+        self.link_mode = link_mode
+        self.placements: dict[str, int] = {}
+        self._lock = threading.Lock()
+        (root / "blobs" / "sha256").mkdir(parents=True, exist_ok=True)
+        layout_file = root / "oci-layout"
+        if not layout_file.is_file():
+            write_json(layout_file, {"imageLayoutVersion": "1.0.0"})
+        if not (root / "index.json").is_file():
+            write_json(
+                root / "index.json",
+                {
+                    "schemaVersion": 2,
+                    "mediaType": OCI_INDEX_MEDIA_TYPE,
+                    "manifests": [],
+                },
+            )
+
+    def close(self) -> None:
+        """Nothing to release for a layout."""
+
+    def blob_file(self, digest: str) -> Path:
+        """Return the path of a blob inside the layout."""
+        algorithm, _, encoded = digest.partition(":")
+        return self.root / "blobs" / algorithm / encoded
+
+    def blob_exists(self, _repository: str, digest: str) -> bool:
+        """Return whether the layout already holds a blob."""
+        return self.blob_file(digest).is_file()
+
+    def get_blob(self, repository: str, digest: str) -> bytes:
+        """Read a blob from the layout."""
+        if not self.blob_exists(repository, digest):
+            fail(f"blob {digest} is missing from the layout {self.root}")
+        return self.blob_file(digest).read_bytes()
+
+    def push_blob(
+        self,
+        repository: str,
+        blob: Blob,
+        *,
+        state: UploadState | None = None,  # pylint: disable=unused-argument
+    ) -> None:
+        """Store a blob, writing or linking through a temporary file."""
+        if self.blob_exists(repository, blob.digest):
+            return
+        destination = self.blob_file(blob.digest)
+        temporary = destination.with_name(f".{destination.name}.{uuid.uuid4().hex}")
+        try:
+            if (data := blob.payload()) is not None:
+                temporary.write_bytes(data)
+                method = "write"
+            else:
+                method = place_file(blob_path(blob), temporary, self.link_mode)
+            os.replace(temporary, destination)
+            with self._lock:
+                self.placements[method] = self.placements.get(method, 0) + 1
+        finally:
+            temporary.unlink(missing_ok=True)
+
+    def push_stream(
+        self,
+        repository: str,  # pylint: disable=unused-argument
+        media_type: str,
+        produce: StreamProducer,
+        title: str,
+    ) -> Blob:
+        """Store a blob generated on the fly, digesting it while writing."""
+        blobs_dir = self.root / "blobs" / "sha256"
+        blobs_dir.mkdir(parents=True, exist_ok=True)
+        temporary = blobs_dir / f".stream.{uuid.uuid4().hex}"
+        try:
+            with temporary.open("wb") as handle:
+                writer = DigestingWriter(handle.write, HTTP_BLOCK_SIZE)
+                produce(writer)
+                writer.flush()
+            os.replace(temporary, self.blob_file(writer.digest))
+        finally:
+            temporary.unlink(missing_ok=True)
+        return Blob(
+            media_type=media_type, digest=writer.digest, size=writer.size, title=title
+        )
+
+    @contextmanager
+    def _index(self) -> Iterator[dict[str, Any]]:
+        """Lock, load and atomically rewrite index.json."""
+        index_path = self.root / "index.json"
+        with self._lock:
+            descriptor = os.open(self.root, os.O_RDONLY)
+            try:
+                fcntl.flock(descriptor, fcntl.LOCK_EX)
+                index = read_json(index_path)
+                yield index
+                write_json_atomic(index_path, index)
+            finally:
+                os.close(descriptor)
+
+    def _descriptors(self) -> list[dict[str, Any]]:
+        return read_json(self.root / "index.json").get("manifests", [])
+
+    def put_manifest(
+        self,
+        repository: str,
+        reference: str,
+        data: bytes,
+        media_type: str,
+        *,
+        subject: str | None = None,  # pylint: disable=unused-argument
+    ) -> str:
+        """Store a manifest and record it in index.json."""
+        blob = Blob.from_bytes(data, media_type)
+        self.push_blob(repository, blob)
+        descriptor = blob.descriptor()
+        if artifact_type := json.loads(data).get("artifactType"):
+            descriptor["artifactType"] = artifact_type
+
+        ref_name = (
+            "" if reference.startswith("sha256:") else f"{repository}:{reference}"
+        )
+        with self._index() as index:
+            manifests = [
+                item
+                for item in index["manifests"]
+                if not (
+                    ref_name
+                    and item.get("annotations", {}).get(REF_NAME_ANNOTATION) == ref_name
+                )
+            ]
+            if ref_name:
+                descriptor["annotations"] = {REF_NAME_ANNOTATION: ref_name}
+                manifests.append(descriptor)
+            elif not any(item["digest"] == blob.digest for item in manifests):
+                manifests.append(descriptor)
+            index["manifests"] = manifests
+        return blob.digest
+
+    def get_manifest(
+        self, repository: str, reference: str
+    ) -> tuple[bytes, str, str] | None:
+        """Return the manifest bytes, media type and digest, if present."""
+        if reference.startswith("sha256:"):
+            digest = reference
+        else:
+            ref_name = f"{repository}:{reference}"
+            digest = next(
+                (
+                    item["digest"]
+                    for item in self._descriptors()
+                    if item.get("annotations", {}).get(REF_NAME_ANNOTATION) == ref_name
+                ),
+                "",
+            )
+        if not digest or not self.blob_exists(repository, digest):
+            return None
+        data = self.blob_file(digest).read_bytes()
+        return data, json.loads(data).get("mediaType", OCI_MANIFEST_MEDIA_TYPE), digest
+
+    def resolve(self, repository: str, reference: str) -> dict[str, Any] | None:
+        """Return the descriptor of a manifest, if present."""
+        stored = self.get_manifest(repository, reference)
+        if stored is None:
+            return None
+        data, media_type, digest = stored
+        return {"mediaType": media_type, "digest": digest, "size": len(data)}
+
+    def referrers(self, repository: str, digest: str) -> list[dict[str, Any]]:
+        """List manifests in the layout whose subject is `digest`."""
+        referrers = []
+        for item in self._descriptors():
+            if item.get("mediaType") != OCI_MANIFEST_MEDIA_TYPE:
+                continue
+            if not self.blob_exists(repository, item["digest"]):
+                continue
+            data = self.blob_file(item["digest"]).read_bytes()
+            if json.loads(data).get("subject", {}).get("digest") == digest:
+                referrers.append(referrer_descriptor(data, item["digest"]))
+        return list({item["digest"]: item for item in referrers}.values())
+
+
+@dataclass
+class Span:
+    """One timed publish phase."""
+
+    name: str
+    span_id: str
+    parent_id: str
+    start_ns: int
+    end_ns: int = 0
+    attributes: dict[str, Any] = field(default_factory=dict)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the result JSON form of the span."""
+        return {
+            "name": self.name,
+            "start": round(self.start_ns / 1e9, 6),
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+        }
+
+    def otlp(self, trace_id: str) -> dict[str, Any]:
+        """Return the span in OTLP/JSON encoding."""
+        span: dict[str, Any] = {
+            "traceId": trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [
+                {"key": key, "value": otlp_value(value)}
+                for key, value in self.attributes.items()
+            ],
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+def otlp_value(value: Any) -> dict[str, Any]:
+    """Encode an attribute value as an OTLP/JSON AnyValue."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Tracer:
+    """Timing spans of one publish, collected from any thread.
+
+    Spans nest per thread; work handed to a thread pool names its parent
+    explicitly. Every span descends from a root span that covers the
+    whole publish.
+    """
+
+    def __init__(self, name: str = "publish", **attributes: Any):
+        self.trace_id = uuid.uuid4().hex
+        self.root = Span(name, uuid.uuid4().hex[:16], "", time.time_ns(), 0, attributes)
+        self.spans: list[Span] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def current(self) -> Span:
+        """Return the innermost open span of the calling thread."""
+        stack = getattr(self._local, "stack", None)
+        return stack[-1] if stack else self.root
+
+    @contextmanager
+    def span(
+        self, name: str, *, parent: Span | None = None, **attributes: Any
+    ) -> Iterator[Span]:
+        """Time a phase; a `bytes` attribute also yields its throughput."""
+        span = Span(
+            name,
+            uuid.uuid4().hex[:16],
+            (parent or self.current()).span_id,
+            time.time_ns(),
+            attributes=attributes,
+        )
+        stack = self._local.__dict__.setdefault("stack", [])
+        stack.append(span)
+        try:
+            yield span
+        finally:
+            stack.pop()
+            span.end_ns = time.time_ns()
+            elapsed = span.end_ns - span.start_ns
+            if isinstance(span.attributes.get("bytes"), int) and elapsed > 0:
+                span.attributes["throughput_bytes_per_second"] = int(
+                    span.attributes["bytes"] * 1e9 / elapsed
+                )
+            with self._lock:
+                self.spans.append(span)
+
+    def finish(self) -> None:
+        """Close the root span."""
+        self.root.end_ns = time.time_ns()
+
+    def as_list(self) -> list[dict[str, Any]]:
+        """Return the root span and every finished span in start order."""
+        if not self.root.end_ns:
+            self.finish()
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span.start_ns)
+        return [span.as_dict() for span in [self.root, *spans]]
+
+    def otlp_spans(self) -> list[dict[str, Any]]:
+        """Return every span in OTLP/JSON encoding."""
+        if not self.root.end_ns:
+            self.finish()
+        with self._lock:
+            spans = [self.root, *self.spans]
+        return [span.otlp(self.trace_id) for span in spans]
+
+
+def otlp_trace(tracers: list[Tracer]) -> dict[str, Any]:
+    """Return an OpenTelemetry OTLP/JSON trace document for some tracers."""
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [
+                        {
+                            "key": "service.name",
+                            "value": {"stringValue": "oci-publish"},
+                        }
+                    ]
+                },
+                "scopeSpans": [
+                    {
+                        "scope": {"name": "oci-publish"},
+                        "spans": [
+                            span for tracer in tracers for span in tracer.otlp_spans()
+                        ],
+                    }
+                ],
+            }
+        ]
+    }
+
+
+@dataclass
+class TransferStats:
+    """Blob transfer accounting for one publish, shared between threads."""
+
+    uploaded_blobs: int = 0
+    uploaded_bytes: int = 0
+    skipped_blobs: int = 0
+    skipped_bytes: int = 0
+    tracer: Tracer = field(default_factory=Tracer, repr=False, compare=False)
+    lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
+    )
+
+    def record(self, blob: Blob, *, uploaded: bool) -> None:
+        """Account one blob as uploaded or as already present."""
+        with self.lock:
+            if uploaded:
+                self.uploaded_blobs += 1
+                self.uploaded_bytes += blob.size
+            else:
+                self.skipped_blobs += 1
+                self.skipped_bytes += blob.size
+
+    def as_dict(self) -> dict[str, int] | None:
+        """Return the result JSON form, or None when nothing was recorded."""
+        if not self.uploaded_blobs and not self.skipped_blobs:
+            return None
+        return {
+            "uploaded_blobs": self.uploaded_blobs,
+            "uploaded_bytes": self.uploaded_bytes,
+            "skipped_blobs": self.skipped_blobs,
+            "skipped_bytes": self.skipped_bytes,
+        }
+
+
+@dataclass(frozen=True)
+class PublishFile:
+    """A file to publish, relative to the publish working directory.
+
+    With `chunk_size`, the native backend publishes the file as a chunk
+    index layer plus content-defined chunk layers, see `chunk_blobs`.
+    """
+
+    path: str
+    media_type: str
+    chunk_size: int | None = None
+
+
+class Publisher(Protocol):
+    """Backend-neutral interface used by the publish stages."""
+
+    def push(
+        self,
+        *,
+        reference: str,
+        artifact_type: str,
+        config: PublishFile,
+        files: list[PublishFile],
+        annotations: dict[str, str],
+        cwd: Path,
+        stats: TransferStats | None = None,
+        reuse: bool = False,
+    ) -> dict[str, Any]:
+        """Push a manifest with config and layers; return digest and mediaType.
+
+        With `reuse`, an equivalent manifest already under the reference is
+        kept instead and reported with `"reused": True`. Publishers that
+        build the manifest themselves also return its layer descriptors.
+        """
+
+    def attach(
+        self,
+        *,
+        subject_reference: str,
+        artifact_type: str,
+        files: list[PublishFile],
+        annotations: dict[str, str],
+        cwd: Path,
+        stats: TransferStats | None = None,
+        reuse: bool = False,
+    ) -> dict[str, Any]:
+        """Attach a referrer manifest to a subject; return its digest.
+
+        With `reuse`, an equivalent referrer already linked to the subject is
+        kept instead and reported with `"reused": True`.
+        """
+
+    def attach_stream(
+        self,
+        *,
+        subject_reference: str,
+        artifact_type: str,
+        layer: PublishFile,
+        produce: StreamProducer,
+        annotations: dict[str, str],
+    ) -> dict[str, Any]:
+        """Attach a referrer whose single layer is written by `produce`."""
+
+    def tag(self, reference: str, tags: list[str]) -> list[str]:
+        """Add tags to an existing manifest; return tags that already matched."""
+
+
+class OrasPublisher:
+    """Publisher backed by `oras` subprocesses."""
+
+    def __init__(self, common_args: list[str], retry: RetryPolicy | None = None):
+        self.common_args = common_args
+        self.retry = retry or RetryPolicy()
+
+    def push(
+        self,
+        *,
+        reference: str,
+        artifact_type: str,
+        config: PublishFile,
+        files: list[PublishFile],
+        annotations: dict[str, str],
+        cwd: Path,
+        stats: TransferStats | None = None,
+        reuse: bool = False,
+    ) -> dict[str, Any]:
+        """Run `oras push`; ORAS does not report per-blob transfers."""
+        del stats
+        if reuse:
+            fail("incremental republish requires the native backend")
+        if any(file.chunk_size for file in files):
+            fail("chunked layers require the native backend")
+        return self.retry.call(
+            f"push {reference}",
+            run_oras,
+            [
+                "push",
+                *self.common_args,
+                *annotation_args(annotations),
+                "--disable-path-validation",
+                "--artifact-type",
+                artifact_type,
+                "--config",
+                f"{config.path}:{config.media_type}",
+                reference,
+                *[f"{file.path}:{file.media_type}" for file in files],
+            ],
+            cwd=cwd,
+        )
+
+    def attach(
+        self,
+        *,
+        subject_reference: str,
+        artifact_type: str,
+        files: list[PublishFile],
+        annotations: dict[str, str],
+        cwd: Path,
+        stats: TransferStats | None = None,
+        reuse: bool = False,
+    ) -> dict[str, Any]:
+        """Run `oras attach`; ORAS does not report per-blob transfers."""
+        del stats
+        if reuse:
+            fail("incremental republish requires the native backend")
+        return self.retry.call(
+            f"attach {artifact_type} to {subject_reference}",
+            run_oras,
+            [
+                "attach",
+                *self.common_args,
+                *annotation_args(annotations),
+                "--disable-path-validation",
+                "--artifact-type",
+                artifact_type,
+                subject_reference,
+                *[f"{file.path}:{file.media_type}" for file in files],
+            ],
+            cwd=cwd,
+        )
+
+    def attach_stream(
+        self,
+        *,
+        subject_reference: str,
+        artifact_type: str,
+        layer: PublishFile,
+        produce: StreamProducer,
+        annotations: dict[str, str],
+    ) -> dict[str, Any]:
+        """Stage the generated layer in a temporary file for `oras attach`."""
+        with tempfile.TemporaryDirectory(prefix="oci-stream-") as staging_dir:
+            with (Path(staging_dir) / layer.path).open("wb") as handle:
+                produce(handle)
+            return self.attach(
+                subject_reference=subject_reference,
+                artifact_type=artifact_type,
+                files=[layer],
+                annotations=annotations,
+                cwd=Path(staging_dir),
+            )
+
+    def tag(self, reference: str, tags: list[str]) -> list[str]:
+        """Run `oras tag`, which always rewrites every tag."""
+        self.retry.call(
+            f"tag {reference}",
+            run_oras_command,
+            ["tag", *self.common_args, reference, *tags],
+        )
+        return []
+
+
+class FairScheduler:  # pylint: disable=too-few-public-methods
+    """Share a fixed number of upload slots fairly between concurrent jobs.
+
+    A free slot goes to the waiting job with the fewest uploads in flight,
+    and jobs with equal shares take turns, so a large target cannot starve
+    small test-results or attestation uploads.
+    """
+
+    def __init__(self, slots: int):
+        self.slots = slots
+        self._free = slots
+        self._active: dict[str, int] = {}
+        self._waiting: dict[str, int] = {}
+        self._condition = threading.Condition()
+
+    def _next_job(self) -> str:
+        return min(self._waiting, key=lambda job: self._active.get(job, 0))
+
+    @contextmanager
+    def slot(self, job: str) -> Iterator[None]:
+        """Hold one upload slot on behalf of `job`."""
+        with self._condition:
+            self._waiting[job] = self._waiting.get(job, 0) + 1
+            while not (self._free and self._next_job() == job):
+                self._condition.wait()
+            # Requeue the job behind the others so equal jobs take turns.
+            remaining = self._waiting.pop(job) - 1
+            if remaining:
+                self._waiting[job] = remaining
+            self._free -= 1
+            self._active[job] = self._active.get(job, 0) + 1
+            # The next waiting job changed; let it claim a remaining slot.
+            self._condition.notify_all()
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._free += 1
+                self._active[job] -= 1
+                if not self._active[job]:
+                    del self._active[job]
+                self._condition.notify_all()
+
+
+class NativePublisher:
+    """Publisher backed by the in-process registry or layout client."""
+
+    def __init__(
+        self,
+        client: RegistryClient | LayoutClient,
+        *,
+        blob_workers: int = DEFAULT_BLOB_WORKERS,
+        scheduler: FairScheduler | None = None,
+        job: str = "",
+        retry: RetryPolicy | None = None,
+    ):
+        self.client = client
+        self.blob_workers = blob_workers
+        self.scheduler = scheduler
+        self.job = job
+        self.retry = retry or RetryPolicy()
+
+    def for_job(self, job: str) -> "NativePublisher":
+        """Return a publisher sharing this client whose uploads count as `job`."""
+        return NativePublisher(
+            self.client,
+            blob_workers=self.blob_workers,
+            scheduler=self.scheduler,
+            job=job,
+            retry=self.retry,
+        )
+
+    def parse(self, reference: str) -> Reference:
+        """Parse a reference, refusing one that names another registry.
+
+        The client only talks to its configured registry or layout, so a
+        reference on another registry would silently resolve against the
+        wrong one.
+        """
+        parsed = parse_reference(reference)
+        if parsed.registry and parsed.registry != self.client.registry:
+            destination = (
+                f"OCI layout {self.client.root}"
+                if isinstance(self.client, LayoutClient)
+                else f"registry {self.client.registry}"
+            )
+            fail(
+                f"'{reference}' is on registry {parsed.registry}, "
+                f"but publishing to {destination}"
+            )
+        return parsed
+
+    def _slot(self) -> AbstractContextManager[None]:
+        """Wait for an upload slot when uploads are shared between jobs."""
+        if self.scheduler is None:
+            return nullcontext()
+        return self.scheduler.slot(self.job)
+
+    def _upload(
+        self,
+        repository: str,
+        blobs: list[Blob],
+        stats: TransferStats | None,
+        cwd: Path | None,
+    ) -> None:
+        """Upload only the blobs the registry or layout does not hold yet.
+
+        Digests are known up front, so existence is checked for every blob
+        before the first upload starts; shared content is sent once. Missing
+        blobs upload concurrently, largest first, which keeps the makespan
+        close to the largest blob. The caller commits the manifest only after
+        this returns, i.e. after every blob has landed. Each check and
+        upload is retried on its own; a retried chunked upload resumes at
+        its last acknowledged chunk.
+        """
+        stats = stats or TransferStats()
+        tracer = stats.tracer
+        unique = list({blob.digest: blob for blob in blobs}.values())
+        missing = []
+        with tracer.span("blobs.check", blobs=len(unique)) as check:
+            for blob in unique:
+                if self.retry.call(
+                    f"check {blob.digest}",
+                    self.client.blob_exists,
+                    repository,
+                    blob.digest,
+                ):
+                    stats.record(blob, uploaded=False)
+                else:
+                    missing.append(blob)
+            check.attributes["missing"] = len(missing)
+        missing.sort(key=lambda blob: blob.size, reverse=True)
+        state = UploadState.for_directory(cwd) if cwd else None
+        parent = tracer.current()
+
+        def upload(blob: Blob) -> None:
+            with self._slot():
+                with tracer.span(
+                    "blob.upload",
+                    parent=parent,
+                    digest=blob.digest,
+                    title=blob.title or "",
+                    bytes=blob.size,
+                ):
+                    self.retry.call(
+                        f"upload {blob.title or blob.digest}",
+                        self.client.push_blob,
+                        repository,
+                        blob,
+                        state=state,
+                    )
+            stats.record(blob, uploaded=True)
+
+        if self.blob_workers <= 1 or len(missing) <= 1:
+            for blob in missing:
+                upload(blob)
+            return
+
+        with ThreadPoolExecutor(
+            max_workers=min(self.blob_workers, len(missing)),
+            thread_name_prefix="oci-blob",
+        ) as executor:
+            futures = [executor.submit(upload, blob) for blob in missing]
+            done, pending = wait(futures, return_when=FIRST_EXCEPTION)
+            for future in pending:
+                future.cancel()
+            for future in done:
+                future.result()
+
+    def push(
+        self,
+        *,
+        reference: str,
+        artifact_type: str,
+        config: PublishFile,
+        files: list[PublishFile],
+        annotations: dict[str, str],
+        cwd: Path,
+        stats: TransferStats | None = None,
+        reuse: bool = False,
+    ) -> dict[str, Any]:
+        """Upload missing config and layer blobs, then the manifest."""
+        parsed = self.parse(reference)
+        stats = stats or TransferStats()
+        cache = DigestCache.for_directory(cwd)
+        with stats.tracer.span("digest", files=len(files) + 1) as digesting:
+            config_blob = Blob.from_file(
+                cwd / config.path, config.media_type, cache=cache
+            )
+            layers = []
+            for file in files:
+                if file.chunk_size:
+                    layers += chunk_blobs(cwd / file.path, file.path, file.chunk_size)
+                else:
+                    layers.append(
+                        Blob.from_file(
+                            cwd / file.path, file.media_type, file.path, cache=cache
+                        )
+                    )
+            digesting.attributes["bytes"] = config_blob.size + sum(
+                layer.size for layer in layers
+            )
+        cache.flush()
+        descriptors = [layer.descriptor() for layer in layers]
+        data = image_manifest(
+            artifact_type=artifact_type,
+            config=config_blob.descriptor(),
+            layers=descriptors,
+            annotations=annotations,
+        )
+        if reuse:
+            existing = self.retry.call(
+                f"fetch {reference}",
+                self.client.get_manifest,
+                parsed.repository,
+                parsed.reference,
+            )
+            if existing and manifest_content(existing[0]) == manifest_content(data):
+                for blob in {
+                    blob.digest: blob for blob in [config_blob, *layers]
+                }.values():
+                    stats.record(blob, uploaded=False)
+                return {
+                    "digest": existing[2],
+                    "mediaType": existing[1] or OCI_MANIFEST_MEDIA_TYPE,
+                    "size": len(existing[0]),
+                    "layers": descriptors,
+                    "reused": True,
+                }
+        self._upload(parsed.repository, [config_blob, *layers], stats, cwd)
+        with stats.tracer.span("manifest.put", reference=reference, bytes=len(data)):
+            digest = self.retry.call(
+                f"put {reference}",
+                self.client.put_manifest,
+                parsed.repository,
+                parsed.reference,
+                data,
+                OCI_MANIFEST_MEDIA_TYPE,
+            )
+        return {
+            "digest": digest,
+            "mediaType": OCI_MANIFEST_MEDIA_TYPE,
+            "size": len(data),
+            "layers": descriptors,
+        }
+
+    def attach(
+        self,
+        *,
+        subject_reference: str,
+        artifact_type: str,
+        files: list[PublishFile],
+        annotations: dict[str, str],
+        cwd: Path,
+        stats: TransferStats | None = None,
+        reuse: bool = False,
+    ) -> dict[str, Any]:
+        """Upload missing layers and a referrer manifest pointing at the subject."""
+        parsed, subject = self._subject(subject_reference)
+        stats = stats or TransferStats()
+        cache = DigestCache.for_directory(cwd)
+        with stats.tracer.span("digest", files=len(files)) as digesting:
+            layers = [
+                Blob.from_file(cwd / file.path, file.media_type, file.path, cache=cache)
+                for file in files
+            ]
+            digesting.attributes["bytes"] = sum(layer.size for layer in layers)
+        cache.flush()
+        data = referrer_manifest(subject, artifact_type, layers, annotations)
+        if reuse and (linked := self._linked_referrer(parsed, subject, data)):
+            for blob in [EMPTY_CONFIG, *layers]:
+                stats.record(blob, uploaded=False)
+            return linked
+        self._upload(parsed.repository, [EMPTY_CONFIG, *layers], stats, cwd)
+        return self._put_referrer(parsed, subject, data, tracer=stats.tracer)
+
+    def attach_stream(
+        self,
+        *,
+        subject_reference: str,
+        artifact_type: str,
+        layer: PublishFile,
+        produce: StreamProducer,
+        annotations: dict[str, str],
+    ) -> dict[str, Any]:
+        """Stream the generated layer straight into the registry or layout."""
+        parsed, subject = self._subject(subject_reference)
+        with self._slot():
+            blob = self.retry.call(
+                f"upload {layer.path}",
+                self.client.push_stream,
+                parsed.repository,
+                layer.media_type,
+                produce,
+                layer.path,
+            )
+        self._upload(parsed.repository, [EMPTY_CONFIG], None, None)
+        data = referrer_manifest(subject, artifact_type, [blob], annotations)
+        return self._put_referrer(parsed, subject, data, tracer=Tracer())
+
+    def _subject(self, subject_reference: str) -> tuple[Reference, dict[str, Any]]:
+        """Resolve a subject reference to its manifest descriptor."""
+        parsed = self.parse(subject_reference)
+        subject = self.retry.call(
+            f"resolve {subject_reference}",
+            self.client.resolve,
+            parsed.repository,
+            parsed.reference,
+        )
+        if subject is None:
+            fail(f"subject manifest not found: {subject_reference}")
+        return parsed, subject
+
+    def _linked_referrer(
+        self, parsed: Reference, subject: dict[str, Any], data: bytes
+    ) -> dict[str, Any] | None:
+        """Find a referrer of the subject with the same content as `data`."""
+        content = manifest_content(data)
+        referrers = self.retry.call(
+            f"list referrers of {subject['digest']}",
+            self.client.referrers,
+            parsed.repository,
+            subject["digest"],
+        )
+        for descriptor in referrers:
+            if descriptor.get("artifactType") != content["artifactType"]:
+                continue
+            stored = self.retry.call(
+                f"fetch {descriptor['digest']}",
+                self.client.get_manifest,
+                parsed.repository,
+                descriptor["digest"],
+            )
+            if stored and manifest_content(stored[0]) == content:
+                return {
+                    "digest": stored[2],
+                    "mediaType": OCI_MANIFEST_MEDIA_TYPE,
+                    "size": len(stored[0]),
+                    "reused": True,
+                }
+        return None
+
+    def _put_referrer(
+        self,
+        parsed: Reference,
+        subject: dict[str, Any],
+        data: bytes,
+        *,
+        tracer: Tracer,
+    ) -> dict[str, Any]:
+        """Push a referrer manifest once its layers are in place."""
+        with tracer.span("manifest.put", subject=subject["digest"], bytes=len(data)):
+            digest = self.retry.call(
+                f"put referrer of {subject['digest']}",
+                self.client.put_manifest,
+                parsed.repository,
+                bytes_digest(data),
+                data,
+                OCI_MANIFEST_MEDIA_TYPE,
+                subject=subject["digest"],
+            )
+        return {
+            "digest": digest,
+            "mediaType": OCI_MANIFEST_MEDIA_TYPE,
+            "size": len(data),
+        }
+
+    def tag(self, reference: str, tags: list[str]) -> list[str]:
+        """Put the manifest under each additional tag, concurrently.
+
+        Tags that already point at the manifest digest are left alone, so
+        re-running a publish does not rewrite them.
+        """
+        parsed = self.parse(reference)
+        stored = self.retry.call(
+            f"fetch {reference}",
+            self.client.get_manifest,
+            parsed.repository,
+            parsed.reference,
+        )
+        if stored is None:
+            fail(f"manifest to tag not found: {reference}")
+        data, media_type, digest = stored
+
+        def apply(tag: str) -> bool:
+            current = self.client.resolve(parsed.repository, tag)
+            if current is not None and current["digest"] == digest:
+                return False
+            self.client.put_manifest(parsed.repository, tag, data, media_type)
+            return True
+
+        def apply_with_retry(tag: str) -> bool:
+            return self.retry.call(f"tag {parsed.repository}:{tag}", apply, tag)
+
+        unique = list(dict.fromkeys(tags))
+        if len(unique) <= 1:
+            updated = [apply_with_retry(tag) for tag in unique]
+        else:
+            with ThreadPoolExecutor(
+                max_workers=min(len(unique), HTTP_POOL_SIZE),
+                thread_name_prefix="oci-tag",
+            ) as executor:
+                updated = list(executor.map(apply_with_retry, unique))
+        return [tag for tag, changed in zip(unique, updated) if not changed]
+
+
+@dataclass(frozen=True)
+class ClientOptions:
+    """Tuning and session options for the publish backends."""
+
+    chunk_size: int = DEFAULT_UPLOAD_CHUNK_SIZE
+    blob_workers: int = DEFAULT_BLOB_WORKERS
+    max_bandwidth: int | None = None
+    layout_link: str = "auto"
+    session_cache: Path | None = None
+    session_ttl: int = DEFAULT_SESSION_TTL
+    retries: int = DEFAULT_RETRIES
+
+
+def client_options(args: argparse.Namespace) -> ClientOptions:
+    """Build native client options from parsed CLI arguments."""
+    return ClientOptions(
+        chunk_size=args.chunk_size,
+        blob_workers=args.blob_workers,
+        max_bandwidth=args.max_bandwidth,
+        layout_link=args.layout_link,
+        session_cache=Path(args.session_cache) if args.session_cache else None,
+        session_ttl=args.session_ttl,
+        retries=args.retries,
+    )
+
+
+class SessionCache:
+    """Opt-in cache of registry login sessions shared between invocations.
+
+    Sessions live in a private directory, one subdirectory per registry,
+    username and password, and are trusted for `ttl` seconds after login.
+    Subdirectories are named by an HMAC of the credentials under a random
+    key kept in the cache, so the names cannot be used to guess passwords.
+    The password only ever reaches `oras login` on stdin, but the stored
+    session grants registry access, hence the private directory and the
+    removal of expired sessions whenever the cache is used.
+    """
+
+    def __init__(self, root: Path, ttl: int = DEFAULT_SESSION_TTL):
+        self.root = root
+        self.ttl = ttl
+
+    def _private_root(self) -> Path:
+        """Create the cache root and check that only the current user can use it."""
+        self.root.mkdir(mode=0o700, parents=True, exist_ok=True)
+        status = self.root.stat()
+        if status.st_uid != os.getuid() or status.st_mode & 0o077:
+            fail(
+                "session cache must be a directory private to the current user "
+                f"(mode 0700): {self.root}"
+            )
+        return self.root
+
+    def _secret(self) -> bytes:
+        """Return the cache's HMAC key, creating it on first use."""
+        key_path = self._private_root() / SESSION_KEY_NAME
+        if not key_path.is_file():
+            fd, temp_name = tempfile.mkstemp(dir=self.root, prefix=".key-")
+            try:
+                os.write(fd, os.urandom(32))
+                os.close(fd)
+                # Linking never replaces a key a concurrent run created first.
+                os.link(temp_name, key_path)
+            except FileExistsError:
+                pass
+            finally:
+                os.unlink(temp_name)
+        return key_path.read_bytes()
+
+    def _directory(self, registry: str, username: str, password: str) -> Path:
+        """Return the session directory of a set of credentials."""
+        key = hmac.new(
+            self._secret(),
+            "\0".join((registry, username, password)).encode(),
+            hashlib.sha256,
+        ).hexdigest()
+        return self.root / key[:32]
+
+    @contextmanager
+    def lock(self, registry: str, username: str, password: str) -> Iterator[Path]:
+        """Lock and return the session directory of a set of credentials."""
+        self.prune()
+        with self._locked(
+            self._directory(registry, username, password), fcntl.LOCK_EX
+        ) as directory:
+            yield directory
+
+    @contextmanager
+    def hold(self, directory: Path) -> Iterator[None]:
+        """Keep a session from being pruned while a command uses it."""
+        with self._locked(directory, fcntl.LOCK_SH):
+            yield
+
+    @contextmanager
+    def _locked(self, directory: Path, operation: int) -> Iterator[Path]:
+        """Create and flock a session directory."""
+        while True:
+            directory.mkdir(mode=0o700, exist_ok=True)
+            descriptor = os.open(directory, os.O_RDONLY)
+            try:
+                fcntl.flock(descriptor, operation)
+                # Retry if a concurrent prune removed the directory meanwhile.
+                if (
+                    directory.is_dir()
+                    and directory.stat().st_ino == os.fstat(descriptor).st_ino
+                ):
+                    yield directory
+                    return
+            finally:
+                os.close(descriptor)
+
+    def _expired(self, directory: Path) -> bool:
+        """Return whether a session is past its TTL.
+
+        A directory without a readable record counts from its last change,
+        so one that is still being logged into is left alone.
+        """
+        try:
+            created = read_json(directory / SESSION_RECORD_NAME).get("created", 0)
+        except (OSError, json.JSONDecodeError, AttributeError):
+            try:
+                created = directory.stat().st_mtime
+            except OSError:
+                return False
+        return not 0 <= time.time() - created < self.ttl
+
+    def prune(self) -> None:
+        """Remove expired sessions that no invocation is using."""
+        if not self.root.is_dir():
+            return
+        for directory in self._private_root().iterdir():
+            if not directory.is_dir() or not self._expired(directory):
+                continue
+            try:
+                descriptor = os.open(directory, os.O_RDONLY)
+            except OSError:
+                continue
+            try:
+                fcntl.flock(descriptor, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                if self._expired(directory):
+                    shutil.rmtree(directory, ignore_errors=True)
+            except BlockingIOError:
+                pass
+            finally:
+                os.close(descriptor)
+
+    def load(self, directory: Path) -> dict[str, Any] | None:
+        """Return the session record, unless it is missing or expired."""
+        record_path = directory / SESSION_RECORD_NAME
+        if not record_path.is_file():
+            return None
+        try:
+            record = read_json(record_path)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if not 0 <= time.time() - record.get("created", 0) < self.ttl:
+            return None
+        return record
+
+    def store(self, directory: Path, *, renew: bool, **fields: Any) -> None:
+        """Update the session record; `renew` restarts its TTL after a login."""
+        record = {} if renew else (self.load(directory) or {})
+        record.setdefault("created", time.time())
+        record.update(fields)
+        write_json_atomic(directory / SESSION_RECORD_NAME, record)
+
+
+def env_flag(name: str) -> bool:
+    """Return whether a boolean environment variable is set."""
+    return os.environ.get(name, "").strip().lower() in ("1", "true", "yes")
+
+
+def oras_login(
+    registry: str,
+    username: str,
+    password: str,
+    registry_config: Path,
+    plain_http_args: list[str],
+) -> None:
+    """Log in to a registry, storing the session in `registry_config`."""
+    # Pass the password on stdin to avoid exposing OCI_PASSWORD in process arguments.
+    run_command(
+        [
+            "oras",
+            "login",
+            "-u",
+            username,
+            "--password-stdin",
+            "--registry-config",
+            str(registry_config),
+            *plain_http_args,
+            registry,
+        ],
+        stdin_text=f"{password}\n",
+    )
+
+
 @contextmanager
-def oras_publish_context() -> Iterator[tuple[list[str], str, bool]]:
-    """Return ORAS arguments and reference mode, keeping auth config alive."""
+def oras_publish_context(
+    options: ClientOptions | None = None,
+) -> Iterator[tuple[OrasPublisher, str, bool]]:
+    """Return an ORAS publisher and reference mode, keeping auth config alive."""
+    options = options or ClientOptions()
+    retry = RetryPolicy(options.retries)
     layout_path = os.environ.get("OCI_LAYOUT_PATH", "")
     if layout_path:
-        yield ["--oci-layout-path", layout_path], "", False
+        yield (
+            OrasPublisher(["--oci-layout-path", layout_path], retry),
+            "",
+            False,
+        )
         return
 
-    registry = os.environ.get("OCI_REGISTRY", "registry.vedenemo.dev")
-    username = os.environ.get("OCI_USERNAME", "jenkins")
+    registry = os.environ.get("OCI_REGISTRY", DEFAULT_REGISTRY)
+    username = os.environ.get("OCI_USERNAME", DEFAULT_USERNAME)
     password = os.environ.get("OCI_PASSWORD", "")
     if not password:
         fail("OCI_PASSWORD is required when publishing to the registry")
+    plain_http_args = ["--plain-http"] if env_flag("OCI_PLAIN_HTTP") else []
+
+    if options.session_cache:
+        cache = SessionCache(options.session_cache, options.session_ttl)
+        with cache.lock(registry, username, password) as session_dir:
+            registry_config = session_dir / "config.json"
+            if cache.load(session_dir) is None or not registry_config.is_file():
+                oras_login(
+                    registry, username, password, registry_config, plain_http_args
+                )
+                cache.store(session_dir, renew=True)
+            else:
+                print(f"[+] Reusing cached registry session for {registry}")
+        common_args = ["--registry-config", str(registry_config), *plain_http_args]
+        try:
+            with cache.hold(session_dir):
+                yield OrasPublisher(common_args, retry), f"{registry}/", True
+        finally:
+            cache.prune()
+        return
 
     with tempfile.TemporaryDirectory(prefix="oras-auth-") as registry_config_dir:
         registry_config = Path(registry_config_dir) / "config.json"
+        oras_login(registry, username, password, registry_config, plain_http_args)
 
-        # Use temp login session to avoid exposing OCI_PASSWORD in process arguments.
-        run_command(
-            [
-                "oras",
-                "login",
-                "-u",
-                username,
-                "--password-stdin",
-                "--registry-config",
-                str(registry_config),
-                registry,
-            ],
-            stdin_text=f"{password}\n",
+        common_args = ["--registry-config", str(registry_config), *plain_http_args]
+        yield OrasPublisher(common_args, retry), f"{registry}/", True
+
+
+@contextmanager
+def native_publish_context(
+    options: ClientOptions | None = None,
+) -> Iterator[tuple[NativePublisher, str, bool]]:
+    """Return an in-process publisher for the configured registry or layout."""
+    options = options or ClientOptions()
+    layout_path = os.environ.get("OCI_LAYOUT_PATH", "")
+    if layout_path:
+        publisher = NativePublisher(
+            LayoutClient(Path(layout_path), options.layout_link),
+            blob_workers=options.blob_workers,
+            retry=RetryPolicy(options.retries),
+        )
+        yield publisher, "", False
+        return
+
+    registry = os.environ.get("OCI_REGISTRY", DEFAULT_REGISTRY)
+    username = os.environ.get("OCI_USERNAME", DEFAULT_USERNAME)
+    password = os.environ.get("OCI_PASSWORD", "")
+    if not password:
+        fail("OCI_PASSWORD is required when publishing to the registry")
+
+    client = RegistryClient(
+        registry,
+        username=username,
+        password=password,
+        plain_http=env_flag("OCI_PLAIN_HTTP"),
+        chunk_size=options.chunk_size,
+        pool_size=max(HTTP_POOL_SIZE, options.blob_workers),
+        limiter=(
+            BandwidthLimiter(options.max_bandwidth) if options.max_bandwidth else None
+        ),
+    )
+    cache = (
+        SessionCache(options.session_cache, options.session_ttl)
+        if options.session_cache
+        else None
+    )
+    try:
+        if cache:
+            # A fresh session proves the credentials work; reuse its bearer
+            # tokens instead of pinging and re-authenticating.
+            with cache.lock(registry, username, password) as session_dir:
+                record = cache.load(session_dir)
+                if record is None:
+                    client.ping()
+                    cache.store(
+                        session_dir, renew=True, authorizations=client.authorizations
+                    )
+                else:
+                    client.authorizations = record.get("authorizations", {})
+                    print(f"[+] Reusing cached registry session for {registry}")
+        else:
+            client.ping()
+        publisher = NativePublisher(
+            client,
+            blob_workers=options.blob_workers,
+            retry=RetryPolicy(options.retries),
         )
+        if cache:
+            with cache.hold(session_dir):
+                yield publisher, f"{registry}/", True
+            with cache.lock(registry, username, password) as session_dir:
+                cache.store(
+                    session_dir, renew=False, authorizations=client.authorizations
+                )
+        else:
+            yield publisher, f"{registry}/", True
+    finally:
+        client.close()
+        if cache:
+            cache.prune()
+
+
+def publish_context(
+    backend: str = DEFAULT_BACKEND,
+    options: ClientOptions | None = None,
+) -> AbstractContextManager[tuple[Publisher, str, bool]]:
+    """Return the publish session context for a backend.
+
+    The context yields the publisher, the reference prefix and whether
+    referrer subjects should be addressed by digest.
+    """
+    if backend == "oras":
+        return oras_publish_context(options)
+    return native_publish_context(options)
+
+
+def session_context(
+    args: argparse.Namespace,
+) -> AbstractContextManager[tuple[Publisher, str, bool]]:
+    """Return the session a subcommand publishes through.
+
+    Jobs run by `serve` carry the daemon's long-lived session in
+    `args.session`; plain CLI runs open a session of their own.
+    """
+    session = getattr(args, "session", None)
+    if session is not None:
+        return nullcontext(session)
+    return publish_context(args.backend, client_options(args))
+
+
+@dataclass(frozen=True)
+class TargetImage:
+    """One image entry of a target manifest."""
+
+    path: str
+    role: str = ""
+    signature_path: str | None = None
+
+    @property
+    def name(self) -> str:
+        """File name the image is looked up by, e.g. from sysupdate entries."""
+        return Path(self.path).name
+
+
+@dataclass(frozen=True)
+class SysupdateArtifacts:
+    """Signed sysupdate manifest and the image files it describes."""
+
+    manifest: dict[str, Any]
+    manifest_path: str
+    signature_path: str | None
+    files: list[dict[str, str]]
+
+
+class TargetModel:
+    """Parsed target manifest.json, shared by every publish stage.
+
+    The manifest is read once. Images are validated and indexed by file
+    name and role on first use, so all lookups stay constant time for
+    targets with many split image parts. Loading a target only for the
+    batch pre-validation stays cheap.
+    """
+
+    def __init__(self, target_dir: Path, manifest: dict[str, Any]):
+        self.target_dir = target_dir
+        self.manifest = manifest
+
+    @classmethod
+    def load(cls, target_dir: Path) -> "TargetModel":
+        """Validate a target directory and load its manifest.json."""
+        manifest_path = target_dir / "manifest.json"
+        if not target_dir.is_dir() or not manifest_path.is_file():
+            fail(f"target directory or manifest.json is missing: {target_dir}")
+        return cls(target_dir, read_json(manifest_path))
+
+    @property
+    def name(self) -> str:
+        """Target name from the manifest."""
+        return self.manifest["target"]
+
+    @property
+    def source(self) -> dict[str, Any]:
+        """Source repository, revision and flake reference of the build."""
+        return self.manifest.get("source", {})
+
+    @cached_property
+    def images(self) -> list[TargetImage]:
+        """Manifest images, accepting the legacy single-image field."""
+        entries = self.manifest.get("images")
+        if entries is None:
+            image = self.manifest.get("image")
+            entries = [image] if image else []
+
+        if not isinstance(entries, list) or not entries:
+            fail("manifest must contain at least one image")
+        images = []
+        for entry in entries:
+            if not isinstance(entry, dict) or not isinstance(entry.get("path"), str):
+                fail(f"manifest image entry has no path: {entry}")
+            images.append(
+                TargetImage(
+                    path=entry["path"],
+                    role=entry.get("role") or "",
+                    signature_path=(entry.get("signature") or {}).get("path"),
+                )
+            )
+        return images
 
-        yield ["--registry-config", str(registry_config)], f"{registry}/", True
+    @cached_property
+    def images_by_name(self) -> dict[str, TargetImage]:
+        """Images keyed by file name."""
+        return {image.name: image for image in self.images}
+
+    @cached_property
+    def images_by_role(self) -> dict[str, list[TargetImage]]:
+        """Images grouped by role, in manifest order."""
+        by_role: dict[str, list[TargetImage]] = {}
+        for image in self.images:
+            by_role.setdefault(image.role, []).append(image)
+        return by_role
+
+    @cached_property
+    def attestations(self) -> dict[str, tuple[str, str | None]]:
+        """Declared attestation paths and signatures, in ATTESTATION_ROLES order."""
+        declared = self.manifest.get("attestations", {})
+        attestations = {}
+        for role in ATTESTATION_ROLES:
+            entry = declared.get(role) or {}
+            if entry.get("path"):
+                signature = entry.get("signature") or {}
+                attestations[role] = (entry["path"], signature.get("path"))
+        return attestations
+
+    @cached_property
+    def sysupdate(self) -> SysupdateArtifacts:
+        """Signed sysupdate image entries as OCI file entries."""
+        candidates = self.images_by_role.get("sysupdate-manifest") or [
+            image for image in self.images if image.path.endswith(".manifest")
+        ]
+        if not candidates:
+            fail(f"target {self.name} has no sysupdate manifest image")
+        manifest_image = candidates[0]
+        sysupdate_manifest = read_json(self.target_dir / manifest_image.path)
+        if not isinstance(sysupdate_manifest, dict):
+            fail(
+                f"sysupdate manifest {manifest_image.path} in {self.target_dir} "
+                "is not a JSON object"
+            )
+
+        files = []
+        for role in ("kernel", "root", "verity"):
+            entry = sysupdate_manifest.get(role)
+            file_name = entry.get("file") if isinstance(entry, dict) else None
+            if not isinstance(file_name, str) or not file_name:
+                fail(
+                    f"sysupdate manifest {manifest_image.path} in {self.target_dir} "
+                    f"has no '{role}.file' entry"
+                )
+            image = self.images_by_name.get(file_name)
+            if image is None:
+                fail(f"sysupdate {role} file is not a target image: {file_name}")
+            file_entry = {
+                "role": role,
+                "path": image.path,
+                "media_type": SYSUPDATE_MEDIA_TYPES[role],
+            }
+            if image.signature_path:
+                file_entry["signature_path"] = image.signature_path
+            files.append(file_entry)
+
+        return SysupdateArtifacts(
+            manifest=sysupdate_manifest,
+            manifest_path=manifest_image.path,
+            signature_path=manifest_image.signature_path,
+            files=files,
+        )
 
 
 def publish_referrer(
     *,
-    common_args: list[str],
+    publisher: Publisher,
     subject_reference: str,
     target_dir: Path,
     role: str,
     relpath: str,
     signature_relpath: str | None = None,
-) -> dict[str, str]:
-    """Attach one referrer artifact."""
+    stats: TransferStats | None = None,
+    reuse: bool = False,
+) -> dict[str, Any]:
+    """Attach one referrer artifact, or reuse an equivalent linked one."""
     media_type = REFERRER_MEDIA_TYPES[role]
 
-    files = [f"{relpath}:{media_type}"]
+    files = [PublishFile(relpath, media_type)]
     if signature_relpath:
-        files.append(f"{signature_relpath}:{DETACHED_SIGNATURE_MEDIA_TYPE}")
+        files.append(PublishFile(signature_relpath, DETACHED_SIGNATURE_MEDIA_TYPE))
 
     annotations = {
         "org.opencontainers.image.description": REFERRER_DESCRIPTIONS[role],
     }
-    output = run_oras(
-        [
-            "attach",
-            *common_args,
-            *annotation_args(annotations),
-            "--disable-path-validation",
-            "--artifact-type",
-            media_type,
-            subject_reference,
-            *files,
-        ],
-        cwd=target_dir,
-    )
+    stats = stats or TransferStats()
+    with stats.tracer.span("referrer", role=role, path=relpath) as span:
+        output = publisher.attach(
+            subject_reference=subject_reference,
+            artifact_type=media_type,
+            files=files,
+            annotations=annotations,
+            cwd=target_dir,
+            stats=stats,
+            reuse=reuse,
+        )
+        span.attributes["digest"] = output["digest"]
 
     result = {
         "path": relpath,
         "artifact_type": media_type,
         "digest": output["digest"],
     }
+    if output.get("reused"):
+        result["reused"] = True
 
     return result
 
 
 def publish_attestations(
     *,
-    manifest: dict[str, Any],
-    common_args: list[str],
+    target: TargetModel,
+    publisher: Publisher,
     subject_reference: str,
-    target_dir: Path,
+    workers: int = 1,
+    stats: TransferStats | None = None,
+    reuse: bool = False,
+    progress: PublishProgress | None = None,
 ) -> dict[str, Any]:
-    """Attach attestation referrers declared in the build manifest."""
-    referrers: dict[str, Any] = {}
-    attestations = manifest["attestations"]
-    for role in ("provenance", "sbom_cyclonedx", "sbom_spdx", "sbom_csv"):
-        relpath = attestations[role]["path"]
-        if not relpath:
-            continue
-
-        signature_relpath = None
-        signature = attestations[role].get("signature")
-        if signature:
-            signature_relpath = attestations[role]["signature"]["path"]
-
-        referrers[role] = publish_referrer(
-            common_args=common_args,
-            subject_reference=subject_reference,
-            target_dir=target_dir,
-            role=role,
-            relpath=relpath,
-            signature_relpath=signature_relpath,
-        )
+    """Attach attestation referrers declared in the build manifest.
 
-    return referrers
+    Referrers are independent of each other, so up to `workers` of them are
+    attached concurrently. The returned mapping always follows
+    ATTESTATION_ROLES order, regardless of completion order. Referrers
+    `progress` recorded as attached by an earlier run are not attached again.
+    """
+    progress = progress or PublishProgress()
+    jobs: dict[str, dict[str, Any]] = {}
+    for role, (relpath, signature_relpath) in target.attestations.items():
+        jobs[role] = {
+            "publisher": publisher,
+            "subject_reference": subject_reference,
+            "target_dir": target.target_dir,
+            "role": role,
+            "relpath": relpath,
+            "signature_relpath": signature_relpath,
+            "stats": stats,
+            "reuse": reuse,
+        }
 
+    if workers <= 1 or len(jobs) <= 1:
+        return {
+            role: progress.run(f"referrer:{role}", publish_referrer, **job)
+            for role, job in jobs.items()
+        }
 
-def normalized_images(manifest: dict[str, Any]) -> list[dict[str, Any]]:
-    """Return manifest images, accepting the legacy single-image field."""
-    images = manifest.get("images")
-    if images is None:
-        image = manifest.get("image")
-        images = [image] if image else []
+    with ThreadPoolExecutor(
+        max_workers=min(workers, len(jobs)), thread_name_prefix="oci-referrer"
+    ) as executor:
+        futures = {
+            role: executor.submit(
+                progress.run, f"referrer:{role}", publish_referrer, **job
+            )
+            for role, job in jobs.items()
+        }
+        return {role: future.result() for role, future in futures.items()}
 
-    if not isinstance(images, list) or not images:
-        fail("manifest must contain at least one image")
 
-    return images
+def publish_referrers_and_tags(
+    *,
+    target: TargetModel,
+    publisher: Publisher,
+    subject_reference: str,
+    primary_reference: str,
+    tags: list[str],
+    referrer_workers: int,
+    stats: TransferStats,
+    reuse: bool = False,
+    progress: PublishProgress | None = None,
+) -> tuple[dict[str, Any], list[str]]:
+    """Attach referrers and apply tags in parallel.
 
+    Both only depend on the pushed primary manifest, so tagging runs in the
+    background while the referrers are attached. Returns the referrers and
+    the tags that already pointed at the primary digest.
+    """
+    progress = progress or PublishProgress()
 
-def parse_sysupdate_artifacts(
-    *, manifest: dict[str, Any], target_dir: Path
-) -> tuple[dict[str, Any], str, str | None, list[dict[str, str]]]:
-    """Parse signed sysupdate image entries and return OCI file entries."""
-    images = normalized_images(manifest)
-    sysupdate_manifest_image = next(
-        image
-        for image in images
-        if image.get("role") == "sysupdate-manifest"
-        or image["path"].endswith(".manifest")
-    )
-    sysupdate_manifest_path = sysupdate_manifest_image["path"]
-    sysupdate_manifest = read_json(target_dir / sysupdate_manifest_path)
-    sysupdate_manifest_signature_path = sysupdate_manifest_image.get(
-        "signature", {}
-    ).get("path")
+    def apply_tags() -> list[str]:
+        with stats.tracer.span("tag", tags=len(tags)) as span:
+            unchanged = progress.run("tags", publisher.tag, primary_reference, tags)
+            span.attributes["unchanged"] = len(unchanged)
+        return unchanged
 
-    images_by_name = {Path(image["path"]).name: image for image in images}
-    files = []
-    for role in ("kernel", "root", "verity"):
-        image = images_by_name[sysupdate_manifest[role]["file"]]
-        file_entry = {
-            "role": role,
-            "path": image["path"],
-            "media_type": SYSUPDATE_MEDIA_TYPES[role],
-        }
-        signature_relpath = image.get("signature", {}).get("path")
-        if signature_relpath:
-            file_entry["signature_path"] = signature_relpath
-        files.append(file_entry)
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="oci-tag") as executor:
+        tagging = executor.submit(apply_tags) if tags else None
+        with stats.tracer.span("referrers", workers=referrer_workers):
+            referrers = publish_attestations(
+                target=target,
+                publisher=publisher,
+                subject_reference=subject_reference,
+                workers=referrer_workers,
+                stats=stats,
+                reuse=reuse,
+                progress=progress,
+            )
+        unchanged_tags = tagging.result() if tagging else []
+    if unchanged_tags:
+        print(f"[+] Tags already up to date: {', '.join(unchanged_tags)}")
+    return referrers, unchanged_tags
 
-    return (
-        sysupdate_manifest,
-        sysupdate_manifest_path,
-        sysupdate_manifest_signature_path,
-        files,
-    )
 
+def test_results_archive_writer(results_dir: Path) -> StreamProducer:
+    """Validate the test results and return a producer streaming their tar.
 
-def create_test_results_archive(results_dir: Path, archive_path: Path) -> None:
-    """Create a tar archive containing the test results."""
+    The archive is written in tarfile's stream mode, so it is never staged on
+    disk and can be piped straight into an upload.
+    """
     if not results_dir.is_dir():
         fail(f"test results directory is missing: {results_dir}")
 
@@ -295,80 +3155,195 @@ def create_test_results_archive(results_dir: Path, archive_path: Path) -> None:
     if not test_results_json.is_file():
         fail(f"test results summary is missing: {test_results_json}")
 
-    archive_path.parent.mkdir(parents=True, exist_ok=True)
-    with tarfile.open(archive_path, "w") as archive:
-        archive.add(results_dir, arcname=results_dir.name, recursive=True)
-        archive.add(test_results_json, arcname=test_results_json.name)
+    def write(fileobj: Writable) -> None:
+        with tarfile.open(fileobj=fileobj, mode="w|") as archive:
+            archive.add(results_dir, arcname=results_dir.name, recursive=True)
+            archive.add(test_results_json, arcname=test_results_json.name)
+
+    return write
+
+
+def compressed_writer(
+    produce: StreamProducer, codec: str, level: int | None = None
+) -> tuple[StreamProducer, PublishFile]:
+    """Wrap a producer so its output is compressed with `codec`.
+
+    Returns the wrapped producer and the layer it should be published as.
+    gzip runs in-process; zstd runs as a multi-threaded `zstd` subprocess fed
+    from a helper thread while the compressed output is drained into the sink.
+    """
+    if codec not in TEST_RESULTS_CODECS:
+        fail(f"unsupported compression codec: {codec}")
+    media_type, title, default_level, max_level = TEST_RESULTS_CODECS[codec]
+    layer = PublishFile(title, media_type)
+    if codec == "none":
+        if level is not None:
+            fail("a compression level needs a compression codec, not 'none'")
+        return produce, layer
+    level = default_level if level is None else level
+    if not 1 <= level <= max_level:
+        fail(f"{codec} compression level must be between 1 and {max_level}")
+
+    def write_gzip(sink: Writable) -> None:
+        with gzip.GzipFile(
+            fileobj=sink, mode="wb", compresslevel=level, mtime=0
+        ) as compressed:
+            produce(compressed)
+
+    def write_zstd(sink: Writable) -> None:
+        if not shutil.which("zstd"):
+            fail("command 'zstd' is not installed")
+        errors: list[BaseException] = []
+        with subprocess.Popen(
+            ["zstd", f"-{level}", "-T0", "-q", "-c"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        ) as process:
+            assert process.stdin and process.stdout and process.stderr
+            stdin = process.stdin
+
+            def feed() -> None:
+                try:
+                    produce(stdin)
+                except BaseException as error:  # pylint: disable=broad-exception-caught
+                    errors.append(error)
+                finally:
+                    try:
+                        stdin.close()
+                    except BrokenPipeError:
+                        pass
+
+            feeder = threading.Thread(target=feed, name="oci-zstd-feed", daemon=True)
+            feeder.start()
+            try:
+                while chunk := process.stdout.read(HTTP_BLOCK_SIZE):
+                    sink.write(chunk)
+            except BaseException:
+                process.kill()
+                raise
+            finally:
+                feeder.join()
+            stderr = process.stderr.read().decode(errors="replace").strip()
+        if errors:
+            raise errors[0]
+        if process.returncode:
+            fail(stderr or f"zstd exited with status {process.returncode}")
+
+    return (write_gzip if codec == "gzip" else write_zstd), layer
+
+
+def reuse_summary(
+    primary_output: dict[str, Any],
+    referrers: dict[str, Any],
+    unchanged_tags: list[str],
+) -> dict[str, Any]:
+    """Summarize what an incremental republish found already in place."""
+    summary = {
+        "primary": bool(primary_output.get("reused")),
+        "referrers": [role for role, item in referrers.items() if item.get("reused")],
+        "attached": [
+            role for role, item in referrers.items() if not item.get("reused")
+        ],
+        "tags": unchanged_tags,
+    }
+    print(
+        f"[+] Reused {'existing' if summary['primary'] else 'no'} primary manifest "
+        f"and {len(summary['referrers'])} of {len(referrers)} referrers"
+    )
+    return summary
+
+
+def record_transfer(result: dict[str, Any], stats: TransferStats) -> None:
+    """Add blob transfer accounting to a result, when the backend reports it."""
+    transfer = stats.as_dict()
+    if transfer is None:
+        return
+    result["transfer"] = transfer
+    print(
+        f"[+] Uploaded {transfer['uploaded_blobs']} blobs "
+        f"({transfer['uploaded_bytes']} bytes), skipped "
+        f"{transfer['skipped_blobs']} already present "
+        f"({transfer['skipped_bytes']} bytes)"
+    )
 
 
 def publish_target_artifacts(
     *,
-    manifest: dict[str, Any],
-    target_dir: Path,
+    target: TargetModel,
     result_json: Path,
     repository: str,
-    common_args: list[str],
+    publisher: Publisher,
     primary_reference: str,
     primary_tag: str,
     tags: list[str],
     subject_uses_digest: bool,
-) -> int:
-    """Publish the primary artifact, referrers, and result metadata."""
+    referrer_workers: int = 1,
+    tracer: Tracer | None = None,
+    incremental: bool = False,
+    verification: list[dict[str, Any]] | None = None,
+    progress: PublishProgress | None = None,
+) -> dict[str, Any]:
+    """Publish the primary artifact, referrers, and result metadata.
+
+    Steps `progress` recorded as done by an interrupted run are skipped.
+    """
+    stats = TransferStats(tracer=tracer or Tracer())
+    progress = progress or PublishProgress()
+    target_dir = target.target_dir
     manifest_path = target_dir / "manifest.json"
     result_reference_prefix = f"{primary_reference.rsplit(':', 1)[0]}@"
-    target = manifest["target"]
-    images = normalized_images(manifest)
-    source = manifest.get("source", {})
+    source = target.source
     primary_annotations = {
         "org.opencontainers.image.description": "Disk image",
-        "org.opencontainers.image.title": target,
+        "org.opencontainers.image.title": target.name,
         "org.opencontainers.image.source": source.get("repository", ""),
         "org.opencontainers.image.revision": source.get("revision", ""),
         SOURCE_REF_ANNOTATION: source.get("flake_ref", ""),
-        TARGET_ANNOTATION: target,
+        TARGET_ANNOTATION: target.name,
     }
 
     push_files = []
-    for image in images:
-        image_path = image["path"]
-        image_signature = image["signature"]["path"]
-        push_files.append(f"{image_path}:application/octet-stream")
-        if image_signature:
-            push_files.append(f"{image_signature}:{DETACHED_SIGNATURE_MEDIA_TYPE}")
-
-    primary_output = run_oras(
-        [
+    for image in target.images:
+        push_files.append(PublishFile(image.path, "application/octet-stream"))
+        if image.signature_path:
+            push_files.append(
+                PublishFile(image.signature_path, DETACHED_SIGNATURE_MEDIA_TYPE)
+            )
+
+    with stats.tracer.span("push", reference=primary_reference):
+        primary_output = progress.run(
             "push",
-            *common_args,
-            *annotation_args(primary_annotations),
-            "--disable-path-validation",
-            "--artifact-type",
-            TARGET_ARTIFACT_TYPE,
-            "--config",
-            f"{manifest_path}:{TARGET_CONFIG_MEDIA_TYPE}",
-            primary_reference,
-            *push_files,
-        ],
-        cwd=target_dir,
-    )
+            publisher.push,
+            reference=primary_reference,
+            artifact_type=TARGET_ARTIFACT_TYPE,
+            config=PublishFile(str(manifest_path), TARGET_CONFIG_MEDIA_TYPE),
+            files=push_files,
+            annotations=primary_annotations,
+            cwd=target_dir,
+            stats=stats,
+            reuse=incremental,
+        )
     primary_digest = primary_output["digest"]
 
-    referrers = publish_attestations(
-        manifest=manifest,
-        common_args=common_args,
+    referrers, unchanged_tags = publish_referrers_and_tags(
+        target=target,
+        publisher=publisher,
         subject_reference=(
             f"{result_reference_prefix}{primary_digest}"
             if subject_uses_digest
             else primary_reference
         ),
-        target_dir=target_dir,
+        primary_reference=primary_reference,
+        tags=tags,
+        referrer_workers=referrer_workers,
+        stats=stats,
+        reuse=incremental,
+        progress=progress,
     )
 
-    if tags:
-        run_command(["oras", "tag", *common_args, primary_reference, *tags])
-
     result = {
-        "target": target,
+        "target": target.name,
         "repository": repository,
         "primary_tag": primary_tag,
         "primary": {
@@ -380,44 +3355,66 @@ def publish_target_artifacts(
         },
         "referrers": referrers,
         "tags": tags,
+        "tags_unchanged": unchanged_tags,
     }
+    if incremental:
+        result["reused"] = reuse_summary(primary_output, referrers, unchanged_tags)
+    if verification is not None:
+        result["verification"] = verification
+    if progress.resumed:
+        result["resumed"] = sorted(progress.resumed)
+    record_transfer(result, stats)
+    stats.tracer.root.attributes.update(target=target.name, digest=primary_digest)
+    stats.tracer.finish()
+    result["spans"] = stats.tracer.as_list()
     write_json(result_json, result)
 
-    print(f"[+] Published {target} as {result_reference_prefix}{primary_digest}")
+    print(f"[+] Published {target.name} as {result_reference_prefix}{primary_digest}")
     print(f"[+] Wrote publish result: {result_json}")
-    return 0
+    return result
 
 
 def publish_sysupdate_artifacts(
     *,
-    manifest: dict[str, Any],
-    target_dir: Path,
+    target: TargetModel,
     result_json: Path,
     repository: str,
-    common_args: list[str],
+    publisher: Publisher,
     primary_reference: str,
     primary_tag: str,
     tags: list[str],
     subject_uses_digest: bool,
-) -> int:
-    """Publish sysupdate artifacts, referrers, and result metadata."""
+    referrer_workers: int = 1,
+    tracer: Tracer | None = None,
+    incremental: bool = False,
+    verification: list[dict[str, Any]] | None = None,
+    root_chunk_size: int | None = None,
+    progress: PublishProgress | None = None,
+) -> dict[str, Any]:
+    """Publish sysupdate artifacts, referrers, and result metadata.
+
+    With `root_chunk_size`, the root image is published as content-defined
+    chunks, so a new version only uploads the chunks that changed. Steps
+    `progress` recorded as done by an interrupted run are skipped.
+    """
+    stats = TransferStats(tracer=tracer or Tracer())
+    progress = progress or PublishProgress()
+    target_dir = target.target_dir
     result_reference_prefix = f"{primary_reference.rsplit(':', 1)[0]}@"
-    target = manifest["target"]
-    source = manifest.get("source", {})
-    (
-        sysupdate_manifest,
-        sysupdate_manifest_path,
-        sysupdate_manifest_signature_path,
-        files,
-    ) = parse_sysupdate_artifacts(manifest=manifest, target_dir=target_dir)
+    source = target.source
+    sysupdate = target.sysupdate
+    sysupdate_manifest = sysupdate.manifest
+    sysupdate_manifest_path = sysupdate.manifest_path
+    sysupdate_manifest_signature_path = sysupdate.signature_path
+    files = [dict(file) for file in sysupdate.files]
 
     annotations = {
         "org.opencontainers.image.description": "OTA update",
-        "org.opencontainers.image.title": target,
+        "org.opencontainers.image.title": target.name,
         "org.opencontainers.image.source": source.get("repository", ""),
         "org.opencontainers.image.revision": source.get("revision", ""),
         SOURCE_REF_ANNOTATION: source.get("flake_ref", ""),
-        TARGET_ANNOTATION: target,
+        TARGET_ANNOTATION: target.name,
         "org.ghaf.ota.version": sysupdate_manifest.get("version", ""),
         "org.ghaf.ota.system": sysupdate_manifest.get("system", ""),
     }
@@ -425,47 +3422,64 @@ def publish_sysupdate_artifacts(
     push_files = []
     if sysupdate_manifest_signature_path:
         push_files.append(
-            f"{sysupdate_manifest_signature_path}:{DETACHED_SIGNATURE_MEDIA_TYPE}"
+            PublishFile(
+                sysupdate_manifest_signature_path, DETACHED_SIGNATURE_MEDIA_TYPE
+            )
         )
     for file in files:
-        push_files.append(f"{file['path']}:{file['media_type']}")
+        chunk_size = root_chunk_size if file["role"] == "root" else None
+        push_files.append(PublishFile(file["path"], file["media_type"], chunk_size))
         signature_path = file.get("signature_path")
         if signature_path:
-            push_files.append(f"{signature_path}:{DETACHED_SIGNATURE_MEDIA_TYPE}")
+            push_files.append(
+                PublishFile(signature_path, DETACHED_SIGNATURE_MEDIA_TYPE)
+            )
 
-    primary_output = run_oras(
-        [
+    with stats.tracer.span("push", reference=primary_reference):
+        primary_output = progress.run(
             "push",
-            *common_args,
-            *annotation_args(annotations),
-            "--disable-path-validation",
-            "--artifact-type",
-            SYSUPDATE_MANIFEST_MEDIA_TYPE,
-            "--config",
-            f"{target_dir / sysupdate_manifest_path}:{SYSUPDATE_MANIFEST_MEDIA_TYPE}",
-            primary_reference,
-            *push_files,
-        ],
-        cwd=target_dir,
-    )
+            publisher.push,
+            reference=primary_reference,
+            artifact_type=SYSUPDATE_MANIFEST_MEDIA_TYPE,
+            config=PublishFile(
+                str(target_dir / sysupdate_manifest_path), SYSUPDATE_MANIFEST_MEDIA_TYPE
+            ),
+            files=push_files,
+            annotations=annotations,
+            cwd=target_dir,
+            stats=stats,
+            reuse=incremental,
+        )
     primary_digest = primary_output["digest"]
+    if root_chunk_size:
+        # The root went out as its chunk index and chunks, not one layer.
+        root_file = next(file for file in files if file["role"] == "root")
+        root_file["media_type"] = SYSUPDATE_ROOT_INDEX_MEDIA_TYPE
+        root_file["layers"] = [
+            layer
+            for layer in primary_output.get("layers", [])
+            if layer["mediaType"]
+            in (SYSUPDATE_ROOT_INDEX_MEDIA_TYPE, SYSUPDATE_ROOT_CHUNK_MEDIA_TYPE)
+        ]
 
-    referrers = publish_attestations(
-        manifest=manifest,
-        common_args=common_args,
+    referrers, unchanged_tags = publish_referrers_and_tags(
+        target=target,
+        publisher=publisher,
         subject_reference=(
             f"{result_reference_prefix}{primary_digest}"
             if subject_uses_digest
             else primary_reference
         ),
-        target_dir=target_dir,
+        primary_reference=primary_reference,
+        tags=tags,
+        referrer_workers=referrer_workers,
+        stats=stats,
+        reuse=incremental,
+        progress=progress,
     )
 
-    if tags:
-        run_command(["oras", "tag", *common_args, primary_reference, *tags])
-
     result = {
-        "target": target,
+        "target": target.name,
         "repository": repository,
         "primary_tag": primary_tag,
         "primary": {
@@ -481,86 +3495,485 @@ def publish_sysupdate_artifacts(
             "root_verity_hash": sysupdate_manifest.get("root_verity_hash"),
             "manifest_path": sysupdate_manifest_path,
             "files": files,
+            "root_chunk_size": root_chunk_size,
         },
         "referrers": referrers,
         "tags": tags,
+        "tags_unchanged": unchanged_tags,
     }
+    if incremental:
+        result["reused"] = reuse_summary(primary_output, referrers, unchanged_tags)
+    if verification is not None:
+        result["verification"] = verification
+    if progress.resumed:
+        result["resumed"] = sorted(progress.resumed)
+    record_transfer(result, stats)
+    stats.tracer.root.attributes.update(target=target.name, digest=primary_digest)
+    stats.tracer.finish()
+    result["spans"] = stats.tracer.as_list()
     write_json(result_json, result)
 
     print(
-        f"[+] Published {target} sysupdate as {result_reference_prefix}{primary_digest}"
+        f"[+] Published {target.name} sysupdate as "
+        f"{result_reference_prefix}{primary_digest}"
     )
     print(f"[+] Wrote publish result: {result_json}")
-    return 0
+    return result
+
+
+@dataclass
+class SignatureCheck:
+    """One file and detached signature pair to verify before publishing."""
+
+    kind: str
+    path: Path
+    signature: Path
+    certificate: str
+    digest: str | None = None
+
+
+def verify_signature(check: SignatureCheck) -> dict[str, Any]:
+    """Verify one detached signature; runs in a verification worker process.
+
+    Images are signed with `openssl dgst -sha256 -sign`, so only their
+    streamed sha256 digest is handed to openssl. That is the OCI blob digest
+    too, and the caller keeps it for the upload. Attestations are small and
+    signed raw, as checked by verify-signature.
+    """
+    started = time.monotonic()
+    identity = file_identity(check.path)
+    digest = check.digest
+    command = ["openssl", "pkeyutl", "-verify", "-certin", "-inkey"]
+    command += [check.certificate, "-sigfile", str(check.signature)]
+    if check.kind == "image":
+        digest = digest or file_digest(check.path)
+        command += ["-pkeyopt", "digest:sha256"]
+        stdin = bytes.fromhex(digest.partition(":")[2])
+    else:
+        command += ["-rawin", "-in", str(check.path)]
+        stdin = b""
+    process = subprocess.run(command, input=stdin, capture_output=True, check=False)
+    return {
+        "ok": process.returncode == 0,
+        "error": (process.stderr or process.stdout).decode(errors="replace").strip(),
+        "seconds": round(time.monotonic() - started, 3),
+        "digest": digest,
+        "identity": identity,
+    }
+
+
+def signature_checks(target: TargetModel) -> list[SignatureCheck]:
+    """List the signed images and attestations of a target.
+
+    Images that were not signed, such as VM builds, are skipped. A listed
+    signature file that is missing is an error.
+    """
+    pairs = [("image", image.path, image.signature_path) for image in target.images]
+    pairs += [
+        ("attestation", relpath, signature_relpath)
+        for relpath, signature_relpath in target.attestations.values()
+    ]
+
+    target_dir = target.target_dir
+    cache = DigestCache.for_directory(target_dir)
+    checks = []
+    for kind, relpath, signature_relpath in pairs:
+        if not signature_relpath:
+            continue
+        path, signature = target_dir / relpath, target_dir / signature_relpath
+        for required in (path, signature):
+            if not required.is_file():
+                fail(f"file to verify is missing: {required}")
+        certificate = os.environ.get(SIGNATURE_CERTIFICATE_ENV[kind], "")
+        if not certificate:
+            fail(
+                f"{SIGNATURE_CERTIFICATE_ENV[kind]} is required to verify "
+                f"{kind} signatures"
+            )
+        digest = cache.lookup(path, file_identity(path)) if kind == "image" else None
+        checks.append(SignatureCheck(kind, path, signature, certificate, digest))
+    return checks
+
+
+def verify_target_signatures(
+    targets: list[TargetModel], workers: int
+) -> dict[Path, list[dict[str, Any]]]:
+    """Verify every signature of the given targets before anything is uploaded.
+
+    Checks run in a process pool, so digesting several images is not bound
+    by the GIL. The first failure cancels the remaining checks and aborts
+    the publish. Returns per-target verification reports, keyed by target
+    directory.
+    """
+    pending = [
+        (target.target_dir, check)
+        for target in targets
+        for check in signature_checks(target)
+    ]
+    reports: dict[Path, list[dict[str, Any]]] = {
+        target.target_dir: [] for target in targets
+    }
+    if not pending:
+        return reports
+
+    started = time.monotonic()
+    outcomes: dict[int, dict[str, Any]] = {}
+    caches = {
+        target.target_dir: DigestCache.for_directory(target.target_dir)
+        for target in targets
+    }
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(pending)),
+        mp_context=multiprocessing.get_context("forkserver"),
+    ) as executor:
+        futures = {
+            executor.submit(verify_signature, check): index
+            for index, (_, check) in enumerate(pending)
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            target_dir, check = pending[index]
+            outcome = outcomes[index] = future.result()
+            if not outcome["ok"]:
+                executor.shutdown(wait=False, cancel_futures=True)
+                fail(
+                    f"signature verification failed for {check.path}: "
+                    f"{outcome['error']}"
+                )
+            if check.digest is None and outcome["digest"]:
+                caches[target_dir].remember(
+                    check.path, outcome["identity"], outcome["digest"]
+                )
+            print(f"[+] Verified {check.path} in {outcome['seconds']}s")
+    for cache in caches.values():
+        cache.flush()
+
+    for index, (target_dir, check) in enumerate(pending):
+        reports[target_dir].append(
+            {
+                "kind": check.kind,
+                "path": str(check.path.relative_to(target_dir)),
+                "signature": str(check.signature.relative_to(target_dir)),
+                "seconds": outcomes[index]["seconds"],
+            }
+        )
+    print(
+        f"[+] Verified {len(pending)} signatures in {time.monotonic() - started:.3f}s"
+    )
+    return reports
+
+
+def publish_fingerprint(target: TargetModel, **options: Any) -> str:
+    """Fingerprint the target files and options a progress record is valid for.
+
+    Files are identified by size, mtime and inode, like in DigestCache, so
+    fingerprinting does not read the images.
+    """
+    paths = ["manifest.json"]
+    for image in target.images:
+        paths += [image.path, image.signature_path or ""]
+    for relpath, signature_relpath in target.attestations.values():
+        paths += [relpath, signature_relpath or ""]
+    files: dict[str, Any] = {}
+    for path in filter(None, paths):
+        try:
+            files[path] = file_identity(target.target_dir / path)
+        except OSError:
+            files[path] = None
+    return bytes_digest(
+        json.dumps({"files": files, "options": options}, sort_keys=True).encode()
+    )
+
+
+def publish_target_dir(
+    *,
+    target: TargetModel,
+    repository: str,
+    primary_tag: str,
+    tags: list[str],
+    result_json: Path,
+    sysupdate: bool,
+    referrer_workers: int,
+    publisher: Publisher,
+    reference_prefix: str,
+    subject_uses_digest: bool,
+    tracer: Tracer | None = None,
+    incremental: bool = False,
+    verification: list[dict[str, Any]] | None = None,
+    root_chunk_size: int | None = None,
+    resume: bool = True,
+) -> dict[str, Any]:
+    """Publish one loaded target within an existing publish context.
+
+    Progress is recorded in the target directory, so re-running a failed
+    publish with the same target files and options resumes after the last
+    completed step; `resume=False` starts over.
+    """
+    primary_reference = f"{reference_prefix}{repository}:{primary_tag}"
+    options: dict[str, Any] = {}
+    if sysupdate:
+        publish_artifacts: Callable[..., dict[str, Any]] = publish_sysupdate_artifacts
+        options["root_chunk_size"] = root_chunk_size
+    elif root_chunk_size:
+        fail("--root-chunk-size only applies to --sysupdate targets")
+    else:
+        publish_artifacts = publish_target_artifacts
+    progress = PublishProgress(
+        state_file(target.target_dir, PUBLISH_PROGRESS_NAME),
+        primary_reference,
+        publish_fingerprint(
+            target,
+            sysupdate=sysupdate,
+            tags=tags,
+            subject_uses_digest=subject_uses_digest,
+            layout=os.environ.get("OCI_LAYOUT_PATH", ""),
+            **options,
+        ),
+        resume=resume,
+    )
+    if progress.completed:
+        print(
+            f"[+] Resuming publish of {primary_reference} after "
+            f"{', '.join(progress.completed)}"
+        )
+    result = publish_artifacts(
+        **options,
+        progress=progress,
+        target=target,
+        result_json=result_json,
+        repository=repository,
+        publisher=publisher,
+        primary_reference=primary_reference,
+        primary_tag=primary_tag,
+        tags=tags,
+        subject_uses_digest=subject_uses_digest,
+        referrer_workers=referrer_workers,
+        tracer=tracer,
+        incremental=incremental,
+        verification=verification,
+    )
+    progress.finish()
+    return result
 
 
 def publish_target(args: argparse.Namespace) -> int:
     """Publish one target artifact and its referrers."""
     target_dir = Path(args.target_dir).expanduser().resolve()
-    manifest_path = target_dir / "manifest.json"
     result_json = Path(args.result_json).expanduser().resolve()
-
-    if not target_dir.is_dir() or not manifest_path.is_file():
-        fail("target directory or manifest.json is missing")
-
-    manifest = read_json(manifest_path)
+    target = TargetModel.load(target_dir)
     repository = normalize_repository(args.repository)
+    tracer = Tracer(repository=repository)
+    verification = None
+    if args.verify_signatures:
+        with tracer.span("verify"):
+            reports = verify_target_signatures([target], args.verify_workers)
+        verification = reports[target_dir]
 
-    with oras_publish_context() as (
-        common_args,
-        reference_prefix,
-        subject_uses_digest,
-    ):
-        primary_reference = f"{reference_prefix}{repository}:{args.primary_tag}"
-        publish_artifacts = (
-            publish_sysupdate_artifacts if args.sysupdate else publish_target_artifacts
-        )
-        return publish_artifacts(
-            manifest=manifest,
-            target_dir=target_dir,
-            result_json=result_json,
+    with ExitStack() as stack:
+        with tracer.span("login"):
+            publisher, reference_prefix, subject_uses_digest = stack.enter_context(
+                session_context(args)
+            )
+        publish_target_dir(
+            target=target,
             repository=repository,
-            common_args=common_args,
-            primary_reference=primary_reference,
             primary_tag=args.primary_tag,
             tags=list(args.tags),
+            result_json=result_json,
+            sysupdate=args.sysupdate,
+            referrer_workers=args.referrer_workers,
+            publisher=publisher,
+            reference_prefix=reference_prefix,
             subject_uses_digest=subject_uses_digest,
+            tracer=tracer,
+            incremental=args.incremental,
+            verification=verification,
+            root_chunk_size=args.root_chunk_size,
+            resume=not args.restart,
+        )
+    write_trace(args.trace_json, [tracer])
+    return 0
+
+
+def resolve_target_dirs(target_dirs: list[str], patterns: list[str]) -> list[Path]:
+    """Expand explicit target directories and globs, preserving order."""
+    resolved: list[Path] = []
+    for target_dir in target_dirs:
+        resolved.append(Path(target_dir).expanduser().resolve())
+    for pattern in patterns:
+        matches = sorted(glob.glob(os.path.expanduser(pattern)))
+        if not matches:
+            fail(f"target glob matched nothing: {pattern}")
+        resolved.extend(
+            Path(match).resolve()
+            for match in matches
+            if (Path(match) / "manifest.json").is_file()
+        )
+
+    unique = list(dict.fromkeys(resolved))
+    if not unique:
+        fail("no target directories to publish")
+    return unique
+
+
+def target_repository(template: str, *, target_dir: Path, target: str) -> str:
+    """Render the repository for one target from a template."""
+    try:
+        repository = template.format(target=target, dirname=target_dir.name)
+    except (KeyError, IndexError) as error:
+        fail(f"invalid repository template '{template}': unknown field {error}")
+    return normalize_repository(repository)
+
+
+def publish_targets(args: argparse.Namespace) -> int:
+    """Publish many targets concurrently within one registry session."""
+    result_json = Path(args.result_json).expanduser().resolve()
+    target_dirs = resolve_target_dirs(list(args.target_dirs), list(args.globs))
+
+    # Validate every target before logging in, so a typo does not leave a
+    # partially published batch behind.
+    jobs = []
+    for target_dir in target_dirs:
+        target = TargetModel.load(target_dir)
+        jobs.append(
+            {
+                "target": target,
+                "repository": target_repository(
+                    args.repository_template,
+                    target_dir=target_dir,
+                    target=target.name,
+                ),
+                "result_json": target_dir / args.target_result_name,
+            }
         )
 
+    batch_tracer = Tracer("publish-batch", targets=len(jobs))
+    tracers = [batch_tracer]
+    reports: dict[Path, list[dict[str, Any]]] = {}
+    if args.verify_signatures:
+        with batch_tracer.span("verify"):
+            reports = verify_target_signatures(
+                [job["target"] for job in jobs], args.verify_workers
+            )
+
+    def publish_job(job: dict[str, Any]) -> dict[str, Any]:
+        target_dir = job["target"].target_dir
+        entry = {
+            "target_dir": str(target_dir),
+            "repository": job["repository"],
+            "result_json": str(job["result_json"]),
+        }
+        tracer = Tracer(repository=job["repository"])
+        tracers.append(tracer)
+        try:
+            entry["result"] = publish_target_dir(
+                **job,
+                tracer=tracer,
+                primary_tag=args.primary_tag,
+                tags=list(args.tags),
+                sysupdate=args.sysupdate,
+                referrer_workers=args.referrer_workers,
+                publisher=publisher,
+                reference_prefix=reference_prefix,
+                subject_uses_digest=subject_uses_digest,
+                incremental=args.incremental,
+                verification=reports.get(target_dir),
+                root_chunk_size=args.root_chunk_size,
+                resume=not args.restart,
+            )
+            entry["status"] = "published"
+        except PublishError as error:
+            entry["status"] = "failed"
+            entry["error"] = error.message
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            # A bug hit by one target must not sink the rest of the batch.
+            entry["status"] = "failed"
+            entry["error"] = f"{type(error).__name__}: {error}"
+        if entry["status"] == "failed":
+            print(f"[!] {target_dir}: {entry['error']}", file=sys.stderr)
+        return entry
+
+    with ExitStack() as stack:
+        with batch_tracer.span("login"):
+            publisher, reference_prefix, subject_uses_digest = stack.enter_context(
+                session_context(args)
+            )
+        with ThreadPoolExecutor(
+            max_workers=min(args.jobs, len(jobs)), thread_name_prefix="oci-target"
+        ) as executor:
+            entries = list(executor.map(publish_job, jobs))
+
+    failed = [entry for entry in entries if entry["status"] == "failed"]
+    batch_tracer.finish()
+    write_json(
+        result_json,
+        {
+            "primary_tag": args.primary_tag,
+            "tags": list(args.tags),
+            "published": len(entries) - len(failed),
+            "failed": len(failed),
+            "targets": entries,
+            "spans": batch_tracer.as_list(),
+        },
+    )
+    print(f"[+] Wrote batch publish result: {result_json}")
+    write_trace(args.trace_json, tracers)
+
+    if failed:
+        fail(
+            f"{len(failed)} of {len(entries)} targets failed to publish: "
+            + ", ".join(entry["target_dir"] for entry in failed)
+        )
+    return 0
+
+
+def write_trace(trace_json: str | None, tracers: list[Tracer]) -> None:
+    """Export publish spans as an OTLP/JSON trace file, when requested."""
+    if not trace_json:
+        return
+    path = Path(trace_json).expanduser().resolve()
+    write_json(path, otlp_trace(tracers))
+    print(f"[+] Wrote publish trace: {path}")
+
 
 def publish_test_results(args: argparse.Namespace) -> int:
     """Publish test results as a referrer attached to a target artifact."""
     results_dir = Path(args.results_dir).expanduser().resolve()
+    produce, layer = compressed_writer(
+        test_results_archive_writer(results_dir),
+        args.compression,
+        args.compression_level,
+    )
 
-    with oras_publish_context() as (
-        common_args,
+    with session_context(args) as (
+        publisher,
         _reference_prefix,
         _subject_uses_digest,
     ):
-        with tempfile.TemporaryDirectory(prefix="oci-test-results-") as archive_dir:
-            archive_path = Path(archive_dir) / "test-results.tar"
-            create_test_results_archive(results_dir, archive_path)
-
-            annotations = {
+        output = publisher.attach_stream(
+            subject_reference=args.subject_reference,
+            artifact_type=TEST_RESULTS_ARTIFACT_TYPE,
+            layer=layer,
+            produce=produce,
+            annotations={
                 "org.opencontainers.image.description": "Test results",
-            }
-            output = run_oras(
-                [
-                    "attach",
-                    *common_args,
-                    *annotation_args(annotations),
-                    "--artifact-type",
-                    TEST_RESULTS_ARTIFACT_TYPE,
-                    args.subject_reference,
-                    f"{archive_path.name}:{TEST_RESULTS_MEDIA_TYPE}",
-                ],
-                cwd=archive_path.parent,
-            )
+            },
+        )
 
         print(
             f"[+] Published test results for {args.subject_reference}: {output['digest']}"
         )
-        return 0
+    if args.result_json:
+        write_json(
+            Path(args.result_json).expanduser().resolve(),
+            {
+                "subject": args.subject_reference,
+                "layer": {"media_type": layer.media_type, "title": layer.path},
+                "digest": output["digest"],
+                "media_type": output.get("mediaType", OCI_MANIFEST_MEDIA_TYPE),
+            },
+        )
+    return 0
 
 
 def publish_release_attestation(args: argparse.Namespace) -> int:
@@ -569,13 +3982,13 @@ def publish_release_attestation(args: argparse.Namespace) -> int:
     relpath = "attestations/release-policy.json"
     signature_relpath = "attestations/release-policy.json.sig"
 
-    with oras_publish_context() as (
-        common_args,
+    with session_context(args) as (
+        publisher,
         _reference_prefix,
         _subject_uses_digest,
     ):
         result = publish_referrer(
-            common_args=common_args,
+            publisher=publisher,
             subject_reference=args.subject_reference,
             target_dir=target_dir,
             role="release_policy",
@@ -587,12 +4000,584 @@ def publish_release_attestation(args: argparse.Namespace) -> int:
         "[+] Published release policy attestation for "
         f"{args.subject_reference}: {result['digest']}"
     )
+    if args.result_json:
+        write_json(
+            Path(args.result_json).expanduser().resolve(),
+            {"subject": args.subject_reference, **result},
+        )
+    return 0
+
+
+def verified_blob(
+    client: RegistryClient | LayoutClient, repository: str, digest: str
+) -> bytes:
+    """Download a small blob and check it against its digest."""
+    data = client.get_blob(repository, digest)
+    if bytes_digest(data) != digest:
+        fail(f"blob {digest} does not match its digest")
+    return data
+
+
+def reassemble_root(args: argparse.Namespace) -> int:
+    """Rebuild a chunked sysupdate root image and verify every chunk.
+
+    Without an output file the chunks are only downloaded and verified.
+    """
+    output = Path(args.output).expanduser().resolve() if args.output else None
+    with native_publish_context(client_options(args)) as (publisher, _, _):
+        parsed = publisher.parse(args.reference)
+        client = publisher.client
+        stored = client.get_manifest(parsed.repository, parsed.reference)
+        if stored is None:
+            fail(f"artifact not found: {args.reference}")
+        index_layer = next(
+            (
+                layer
+                for layer in json.loads(stored[0]).get("layers", [])
+                if layer["mediaType"] == SYSUPDATE_ROOT_INDEX_MEDIA_TYPE
+            ),
+            None,
+        )
+        if index_layer is None:
+            fail(f"artifact has no chunked root image: {args.reference}")
+        index = json.loads(
+            verified_blob(client, parsed.repository, index_layer["digest"])
+        )
+        if index.get("version") != 1:
+            fail(f"unsupported chunk index version: {index.get('version')}")
+
+        whole = hashlib.sha256()
+        with ExitStack() as stack:
+            sink = None
+            if output is not None:
+                temporary = output.with_name(f".{output.name}.{uuid.uuid4().hex}")
+                stack.callback(temporary.unlink, missing_ok=True)
+                sink = stack.enter_context(temporary.open("wb"))
+            for item in index["chunks"]:
+                data = verified_blob(client, parsed.repository, item["digest"])
+                whole.update(data)
+                if sink is not None:
+                    sink.write(data)
+            if f"sha256:{whole.hexdigest()}" != index["digest"]:
+                fail(f"reassembled root image does not match {index['digest']}")
+            if sink is not None:
+                sink.close()
+                os.replace(temporary, output)
+
+    print(
+        f"[+] Verified {len(index['chunks'])} chunks of {index['size']} bytes "
+        f"as {index['digest']}"
+    )
+    if output is not None:
+        print(f"[+] Wrote root image: {output}")
+    return 0
+
+
+JOB_HANDLERS: dict[str, Callable[[argparse.Namespace], int]] = {
+    "target": publish_target,
+    "targets": publish_targets,
+    "test-results": publish_test_results,
+    "release-attestation": publish_release_attestation,
+}
+
+
+@dataclass
+class PublishJob:  # pylint: disable=too-many-instance-attributes
+    """A publish subcommand queued in the daemon."""
+
+    id: str
+    command: str
+    args: dict[str, Any]
+    status: str = "queued"
+    result: Any = None
+    error: str = ""
+    submitted: float = field(default_factory=time.time)
+    started: float | None = None
+    finished: float | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the job status as sent to clients."""
+        return {
+            "id": self.id,
+            "command": self.command,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "submitted": self.submitted,
+            "started": self.started,
+            "finished": self.finished,
+        }
+
+
+class PublishDaemon:
+    """Job queue running publish subcommands through one long-lived session.
+
+    Every job shares the daemon's authenticated connection pool. Native
+    uploads of concurrent jobs are additionally scheduled through a
+    `FairScheduler`, so jobs get an even share of the upload slots. Jobs
+    whose client would publish elsewhere or with other session options, as
+    described by `daemon_settings`, are refused.
+    """
+
+    def __init__(
+        self,
+        session: tuple[Publisher, str, bool],
+        *,
+        settings: dict[str, Any],
+        jobs: int = DEFAULT_DAEMON_JOBS,
+        upload_slots: int = HTTP_POOL_SIZE,
+    ):
+        self.session = session
+        self.settings = settings
+        self.scheduler = FairScheduler(upload_slots)
+        publisher = session[0]
+        if isinstance(publisher, NativePublisher):
+            publisher.scheduler = self.scheduler
+        self._jobs: dict[str, PublishJob] = {}
+        self._queue: queue.Queue[PublishJob | None] = queue.Queue()
+        self._condition = threading.Condition()
+        self._workers = [
+            threading.Thread(target=self._work, name=f"oci-job-{index}", daemon=True)
+            for index in range(jobs)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def close(self) -> None:
+        """Let queued jobs finish, then stop the workers."""
+        for _worker in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join()
+
+    def submit(
+        self, command: str, args: dict[str, Any], settings: dict[str, Any]
+    ) -> PublishJob:
+        """Queue a subcommand with already parsed, absolute arguments."""
+        if command not in JOB_HANDLERS:
+            fail(f"unsupported daemon job: {command}")
+        differences = [
+            f"{key} {settings.get(key)!r} (daemon: {value!r})"
+            for key, value in self.settings.items()
+            if settings.get(key) != value
+        ]
+        if differences:
+            fail(f"job settings differ from the daemon's: {', '.join(differences)}")
+        job = PublishJob(id=uuid.uuid4().hex[:12], command=command, args=args)
+        with self._condition:
+            self._jobs[job.id] = job
+            finished = [item for item in self._jobs.values() if item.finished]
+            for stale in finished[: max(0, len(finished) - DAEMON_JOB_HISTORY)]:
+                del self._jobs[stale.id]
+        self._queue.put(job)
+        print(f"[job {job.id}] queued {command}")
+        return job
+
+    def get(self, job_id: str) -> PublishJob:
+        """Return a known job."""
+        with self._condition:
+            job = self._jobs.get(job_id)
+        if job is None:
+            fail(f"unknown job: {job_id}")
+        return job
+
+    def jobs(self) -> list[PublishJob]:
+        """Return all retained jobs in submission order."""
+        with self._condition:
+            return list(self._jobs.values())
+
+    def wait(self, job_id: str, timeout: float | None = None) -> PublishJob:
+        """Block until a job has finished or `timeout` passes."""
+        job = self.get(job_id)
+        with self._condition:
+            self._condition.wait_for(lambda: job.finished is not None, timeout)
+        return job
+
+    def _work(self) -> None:
+        while (job := self._queue.get()) is not None:
+            self._run(job)
+
+    def _run(self, job: PublishJob) -> None:
+        publisher, reference_prefix, subject_uses_digest = self.session
+        if isinstance(publisher, NativePublisher):
+            publisher = publisher.for_job(job.id)
+        args = argparse.Namespace(**job.args)
+        args.session = (publisher, reference_prefix, subject_uses_digest)
+        with self._condition:
+            job.status, job.started = "running", time.time()
+        print(f"[job {job.id}] running {job.command}")
+        with tempfile.TemporaryDirectory(prefix="oci-job-") as scratch:
+            if not getattr(args, "result_json", None):
+                args.result_json = str(Path(scratch) / "result.json")
+            try:
+                JOB_HANDLERS[job.command](args)
+                status, error = "succeeded", ""
+            except PublishError as exc:
+                status, error = "failed", exc.message
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                status, error = "failed", f"{type(exc).__name__}: {exc}"
+            result_path = Path(args.result_json)
+            result = read_json(result_path) if result_path.is_file() else None
+        with self._condition:
+            job.status, job.error, job.result = status, error, result
+            job.finished = time.time()
+            self._condition.notify_all()
+        print(f"[job {job.id}] {status}{f': {error}' if error else ''}")
+
+    def handle(self, request: dict[str, Any]) -> dict[str, Any]:
+        """Answer one client request."""
+        action = request.get("action")
+        if action == "submit":
+            return self.submit(
+                request["command"], request["args"], request["settings"]
+            ).as_dict()
+        if action == "status":
+            return self.get(request["job"]).as_dict()
+        if action == "wait":
+            return self.wait(request["job"], request.get("timeout")).as_dict()
+        if action == "list":
+            return {"jobs": [job.as_dict() for job in self.jobs()]}
+        fail(f"unsupported daemon action: {action}")
+
+
+class DaemonRequestHandler(socketserver.StreamRequestHandler):
+    """Serve one newline-delimited JSON request per connection."""
+
+    server: "DaemonServer"
+
+    def handle(self) -> None:
+        try:
+            response = self.server.daemon.handle(json.loads(self.rfile.readline()))
+        except PublishError as error:
+            response = {"error": error.message}
+        except (json.JSONDecodeError, KeyError, TypeError) as error:
+            response = {"error": f"malformed request: {error}"}
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+class DaemonServer(socketserver.ThreadingUnixStreamServer):
+    """Unix socket server in front of a `PublishDaemon`."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: Path, daemon: PublishDaemon):
+        if socket_path.is_socket():
+            if daemon_reachable(socket_path):
+                fail(f"a daemon is already listening on {socket_path}")
+            socket_path.unlink()
+        socket_path.parent.mkdir(parents=True, exist_ok=True)
+        self.daemon = daemon
+        old_umask = os.umask(0o177)
+        try:
+            super().__init__(str(socket_path), DaemonRequestHandler)
+        finally:
+            os.umask(old_umask)
+        self.socket_path = socket_path
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.socket_path.unlink(missing_ok=True)
+
+
+def daemon_request(
+    socket_path: Path, request: dict[str, Any], timeout: float | None = None
+) -> dict[str, Any]:
+    """Send one request to the daemon and return its response."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.settimeout(timeout)
+        try:
+            connection.connect(str(socket_path))
+        except OSError as error:
+            fail(f"daemon is not running on {socket_path}: {error.strerror or error}")
+        try:
+            connection.sendall(json.dumps(request).encode() + b"\n")
+            with connection.makefile("rb") as reader:
+                line = reader.readline()
+        except OSError as error:
+            fail(f"daemon connection failed on {socket_path}: {error}")
+    if not line:
+        fail(f"daemon closed the connection: {socket_path}")
+    response = json.loads(line)
+    if "error" in response and "status" not in response:
+        fail(f"daemon: {response['error']}")
+    return response
+
+
+def daemon_reachable(socket_path: Path) -> bool:
+    """Return whether a daemon owned by the current user listens on the socket."""
+    try:
+        if socket_path.stat().st_uid != os.getuid():
+            return False
+        daemon_request(socket_path, {"action": "list"}, timeout=5)
+    except (OSError, PublishError):
+        return False
+    return True
+
+
+def daemon_settings(args: argparse.Namespace) -> dict[str, Any]:
+    """Return the destination and session options a daemon job runs with.
+
+    The password is left out; a matching registry and username identify
+    the same account.
+    """
+    layout_path = os.environ.get("OCI_LAYOUT_PATH", "")
+    if layout_path:
+        destination = {"layout": str(Path(layout_path).expanduser().resolve())}
+    else:
+        destination = {
+            "registry": os.environ.get("OCI_REGISTRY", DEFAULT_REGISTRY),
+            "username": os.environ.get("OCI_USERNAME", DEFAULT_USERNAME),
+        }
+    return destination | {key: getattr(args, key) for key in DAEMON_SETTING_ARGS}
+
+
+def job_arguments(args: argparse.Namespace) -> dict[str, Any]:
+    """Serialize parsed arguments for the daemon, making paths absolute."""
+    payload = {
+        key: value
+        for key, value in vars(args).items()
+        if key not in SESSION_ARGS and key != "command"
+    }
+    for key in JOB_PATH_ARGS:
+        if payload.get(key):
+            payload[key] = str(Path(payload[key]).expanduser().resolve())
+    for key in JOB_PATH_LIST_ARGS:
+        if key in payload:
+            payload[key] = [
+                os.path.abspath(os.path.expanduser(item)) for item in payload[key]
+            ]
+    return payload
+
+
+def submit_to_daemon(args: argparse.Namespace) -> int:
+    """Run a subcommand through the daemon listening on `--socket`."""
+    socket_path = Path(args.socket)
+    job = daemon_request(
+        socket_path,
+        {
+            "action": "submit",
+            "command": args.command,
+            "args": job_arguments(args),
+            "settings": daemon_settings(args),
+        },
+    )
+    print(f"[+] Submitted {args.command} as daemon job {job['id']}")
+    job = daemon_request(socket_path, {"action": "wait", "job": job["id"]})
+    if job["status"] != "succeeded":
+        fail(f"daemon job {job['id']} failed: {job['error']}")
+    print(f"[+] Daemon job {job['id']} succeeded")
+    return 0
+
+
+def serve(args: argparse.Namespace) -> int:
+    """Run the publish daemon until interrupted."""
+    socket_path = Path(args.socket)
+    with publish_context(args.backend, client_options(args)) as session:
+        daemon = PublishDaemon(
+            session,
+            settings=daemon_settings(args),
+            jobs=args.jobs,
+            upload_slots=args.upload_slots,
+        )
+        server = DaemonServer(socket_path, daemon)
+
+        def stop(_signum: int, _frame: Any) -> None:
+            threading.Thread(target=server.shutdown, daemon=True).start()
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        print(f"[+] Serving publish jobs on {socket_path}")
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+            daemon.close()
+    return 0
+
+
+def show_jobs(args: argparse.Namespace) -> int:
+    """Print the status of one or all daemon jobs as JSON."""
+    socket_path = Path(args.socket)
+    if args.job:
+        response = daemon_request(socket_path, {"action": "status", "job": args.job})
+    else:
+        response = daemon_request(socket_path, {"action": "list"})
+    print(json.dumps(response, indent=2))
     return 0
 
 
+def positive_int(value: str) -> int:
+    """Parse a strictly positive integer CLI argument."""
+    try:
+        parsed = int(value)
+    except ValueError:
+        parsed = 0
+    if parsed < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got '{value}'")
+    return parsed
+
+
+def non_negative_int(value: str) -> int:
+    """Parse a non-negative integer CLI argument."""
+    try:
+        parsed = int(value)
+    except ValueError:
+        parsed = -1
+    if parsed < 0:
+        raise argparse.ArgumentTypeError(
+            f"expected a non-negative integer, got '{value}'"
+        )
+    return parsed
+
+
+def byte_size(value: str) -> int:
+    """Parse a positive byte size with an optional K, M or G suffix."""
+    units = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3}
+    match = re.fullmatch(r"(\d+)\s*([KMG]?)(?:I?B)?", value.strip().upper())
+    if not match or int(match.group(1)) < 1:
+        raise argparse.ArgumentTypeError(f"expected a size like '64M', got '{value}'")
+    return int(match.group(1)) * units[match.group(2)]
+
+
+def add_daemon_parsers(subparsers: Any) -> None:
+    """Add the daemon `serve` and `jobs` subcommands."""
+    serve_parser = subparsers.add_parser(
+        "serve", help="run a daemon accepting publish jobs on a Unix socket"
+    )
+    serve_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=positive_int,
+        default=DEFAULT_DAEMON_JOBS,
+        help="jobs to run concurrently",
+    )
+    serve_parser.add_argument(
+        "--upload-slots",
+        type=positive_int,
+        default=HTTP_POOL_SIZE,
+        help="native blob uploads shared fairly between running jobs",
+    )
+    serve_parser.set_defaults(handler=serve)
+
+    jobs_parser = subparsers.add_parser("jobs", help="show publish daemon jobs")
+    jobs_parser.add_argument("job", nargs="?", help="job id (default: all jobs)")
+    jobs_parser.set_defaults(handler=show_jobs)
+
+
+def add_publish_options(parser: argparse.ArgumentParser) -> None:
+    """Add the options shared by the `target` and `targets` subcommands."""
+    parser.add_argument(
+        "--trace-json",
+        help="also write the publish timing spans as an OpenTelemetry "
+        "OTLP/JSON trace file",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="reuse manifests and referrers already in the registry when "
+        "only their creation time differs (native backend)",
+    )
+    parser.add_argument(
+        "--root-chunk-size",
+        type=byte_size,
+        help="with --sysupdate, publish the root image as content-defined "
+        "chunks of about this size, e.g. '4M', so new versions only upload "
+        "changed chunks; rebuild it with 'reassemble' (native backend)",
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="ignore the progress recorded by an interrupted publish of the "
+        "same target and start over",
+    )
+    parser.add_argument(
+        "--verify-signatures",
+        action="store_true",
+        help="verify image and attestation signatures before uploading, "
+        "using the certificates in $IMG_CERT and $PROV_CERT",
+    )
+    parser.add_argument(
+        "--verify-workers",
+        type=positive_int,
+        default=DEFAULT_VERIFY_WORKERS,
+        help="signature verification processes (default: CPU count)",
+    )
+
+
+def add_client_options(parser: argparse.ArgumentParser) -> None:
+    """Add the global registry client and daemon options."""
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default=DEFAULT_BACKEND,
+        help="registry client: in-process 'native' (default) or 'oras' subprocesses",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=byte_size,
+        default=DEFAULT_UPLOAD_CHUNK_SIZE,
+        help="native upload chunk size, e.g. '16M'; larger blobs upload in "
+        "resumable chunks (default: 64M)",
+    )
+    parser.add_argument(
+        "--session-cache",
+        default=DEFAULT_SESSION_CACHE,
+        metavar="DIR",
+        help="reuse registry login sessions across invocations, stored in this "
+        "private directory (default: $OCI_SESSION_CACHE, disabled when unset)",
+    )
+    parser.add_argument(
+        "--session-ttl",
+        type=positive_int,
+        default=DEFAULT_SESSION_TTL,
+        help="seconds a cached login session is reused (default: 3600)",
+    )
+    parser.add_argument(
+        "--blob-workers",
+        type=positive_int,
+        default=DEFAULT_BLOB_WORKERS,
+        help="native blob uploads to run concurrently per artifact",
+    )
+    parser.add_argument(
+        "--max-bandwidth",
+        type=byte_size,
+        default=None,
+        help="cap the combined native upload rate in bytes per second, e.g. '50M'",
+    )
+    parser.add_argument(
+        "--layout-link",
+        choices=LAYOUT_LINK_MODES,
+        default=DEFAULT_LAYOUT_LINK,
+        help="how the native backend places files into an OCI_LAYOUT_PATH layout; "
+        "every mode falls back to a copy (default: $OCI_LAYOUT_LINK or auto, "
+        "trying reflink, then hardlink)",
+    )
+    parser.add_argument(
+        "--retries",
+        type=non_negative_int,
+        default=DEFAULT_RETRIES,
+        help="retries of a registry operation failing with HTTP 5xx, 429 or a "
+        "dropped connection, with jittered exponential backoff (default: 4)",
+    )
+    parser.add_argument(
+        "--socket",
+        default=DEFAULT_DAEMON_SOCKET,
+        help="Unix socket of the publish daemon "
+        "(default: $OCI_PUBLISH_SOCKET or a per-user path)",
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="submit the publish subcommand to the daemon on --socket instead of "
+        "publishing in this process; the daemon refuses jobs whose destination "
+        "or session options differ from its own",
+    )
+
+
 def build_parser() -> argparse.ArgumentParser:
     """Build the CLI parser."""
     parser = argparse.ArgumentParser(description="Publish Ghaf OCI artifacts")
+    add_client_options(parser)
     subparsers = parser.add_subparsers(dest="command", required=True)
 
     target_parser = subparsers.add_parser("target", help="publish one target artifact")
@@ -606,13 +4591,87 @@ def build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="publish target as a sysupdate artifact",
     )
+    target_parser.add_argument(
+        "--referrer-workers",
+        type=positive_int,
+        default=DEFAULT_REFERRER_WORKERS,
+        help="number of attestation referrers to attach concurrently",
+    )
+    add_publish_options(target_parser)
     target_parser.set_defaults(handler=publish_target)
 
+    targets_parser = subparsers.add_parser(
+        "targets", help="publish many target artifacts in one session"
+    )
+    targets_parser.add_argument(
+        "-d", "--target-dir", action="append", default=[], dest="target_dirs"
+    )
+    targets_parser.add_argument(
+        "-g",
+        "--glob",
+        action="append",
+        default=[],
+        dest="globs",
+        help="glob of target directories; entries without manifest.json are ignored",
+    )
+    targets_parser.add_argument(
+        "-r",
+        "--repository-template",
+        required=True,
+        help="repository for each target, e.g. 'ghaf/main/{target}' or '{dirname}'",
+    )
+    targets_parser.add_argument("--primary-tag", required=True)
+    targets_parser.add_argument(
+        "-o", "--result-json", required=True, help="aggregated result document"
+    )
+    targets_parser.add_argument(
+        "--target-result-name",
+        default="oci-result.json",
+        help="per-target result file name, written into each target directory",
+    )
+    targets_parser.add_argument("-t", "--tag", action="append", default=[], dest="tags")
+    targets_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=positive_int,
+        default=4,
+        help="number of targets to publish concurrently",
+    )
+    targets_parser.add_argument(
+        "--sysupdate",
+        action="store_true",
+        help="publish every target as a sysupdate artifact",
+    )
+    targets_parser.add_argument(
+        "--referrer-workers",
+        type=positive_int,
+        default=DEFAULT_REFERRER_WORKERS,
+        help="number of attestation referrers to attach concurrently per target",
+    )
+    add_publish_options(targets_parser)
+    targets_parser.set_defaults(handler=publish_targets)
+
     test_results_parser = subparsers.add_parser(
         "test-results", help="attach test results to a target artifact"
     )
     test_results_parser.add_argument("-d", "--results-dir", required=True)
     test_results_parser.add_argument("-s", "--subject-reference", required=True)
+    test_results_parser.add_argument(
+        "-o", "--result-json", help="write the referrer descriptor as JSON"
+    )
+    test_results_parser.add_argument(
+        "--compression",
+        choices=sorted(TEST_RESULTS_CODECS),
+        default="none",
+        help="compress the results archive (default: none)",
+    )
+    test_results_parser.add_argument(
+        "--compression-level",
+        type=positive_int,
+        default=None,
+        help="codec level trading CPU for size (gzip: 1-9, default 6; "
+        "zstd: 1-19, default 3)",
+    )
     test_results_parser.set_defaults(handler=publish_test_results)
 
     release_attestation_parser = subparsers.add_parser(
@@ -620,8 +4679,24 @@ def build_parser() -> argparse.ArgumentParser:
     )
     release_attestation_parser.add_argument("-d", "--target-dir", required=True)
     release_attestation_parser.add_argument("-s", "--subject-reference", required=True)
+    release_attestation_parser.add_argument(
+        "-o", "--result-json", help="write the referrer descriptor as JSON"
+    )
     release_attestation_parser.set_defaults(handler=publish_release_attestation)
 
+    reassemble_parser = subparsers.add_parser(
+        "reassemble", help="rebuild and verify a chunked sysupdate root image"
+    )
+    reassemble_parser.add_argument(
+        "-s", "--reference", required=True, help="sysupdate artifact reference"
+    )
+    reassemble_parser.add_argument(
+        "-o", "--output", help="root image to write (default: only verify)"
+    )
+    reassemble_parser.set_defaults(handler=reassemble_root)
+
+    add_daemon_parsers(subparsers)
+
     return parser
 
 
@@ -629,7 +4704,15 @@ def main() -> int:
     """CLI entrypoint."""
     parser = build_parser()
     args = parser.parse_args()
-    return args.handler(args)
+    try:
+        if args.daemon:
+            if args.command not in JOB_HANDLERS:
+                fail(f"{args.command} cannot be submitted to the daemon")
+            return submit_to_daemon(args)
+        return args.handler(args)
+    except PublishError as error:
+        print(f"Error: {error.message}", file=sys.stderr)
+        return 1
 
 
 if __name__ == "__main__":
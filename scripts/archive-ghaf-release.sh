@@ -337,10 +337,12 @@ pull_artifacts_from_oci() {
       exit 1
     fi
 
-    if [[ -f "$target_dir/test-results.tar" ]]; then
-      tar -xf "$target_dir/test-results.tar" -C "$target_dir"
-      rm -f "$target_dir/test-results.tar"
-    fi
+    for results_archive in "$target_dir"/test-results.tar{,.gz,.zst}; do
+      if [[ -f $results_archive ]]; then
+        tar -xf "$results_archive" -C "$target_dir"
+        rm -f "$results_archive"
+      fi
+    done
     pulled_targets=$((pulled_targets + 1))
   done
 
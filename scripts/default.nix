@@ -28,6 +28,8 @@
             oras
             tree
             jq
+            gnutar
+            zstd
           ])
           ++ [
             ghaf-fetch
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# SPDX-FileCopyrightText: 2026 TII (SSRC) and the Ghaf contributors
+# SPDX-License-Identifier: Apache-2.0
+
+"""Benchmark the per-scrape CPU cost of the NetHSM exporter.
+
+Serves a snapshot shaped like a NetHSM /api/v1/metrics response: GC and
+memory counters, key-value store and TLS statistics, per-status HTTP
+response counts and a few non-numeric state keys. Every scrape runs
+collect() and renders the text exposition. A cold scrape starts from an
+empty key translation table and builds it; warm scrapes reuse it.
+Prints the mean CPU time per scrape and the number of exported
+families and series as JSON.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(
+    0, str(Path(__file__).resolve().parents[2] / "pkgs" / "nethsm-exporter" / "src")
+)
+
+# pylint: disable=wrong-import-position
+import nethsm_exporter
+from prometheus_client import CollectorRegistry, generate_latest
+
+STATE_KEYS = {
+    "system state": "Operational",
+    "software version": "2.1",
+    "firmware version": "1.0",
+    "tls certificate": "valid",
+}
+COUNTERS = (
+    "gc minor words",
+    "gc promoted words",
+    "gc major words",
+    "gc minor collections",
+    "gc major collections",
+    "gc heap words",
+    "gc compactions",
+    "gc top heap words",
+    "gc stack size",
+    "kv read",
+    "kv write",
+    "kv delete",
+    "kv list",
+    "log errors",
+    "log warnings",
+    "tls handshakes",
+    "tls failed handshakes",
+    "uptime",
+)
+STATUS_CODES = (
+    *(200, 201, 202, 204, 206, 301, 304, 400, 401, 403, 404),
+    *(405, 406, 409, 412, 415, 429, 500, 501, 502, 503, 504),
+)
+
+
+def make_payload(extra: int) -> dict[str, str]:
+    """Return a metrics response with `extra` additional counters."""
+    payload = dict(STATE_KEYS)
+    payload |= {key: str(1000 + index) for index, key in enumerate(COUNTERS)}
+    payload |= {f"http response {code}": str(code * 7) for code in STATUS_CODES}
+    payload |= {f"memory pool {index}.allocated": "4096" for index in range(extra)}
+    return payload
+
+
+def make_collector(payload: dict[str, str]) -> nethsm_exporter.HSMCollector:
+    """Return a collector serving `payload` without contacting an HSM."""
+    collector = nethsm_exporter.HSMCollector("hsm", "user", "secret", interval=60)
+    now = time.time()
+    collector.snapshot = nethsm_exporter.Snapshot(payload, True, now, now)
+    return collector
+
+
+def scrape(collector: nethsm_exporter.HSMCollector) -> bytes:
+    """Collect and render one scrape."""
+    registry = CollectorRegistry()
+    registry.register(collector)
+    return generate_latest(registry)
+
+
+def measure(payload: dict[str, str], scrapes: int, warm: bool) -> dict[str, Any]:
+    """Return the mean CPU microseconds per scrape."""
+    collector = make_collector(payload)
+    if warm:
+        _ = scrape(collector)
+    started = time.process_time()
+    for _ in range(scrapes):
+        if not warm:
+            collector.translations = {}
+        output = scrape(collector)
+    cpu = time.process_time() - started
+    lines = output.decode().splitlines()
+    return {
+        "cpu_us_per_scrape": round(cpu / scrapes * 1e6, 1),
+        "exposition_bytes": len(output),
+        "families": sum(line.startswith("# TYPE ") for line in lines),
+        "series": sum(not line.startswith("#") for line in lines),
+    }
+
+
+def main() -> int:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scrapes", type=int, default=2000)
+    parser.add_argument("--extra-keys", type=int, nargs="+", default=[0, 100])
+    args = parser.parse_args()
+
+    runs = []
+    for extra in args.extra_keys:
+        payload = make_payload(extra)
+        runs.append(
+            {
+                "keys": len(payload),
+                "cold": measure(payload, args.scrapes, warm=False),
+                "warm": measure(payload, args.scrapes, warm=True),
+            }
+        )
+        print(f"[+] {len(payload)} keys done", file=sys.stderr)
+    print(json.dumps({"scrapes": args.scrapes, "runs": runs}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
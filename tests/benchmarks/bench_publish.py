@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+# SPDX-FileCopyrightText: 2026 TII (SSRC) and the Ghaf contributors
+# SPDX-License-Identifier: Apache-2.0
+
+"""Benchmark end-to-end publish throughput of every oci-publish subcommand.
+
+Generates a synthetic disk image target and a sysupdate target, both with
+signed images and all four signed attestation roles, plus a test results
+tree and a release policy attestation. Each repeat publishes them with
+`target`, `target --sysupdate`, `test-results` and `release-attestation`
+into a fresh OCI layout directory and a fresh in-process registry
+stand-in, once per backend. Prints MB/s, per-phase latency and the number
+of processes spawned per run as JSON, for tracking across versions.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+TESTS_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(TESTS_DIR.parent / "pkgs" / "oci-publish" / "src"))
+sys.path.insert(0, str(TESTS_DIR))
+
+# pylint: disable=wrong-import-position
+import oci_publish
+from oci_registry_stub import RegistryServer, RegistryState
+
+SCENARIOS = ("target", "sysupdate", "test-results", "release-attestation")
+DESTINATIONS = ("layout", "registry")
+
+
+class CountingPopen(subprocess.Popen):  # type: ignore[type-arg]
+    """Popen counting every process oci-publish spawns, e.g. oras or zstd."""
+
+    started = 0
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        CountingPopen.started += 1
+        super().__init__(*args, **kwargs)
+
+
+def write_random(path: Path, size: int, rng: random.Random) -> None:
+    """Write `size` bytes of incompressible data."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("wb") as handle:
+        for offset in range(0, size, 1024 * 1024):
+            handle.write(rng.randbytes(min(1024 * 1024, size - offset)))
+
+
+def write_attestations(target_dir: Path) -> dict[str, Any]:
+    """Write all four signed attestation roles and a release policy."""
+    attestations = {}
+    for role in oci_publish.ATTESTATION_ROLES:
+        path = f"attestations/{role}.json"
+        document = {
+            "role": role,
+            "subjects": [f"sha256:{index:064x}" for index in range(500)],
+        }
+        oci_publish.write_json(target_dir / path, document)
+        (target_dir / f"{path}.sig").write_bytes(os.urandom(64))
+        attestations[role] = {"path": path, "signature": {"path": f"{path}.sig"}}
+    oci_publish.write_json(
+        target_dir / "attestations" / "release-policy.json", {"policy": "bench"}
+    )
+    (target_dir / "attestations" / "release-policy.json.sig").write_bytes(
+        os.urandom(64)
+    )
+    return attestations
+
+
+def make_target(target_dir: Path, images: int, image_mib: int) -> None:
+    """Write a disk image target of `images` signed images of `image_mib`."""
+    rng = random.Random(0)
+    entries = []
+    for index in range(images):
+        path = f"images/disk-{index}.raw"
+        write_random(target_dir / path, image_mib * 1024 * 1024, rng)
+        (target_dir / f"{path}.sig").write_bytes(os.urandom(256))
+        entries.append({"path": path, "signature": {"path": f"{path}.sig"}})
+    oci_publish.write_json(
+        target_dir / "manifest.json",
+        {
+            "target": "bench",
+            "images": entries,
+            "attestations": write_attestations(target_dir),
+        },
+    )
+
+
+def make_sysupdate_target(target_dir: Path, image_mib: int) -> None:
+    """Write a sysupdate target whose root image is `image_mib`."""
+    rng = random.Random(1)
+    files = {
+        "kernel": ("ghaf.efi", 32 * 1024 * 1024),
+        "root": ("root.raw", image_mib * 1024 * 1024),
+        "verity": ("verity.raw", image_mib * 1024 * 1024 // 100),
+    }
+    entries = [{"path": "images/ghaf.manifest", "role": "sysupdate-manifest"}]
+    for name, size in files.values():
+        write_random(target_dir / "images" / name, size, rng)
+        (target_dir / "images" / f"{name}.sig").write_bytes(os.urandom(256))
+        entries.append(
+            {"path": f"images/{name}", "signature": {"path": f"images/{name}.sig"}}
+        )
+    sysupdate = {role: {"file": name} for role, (name, _size) in files.items()}
+    oci_publish.write_json(
+        target_dir / "images" / "ghaf.manifest", {"version": "1", **sysupdate}
+    )
+    oci_publish.write_json(
+        target_dir / "manifest.json",
+        {
+            "target": "bench-ota",
+            "images": entries,
+            "attestations": write_attestations(target_dir),
+        },
+    )
+
+
+def make_test_results(root: Path, size_mib: int) -> Path:
+    """Write a result tree of roughly `size_mib`."""
+    results_dir = root / "test-results"
+    results_dir.mkdir(parents=True)
+    with (results_dir / "output.xml").open("w", encoding="utf-8") as handle:
+        line = '<kw name="Boot" status="PASS" elapsed="1.0">log line</kw>\n'
+        handle.write(line * (size_mib * 1024 * 1024 // len(line)))
+    write_random(
+        results_dir / "screenshots" / "boot.png", 1024 * 1024, random.Random(2)
+    )
+    (root / "test-results.json").write_text('{"passed": 1}', encoding="utf-8")
+    return results_dir
+
+
+def tree_bytes(root: Path) -> int:
+    """Return the size of the files under `root`."""
+    return sum(path.stat().st_size for path in root.rglob("*") if path.is_file())
+
+
+def touch_tree(root: Path) -> None:
+    """Change every mtime so digest caches from earlier repeats do not apply."""
+    for path in root.rglob("*"):
+        if path.is_file():
+            os.utime(path)
+
+
+@contextlib.contextmanager
+def destination(kind: str, workdir: Path) -> Iterator[str]:
+    """Point oci-publish at a fresh layout or registry; yield the prefix."""
+    if kind == "layout":
+        layout = Path(tempfile.mkdtemp(prefix="layout-", dir=workdir))
+        os.environ["OCI_LAYOUT_PATH"] = str(layout)
+        try:
+            yield ""
+        finally:
+            del os.environ["OCI_LAYOUT_PATH"]
+            shutil.rmtree(layout)
+        return
+    with RegistryServer(RegistryState()) as server:
+        os.environ.update({"OCI_REGISTRY": server.address, "OCI_PLAIN_HTTP": "1"})
+        os.environ.setdefault("OCI_PASSWORD", "unused")
+        yield f"{server.address}/"
+
+
+def run_scenario(backend: str, args: list[str], result_json: Path) -> dict[str, Any]:
+    """Run one subcommand and return its wall time, phases and processes."""
+    parsed = oci_publish.build_parser().parse_args(
+        ["--backend", backend, *args, "-o", str(result_json)]
+    )
+    processes = CountingPopen.started
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(sys.stderr):
+        parsed.handler(parsed)
+    seconds = time.perf_counter() - started
+    # Only target publishes record spans; every run reports its total.
+    phases = {"total": round(seconds * 1000, 3)}
+    for span in oci_publish.read_json(result_json).get("spans", [])[1:]:
+        phases[span["name"]] = round(
+            phases.get(span["name"], 0.0) + span["duration_ms"], 3
+        )
+    return {
+        "seconds": seconds,
+        "processes": CountingPopen.started - processes,
+        "phases_ms": phases,
+    }
+
+
+def publish_all(
+    backend: str, prefix: str, inputs: dict[str, Path], workdir: Path
+) -> dict[str, dict[str, Any]]:
+    """Publish every scenario once into the current destination."""
+    reference = f"{prefix}ghaf/bench:build-1"
+    commands = {
+        "target": ["target", "-d", str(inputs["target"]), "-r", "ghaf/bench"]
+        + ["--primary-tag", "build-1"],
+        "sysupdate": ["target", "--sysupdate", "-d", str(inputs["sysupdate"])]
+        + ["-r", "ghaf/bench-ota", "--primary-tag", "build-1"],
+        "test-results": ["test-results", "-d", str(inputs["test-results"])]
+        + ["-s", reference],
+        "release-attestation": ["release-attestation", "-d", str(inputs["target"])]
+        + ["-s", reference],
+    }
+    runs = {}
+    for scenario, command in commands.items():
+        touch_tree(inputs[scenario])
+        runs[scenario] = run_scenario(backend, command, workdir / f"{scenario}.json")
+    return runs
+
+
+def measure(
+    backend: str, kind: str, inputs: dict[str, Path], repeat: int, workdir: Path
+) -> dict[str, dict[str, Any]]:
+    """Return the fastest of `repeat` runs of every scenario."""
+    best: dict[str, dict[str, Any]] = {}
+    for _ in range(repeat):
+        with destination(kind, workdir) as prefix:
+            measured = publish_all(backend, prefix, inputs, workdir)
+        for scenario, run in measured.items():
+            if scenario not in best or run["seconds"] < best[scenario]["seconds"]:
+                best[scenario] = run
+    return best
+
+
+def main() -> int:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--images", type=int, default=2)
+    parser.add_argument("--image-mib", type=int, default=64)
+    parser.add_argument("--results-mib", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        choices=oci_publish.BACKENDS,
+        default=[
+            backend
+            for backend in oci_publish.BACKENDS
+            if backend != "oras" or shutil.which("oras")
+        ],
+    )
+    parser.add_argument(
+        "--destinations", nargs="+", choices=DESTINATIONS, default=list(DESTINATIONS)
+    )
+    args = parser.parse_args()
+    subprocess.Popen = CountingPopen  # type: ignore[misc]
+
+    runs: list[dict[str, Any]] = []
+    with tempfile.TemporaryDirectory(prefix="bench-publish-") as workdir_name:
+        workdir = Path(workdir_name)
+        os.environ["OCI_PUBLISH_STATE_DIR"] = str(workdir / "state")
+        inputs = {
+            "target": workdir / "target",
+            "sysupdate": workdir / "sysupdate",
+            "test-results": make_test_results(workdir / "results", args.results_mib),
+            "release-attestation": workdir / "target" / "attestations",
+        }
+        make_target(inputs["target"], args.images, args.image_mib)
+        make_sysupdate_target(inputs["sysupdate"], args.image_mib)
+        policy_bytes = sum(
+            path.stat().st_size
+            for path in inputs["release-attestation"].glob("release-policy.json*")
+        )
+        sizes = {
+            "target": tree_bytes(inputs["target"]) - policy_bytes,
+            "sysupdate": tree_bytes(inputs["sysupdate"]),
+            "test-results": tree_bytes(inputs["test-results"]),
+            "release-attestation": policy_bytes,
+        }
+
+        for backend in args.backends:
+            for kind in args.destinations:
+                best = measure(backend, kind, inputs, args.repeat, workdir)
+                runs += [
+                    {
+                        "scenario": scenario,
+                        "backend": backend,
+                        "destination": kind,
+                        "bytes": sizes[scenario],
+                        "mb_per_second": round(
+                            sizes[scenario] / best[scenario]["seconds"] / 1e6, 3
+                        ),
+                        **best[scenario],
+                    }
+                    for scenario in SCENARIOS
+                ]
+                print(f"[+] {backend} to {kind} done", file=sys.stderr)
+
+    print(
+        json.dumps(
+            {
+                "images": args.images,
+                "image_mib": args.image_mib,
+                "results_mib": args.results_mib,
+                "repeat": args.repeat,
+                "runs": runs,
+            },
+            indent=2,
+        )
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
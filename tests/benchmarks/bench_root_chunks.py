@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# SPDX-FileCopyrightText: 2026 TII (SSRC) and the Ghaf contributors
+# SPDX-License-Identifier: Apache-2.0
+
+"""Benchmark chunked delta uploads of sysupdate root images.
+
+Publishes a synthetic sysupdate target to the in-process registry
+stand-in, changes a fraction of its root image blocks plus an insertion,
+and publishes the new version again, once as a whole root layer and once
+with content-defined chunks. Prints the uploaded bytes of the second
+publish, the chunking throughput and the reassembly time as JSON.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+TESTS_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(TESTS_DIR.parent / "pkgs" / "oci-publish" / "src"))
+sys.path.insert(0, str(TESTS_DIR))
+
+# pylint: disable=wrong-import-position
+import oci_publish
+from oci_registry_stub import RegistryServer, RegistryState
+
+BLOCK = oci_publish.ROOT_CHUNK_BLOCK_SIZE
+
+
+def make_target(target_dir: Path, size_mib: int) -> Path:
+    """Write a sysupdate target whose root image is `size_mib` of random data."""
+    (target_dir / "images").mkdir(parents=True)
+    rng = random.Random(0)
+    with (target_dir / "images" / "root.raw").open("wb") as handle:
+        for _ in range(size_mib):
+            handle.write(rng.randbytes(1024 * 1024))
+    (target_dir / "images" / "ghaf.efi").write_bytes(os.urandom(64 * 1024))
+    (target_dir / "images" / "verity.raw").write_bytes(os.urandom(64 * 1024))
+    oci_publish.write_json(
+        target_dir / "images" / "ghaf.manifest",
+        {
+            "version": "1",
+            "kernel": {"file": "ghaf.efi"},
+            "root": {"file": "root.raw"},
+            "verity": {"file": "verity.raw"},
+        },
+    )
+    images = [{"path": "images/ghaf.manifest", "role": "sysupdate-manifest"}]
+    images += [
+        {"path": f"images/{name}"} for name in ("ghaf.efi", "root.raw", "verity.raw")
+    ]
+    oci_publish.write_json(
+        target_dir / "manifest.json", {"target": "bench", "images": images}
+    )
+    return target_dir / "images" / "root.raw"
+
+
+def mutate(root: Path, fraction: float) -> int:
+    """Rewrite `fraction` of the blocks in runs and insert a few blocks."""
+    data = bytearray(root.read_bytes())
+    rng = random.Random(1)
+    blocks = len(data) // BLOCK
+    changed = 0
+    while changed < blocks * fraction:
+        run = rng.randint(1, 64)
+        start = rng.randrange(blocks - run) * BLOCK
+        data[start : start + run * BLOCK] = rng.randbytes(run * BLOCK)
+        changed += run
+    insert_at = rng.randrange(blocks) * BLOCK
+    data[insert_at:insert_at] = rng.randbytes(8 * BLOCK)
+    root.write_bytes(data)
+    return changed + 8
+
+
+def publish(target_dir: Path, repository: str, tag: str, chunk: str | None) -> Any:
+    """Publish the target and return its transfer accounting."""
+    args = ["--backend", "native", "target", "--sysupdate", "-d", str(target_dir)]
+    args += ["-r", repository, "--primary-tag", tag]
+    args += ["-o", str(target_dir / "result.json")]
+    if chunk:
+        args += ["--root-chunk-size", chunk]
+    parsed = oci_publish.build_parser().parse_args(args)
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(sys.stderr):
+        parsed.handler(parsed)
+    result = oci_publish.read_json(target_dir / "result.json")
+    return result["transfer"], time.perf_counter() - started
+
+
+def run_publishes(workdir: Path, target_dir: Path, args: Any) -> dict[str, Any]:
+    """Publish v1 and the mutated v2 whole and chunked, then reassemble v2."""
+    root = target_dir / "images" / "root.raw"
+    with RegistryServer(RegistryState()) as server:
+        os.environ.update({"OCI_REGISTRY": server.address, "OCI_PLAIN_HTTP": "1"})
+        os.environ.setdefault("OCI_PASSWORD", "unused")
+        os.environ.pop("OCI_LAYOUT_PATH", None)
+        publish(target_dir, "ghaf/whole", "v1", None)
+        publish(target_dir, "ghaf/chunked", "v1", args.chunk_size)
+        changed_blocks = mutate(root, args.changed)
+        whole, whole_seconds = publish(target_dir, "ghaf/whole", "v2", None)
+        chunked, chunked_seconds = publish(
+            target_dir, "ghaf/chunked", "v2", args.chunk_size
+        )
+
+        reassemble = oci_publish.build_parser().parse_args(
+            ["reassemble", "-s", f"{server.address}/ghaf/chunked:v2"]
+            + ["-o", str(workdir / "root.raw")]
+        )
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(sys.stderr):
+            reassemble.handler(reassemble)
+        reassemble_seconds = time.perf_counter() - started
+
+    return {
+        "changed_fraction": round(
+            changed_blocks * BLOCK / (args.size_mib * 1024 * 1024), 4
+        ),
+        "whole": {"uploaded_bytes": whole["uploaded_bytes"], "seconds": whole_seconds},
+        "chunked": {
+            "uploaded_bytes": chunked["uploaded_bytes"],
+            "seconds": chunked_seconds,
+        },
+        "saved_fraction": round(
+            1 - chunked["uploaded_bytes"] / whole["uploaded_bytes"], 4
+        ),
+        "reassemble_seconds": reassemble_seconds,
+    }
+
+
+def main() -> int:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mib", type=int, default=256)
+    parser.add_argument("--changed", type=float, default=0.05)
+    parser.add_argument("--chunk-size", default="4M")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench-root-chunks-") as workdir:
+        target_dir = Path(workdir) / "target"
+        os.environ["OCI_PUBLISH_STATE_DIR"] = str(Path(workdir) / "state")
+        root = make_target(target_dir, args.size_mib)
+        chunk_size = oci_publish.byte_size(args.chunk_size)
+        started = time.perf_counter()
+        index = oci_publish.chunk_file(root, chunk_size)
+        chunking_seconds = time.perf_counter() - started
+        publishes = run_publishes(Path(workdir), target_dir, args)
+
+    report = {
+        "size_mib": args.size_mib,
+        "chunk_size": chunk_size,
+        "chunks": len(index["chunks"]),
+        "chunking_mb_per_second": round(
+            args.size_mib * 1024 * 1024 / chunking_seconds / 1e6, 1
+        ),
+        **publishes,
+    }
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# SPDX-FileCopyrightText: 2026 TII (SSRC) and the Ghaf contributors
+# SPDX-License-Identifier: Apache-2.0
+
+"""Benchmark target manifest parsing for targets with many image parts.
+
+Writes synthetic sysupdate targets with thousands of split image parts and
+times loading the shared TargetModel and resolving every image by name
+and role through its indexes. The same lookups done as linear
+scans of the raw manifest, as the publish stages did before the model,
+are timed for comparison. Results are printed as JSON.
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+TESTS_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(TESTS_DIR.parent / "pkgs" / "oci-publish" / "src"))
+
+# pylint: disable=wrong-import-position
+import oci_publish
+
+
+def make_target(target_dir: Path, parts: int) -> None:
+    """Write a manifest.json listing `parts` signed root image parts."""
+    images: list[dict[str, Any]] = [
+        {
+            "path": f"images/root.raw.{index:05}",
+            "role": "root-part",
+            "signature": {"path": f"images/root.raw.{index:05}.sig"},
+        }
+        for index in range(parts)
+    ]
+    images += [
+        {"path": "images/ghaf.manifest", "role": "sysupdate-manifest"},
+        {"path": "images/ghaf.efi", "signature": {"path": "images/ghaf.efi.sig"}},
+        {"path": "images/root.raw", "signature": {"path": "images/root.raw.sig"}},
+        {"path": "images/verity.raw", "signature": {"path": None}},
+    ]
+    (target_dir / "images").mkdir(parents=True)
+    oci_publish.write_json(
+        target_dir / "images" / "ghaf.manifest",
+        {
+            "kernel": {"file": "ghaf.efi"},
+            "root": {"file": "root.raw"},
+            "verity": {"file": "verity.raw"},
+        },
+    )
+    oci_publish.write_json(
+        target_dir / "manifest.json", {"target": "bench", "images": images}
+    )
+
+
+def indexed_lookups(target_dir: Path) -> int:
+    """Load the model once and resolve every image through its indexes."""
+    target = oci_publish.TargetModel.load(target_dir)
+    found = len(target.sysupdate.files)
+    for image in target.images:
+        found += target.images_by_name[image.name] is image
+    found += len(target.images_by_role["root-part"])
+    return found
+
+
+def scanned_lookups(target_dir: Path) -> int:
+    """Resolve every image by rescanning the raw manifest per lookup."""
+    manifest = json.loads((target_dir / "manifest.json").read_text(encoding="utf-8"))
+    images = manifest["images"]
+    found = 0
+    for image in images:
+        name = Path(image["path"]).name
+        found += (
+            next(item for item in images if Path(item["path"]).name == name) is image
+        )
+    found += sum(1 for image in images if image.get("role") == "root-part")
+    return found
+
+
+def best_of(repeat: int, function: Callable[[Path], int], target_dir: Path) -> float:
+    """Return the fastest of `repeat` runs, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(target_dir)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> int:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--parts", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--skip-scan-above",
+        type=int,
+        default=2000,
+        help="skip the quadratic scan baseline for larger manifests",
+    )
+    args = parser.parse_args()
+
+    runs = []
+    with tempfile.TemporaryDirectory(prefix="bench-target-model-") as workdir:
+        for parts in args.parts:
+            target_dir = Path(workdir) / f"target-{parts}"
+            make_target(target_dir, parts)
+            run: dict[str, Any] = {
+                "parts": parts,
+                "indexed_seconds": best_of(args.repeat, indexed_lookups, target_dir),
+                "scan_seconds": None,
+            }
+            if parts <= args.skip_scan_above:
+                run["scan_seconds"] = best_of(args.repeat, scanned_lookups, target_dir)
+                run["speedup"] = round(run["scan_seconds"] / run["indexed_seconds"], 1)
+            print(f"[+] {parts} parts done", file=sys.stderr)
+            runs.append(run)
+
+    print(json.dumps({"repeat": args.repeat, "runs": runs}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# SPDX-FileCopyrightText: 2026 TII (SSRC) and the Ghaf contributors
+# SPDX-License-Identifier: Apache-2.0
+
+"""Benchmark test-results publishing per compression codec.
+
+Builds a synthetic robot-framework result tree, publishes it to the
+in-process registry stand-in once per codec and prints the compression
+ratio and end-to-end publish time as JSON.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+TESTS_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(TESTS_DIR.parent / "pkgs" / "oci-publish" / "src"))
+sys.path.insert(0, str(TESTS_DIR))
+
+# pylint: disable=wrong-import-position
+import oci_publish
+from oci_registry_stub import RegistryServer, RegistryState
+
+
+def make_results(root: Path, size_mib: int) -> Path:
+    """Write a result tree of roughly `size_mib`: mostly logs, some media."""
+    rng = random.Random(0)
+    results_dir = root / "test-results"
+    (results_dir / "screenshots").mkdir(parents=True)
+    words = [f"keyword{index}" for index in range(200)]
+    log_bytes = size_mib * 1024 * 1024 * 9 // 10
+    with (results_dir / "output.xml").open("w", encoding="utf-8") as handle:
+        written = 0
+        while written < log_bytes:
+            line = (
+                f'<kw name="{rng.choice(words)}" status="PASS" '
+                f'elapsed="{rng.random():.3f}">{" ".join(rng.choices(words, k=8))}'
+                "</kw>\n"
+            )
+            written += handle.write(line)
+    media_bytes = size_mib * 1024 * 1024 - log_bytes
+    (results_dir / "screenshots" / "boot.png").write_bytes(os.urandom(media_bytes))
+    (root / "test-results.json").write_text('{"passed": 1}', encoding="utf-8")
+    return results_dir
+
+
+def publish_once(
+    server: RegistryServer, results_dir: Path, codec: str, level: int | None
+) -> dict[str, Any]:
+    """Publish the results with one codec and measure it."""
+    args = ["--backend", "native", "test-results", "-d", str(results_dir)]
+    args += ["-s", f"{server.address}/ghaf/bench:build-1", "--compression", codec]
+    if level is not None:
+        args += ["--compression-level", str(level)]
+    parsed = oci_publish.build_parser().parse_args(args)
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(sys.stderr):
+        parsed.handler(parsed)
+    elapsed = time.perf_counter() - started
+
+    layer_sizes = {
+        len(server.state.blobs[layer["digest"]])
+        for data, _media_type in server.state.manifests.values()
+        for layer in json.loads(data).get("layers", [])
+        if layer["mediaType"] == oci_publish.TEST_RESULTS_CODECS[codec][0]
+    }
+    return {
+        "codec": codec,
+        "level": level,
+        "seconds": elapsed,
+        "size": max(layer_sizes),
+    }
+
+
+def main() -> int:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mib", type=int, default=64)
+    parser.add_argument("--level", type=int, default=None)
+    parser.add_argument(
+        "--codecs",
+        nargs="+",
+        default=[
+            codec
+            for codec in oci_publish.TEST_RESULTS_CODECS
+            if codec != "zstd" or shutil.which("zstd")
+        ],
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench-test-results-") as workdir:
+        results_dir = make_results(Path(workdir), args.size_mib)
+        state = RegistryState()
+        with RegistryServer(state) as server:
+            os.environ.update({"OCI_REGISTRY": server.address, "OCI_PLAIN_HTTP": "1"})
+            os.environ.setdefault("OCI_PASSWORD", "unused")
+            os.environ.pop("OCI_LAYOUT_PATH", None)
+            subject = oci_publish.EMPTY_CONFIG
+            client = oci_publish.RegistryClient(server.address, plain_http=True)
+            client.push_blob("ghaf/bench", subject)
+            client.put_manifest(
+                "ghaf/bench",
+                "build-1",
+                oci_publish.image_manifest(
+                    artifact_type=oci_publish.TARGET_ARTIFACT_TYPE,
+                    config=subject.descriptor(),
+                    layers=[],
+                    annotations={},
+                ),
+                oci_publish.OCI_MANIFEST_MEDIA_TYPE,
+            )
+            client.close()
+
+            runs = [
+                publish_once(
+                    server, results_dir, codec, None if codec == "none" else args.level
+                )
+                for codec in args.codecs
+            ]
+
+    baseline = next((run["size"] for run in runs if run["codec"] == "none"), None)
+    for run in runs:
+        run["ratio"] = round(baseline / run["size"], 2) if baseline else None
+    print(json.dumps({"size_mib": args.size_mib, "runs": runs}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
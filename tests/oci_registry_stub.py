@@ -0,0 +1,343 @@
+# SPDX-FileCopyrightText: 2026 TII (SSRC) and the Ghaf contributors
+# SPDX-License-Identifier: Apache-2.0
+
+"""In-process OCI distribution registry stand-in for oci-publish tests."""
+
+import base64
+import hashlib
+import json
+import re
+import threading
+import uuid
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+OCI_INDEX_MEDIA_TYPE = "application/vnd.oci.image.index.v1+json"
+ROUTE_PATTERN = re.compile(
+    r"^/v2/(?P<name>.+?)/(?P<kind>blobs/uploads|blobs|manifests|referrers)"
+    r"(?:/(?P<ref>[^/]*))?$"
+)
+
+
+def sha256_digest(data: bytes) -> str:
+    """Return the OCI digest of a byte string."""
+    return f"sha256:{hashlib.sha256(data).hexdigest()}"
+
+
+@dataclass
+class RegistryState:  # pylint: disable=too-many-instance-attributes
+    """Registry contents and request accounting shared by all handlers."""
+
+    username: str = ""
+    password: str = ""
+    token_auth: bool = False
+    referrers_api: bool = True
+    blobs: dict[str, bytes] = field(default_factory=dict)
+    uploads: dict[str, bytearray] = field(default_factory=dict)
+    manifests: dict[tuple[str, str], tuple[bytes, str]] = field(default_factory=dict)
+    tags: dict[tuple[str, str], str] = field(default_factory=dict)
+    requests: list[tuple[str, str]] = field(default_factory=list)
+    connections: int = 0
+    faults: list[tuple[str, str, int, dict[str, str]]] = field(default_factory=list)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def inject_fault(
+        self,
+        method: str,
+        path_fragment: str,
+        status: int,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        """Fail the next request whose method and path match.
+
+        Status 0 drops the connection without sending a response.
+        """
+        with self.lock:
+            self.faults.append((method, path_fragment, status, headers or {}))
+
+    def count(self, method: str, fragment: str = "") -> int:
+        """Count handled requests matching a method and path fragment."""
+        with self.lock:
+            return sum(
+                1 for seen, path in self.requests if seen == method and fragment in path
+            )
+
+    def referrers(self, name: str, digest: str) -> list[dict[str, Any]]:
+        """Return descriptors of manifests whose subject is `digest`."""
+        descriptors = []
+        for (repository, manifest_digest), (data, media_type) in sorted(
+            self.manifests.items()
+        ):
+            if repository != name:
+                continue
+            manifest = json.loads(data)
+            if manifest.get("subject", {}).get("digest") != digest:
+                continue
+            descriptor = {
+                "mediaType": media_type,
+                "digest": manifest_digest,
+                "size": len(data),
+                "artifactType": manifest.get("artifactType")
+                or manifest.get("config", {}).get("mediaType"),
+            }
+            if manifest.get("annotations"):
+                descriptor["annotations"] = manifest["annotations"]
+            descriptors.append(descriptor)
+        return descriptors
+
+
+class RegistryHandler(BaseHTTPRequestHandler):
+    """Request handler implementing the subset of the OCI API used by oci-publish."""
+
+    protocol_version = "HTTP/1.1"
+    server: "RegistryServer"
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server.state.lock:
+            self.server.state.connections += 1
+
+    def log_message(self, format: str, *args: Any) -> None:
+        return
+
+    @property
+    def state(self) -> RegistryState:
+        """Shared registry state."""
+        return self.server.state
+
+    def send(
+        self, status: int, body: bytes = b"", headers: dict[str, str] | None = None
+    ) -> None:
+        """Send a complete response, keeping the connection alive."""
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def read_body(self) -> bytes:
+        """Read the request body."""
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def authorized(self) -> bool:
+        """Check credentials, sending a challenge when they are missing."""
+        state = self.state
+        if not state.username:
+            return True
+        header = self.headers.get("Authorization", "")
+        basic = base64.b64encode(f"{state.username}:{state.password}".encode()).decode()
+        if state.token_auth:
+            if header == "Bearer stub-token":
+                return True
+            host = self.headers.get("Host")
+            self.send(
+                401,
+                headers={
+                    "WWW-Authenticate": (
+                        f'Bearer realm="http://{host}/token",'
+                        'service="stub",scope="repository:ghaf:pull,push"'
+                    )
+                },
+            )
+            return False
+        if header == f"Basic {basic}":
+            return True
+        self.send(401, headers={"WWW-Authenticate": 'Basic realm="stub"'})
+        return False
+
+    def handle_any(self) -> None:
+        """Dispatch one request."""
+        url = urlsplit(self.path)
+        state = self.state
+        with state.lock:
+            state.requests.append((self.command, url.path))
+            for index, (method, fragment, status, headers) in enumerate(state.faults):
+                if method == self.command and fragment in url.path:
+                    del state.faults[index]
+                    self.read_body()
+                    if status:
+                        self.send(status, b"injected fault", headers)
+                    else:
+                        self.close_connection = True
+                    return
+
+        if url.path == "/token":
+            basic = base64.b64encode(
+                f"{state.username}:{state.password}".encode()
+            ).decode()
+            if self.headers.get("Authorization") != f"Basic {basic}":
+                self.send(401)
+                return
+            self.send(200, json.dumps({"token": "stub-token"}).encode())
+            return
+
+        if not self.authorized():
+            self.read_body()
+            return
+
+        if url.path == "/v2/":
+            self.send(200, b"{}")
+            return
+
+        route = ROUTE_PATTERN.match(url.path)
+        if not route:
+            self.send(404)
+            return
+
+        name, kind, ref = route["name"], route["kind"], route["ref"] or ""
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        getattr(self, f"route_{kind.replace('/', '_')}")(name, ref, query)
+
+    def route_blobs(self, _name: str, digest: str, _query: dict[str, str]) -> None:
+        """Serve blob existence checks and downloads."""
+        data = self.state.blobs.get(digest)
+        if data is None:
+            self.send(404)
+            return
+        self.send(200, data, {"Docker-Content-Digest": digest})
+
+    def route_blobs_uploads(
+        self, name: str, upload_id: str, query: dict[str, str]
+    ) -> None:
+        """Serve blob upload sessions."""
+        state = self.state
+        body = self.read_body()
+        if self.command == "POST":
+            upload_id = uuid.uuid4().hex
+            with state.lock:
+                state.uploads[upload_id] = bytearray()
+            self.send(
+                202,
+                headers={
+                    "Location": f"/v2/{name}/blobs/uploads/{upload_id}",
+                    "Range": "0-0",
+                },
+            )
+            return
+
+        with state.lock:
+            upload = state.uploads.get(upload_id)
+        if upload is None:
+            self.send(404)
+            return
+
+        if self.command == "PATCH":
+            content_range = self.headers.get("Content-Range")
+            if content_range and int(content_range.split("-")[0]) != len(upload):
+                self.send(416, headers={"Range": f"0-{len(upload) - 1}"})
+                return
+            upload.extend(body)
+        elif self.command == "PUT":
+            upload.extend(body)
+            digest = query.get("digest", "")
+            if sha256_digest(bytes(upload)) != digest:
+                self.send(400, b"digest mismatch")
+                return
+            with state.lock:
+                state.blobs[digest] = bytes(upload)
+                del state.uploads[upload_id]
+            self.send(
+                201,
+                headers={
+                    "Location": f"/v2/{name}/blobs/{digest}",
+                    "Docker-Content-Digest": digest,
+                },
+            )
+            return
+
+        self.send(
+            202 if self.command == "PATCH" else 204,
+            headers={
+                "Location": f"/v2/{name}/blobs/uploads/{upload_id}",
+                "Range": f"0-{max(len(upload) - 1, 0)}",
+            },
+        )
+
+    def route_manifests(self, name: str, ref: str, _query: dict[str, str]) -> None:
+        """Serve manifest pushes and lookups."""
+        state = self.state
+        if self.command == "PUT":
+            data = self.read_body()
+            digest = sha256_digest(data)
+            media_type = self.headers.get("Content-Type", "")
+            manifest = json.loads(data)
+            for descriptor in [manifest.get("config"), *manifest.get("layers", [])]:
+                if descriptor and descriptor["digest"] not in state.blobs:
+                    self.send(400, b"manifest blob unknown")
+                    return
+            with state.lock:
+                state.manifests[(name, digest)] = (data, media_type)
+                if not ref.startswith("sha256:"):
+                    state.tags[(name, ref)] = digest
+            headers = {
+                "Docker-Content-Digest": digest,
+                "Location": f"/v2/{name}/manifests/{digest}",
+            }
+            subject = manifest.get("subject")
+            if subject and state.referrers_api:
+                headers["OCI-Subject"] = subject["digest"]
+            self.send(201, headers=headers)
+            return
+
+        digest = ref if ref.startswith("sha256:") else state.tags.get((name, ref), "")
+        stored = state.manifests.get((name, digest))
+        if stored is None:
+            self.send(404)
+            return
+        data, media_type = stored
+        self.send(
+            200, data, {"Content-Type": media_type, "Docker-Content-Digest": digest}
+        )
+
+    def route_referrers(self, name: str, digest: str, query: dict[str, str]) -> None:
+        """Serve the OCI referrers API."""
+        if not self.state.referrers_api:
+            self.send(404)
+            return
+        descriptors = self.state.referrers(name, digest)
+        if "artifactType" in query:
+            descriptors = [
+                item
+                for item in descriptors
+                if item["artifactType"] == query["artifactType"]
+            ]
+        index = {
+            "schemaVersion": 2,
+            "mediaType": OCI_INDEX_MEDIA_TYPE,
+            "manifests": descriptors,
+        }
+        self.send(
+            200, json.dumps(index).encode(), {"Content-Type": OCI_INDEX_MEDIA_TYPE}
+        )
+
+    do_GET = do_HEAD = do_POST = do_PATCH = do_PUT = handle_any
+
+
+class RegistryServer(ThreadingHTTPServer):
+    """Threaded registry stand-in bound to an ephemeral localhost port."""
+
+    daemon_threads = True
+
+    def __init__(self, state: RegistryState | None = None):
+        super().__init__(("127.0.0.1", 0), RegistryHandler)
+        self.state = state or RegistryState()
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    @property
+    def address(self) -> str:
+        """Registry host:port as used in OCI references."""
+        host, port = self.server_address[:2]
+        return f"{host}:{port}"
+
+    def __enter__(self) -> "RegistryServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,345 @@
+# SPDX-FileCopyrightText: 2022-2025 TII (SSRC) and the Ghaf contributors
+# SPDX-License-Identifier: Apache-2.0
+
+# pylint: disable=missing-function-docstring, wrong-import-position
+
+"""Tests for the NetHSM exporter collector."""
+
+import json
+import shutil
+import ssl
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from wsgiref.util import setup_testing_defaults
+
+import pytest
+import requests
+
+sys.path.insert(
+    0, str(Path(__file__).resolve().parents[1] / "pkgs" / "nethsm-exporter" / "src")
+)
+
+import nethsm_exporter
+
+PAYLOAD = {
+    "http response 200": "42",
+    "http response 401": "3",
+    "uptime": "1000",
+    "system state": "Operational",
+}
+
+
+class HSMHandler(BaseHTTPRequestHandler):
+    """Serve the NetHSM metrics endpoint over keep-alive connections."""
+
+    protocol_version = "HTTP/1.1"
+    server: "HSMServer"
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.connections += 1
+
+    def log_message(self, format: str, *args: Any) -> None:
+        return
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        body = json.dumps(PAYLOAD).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        if self.server.close_next:
+            self.server.close_next = False
+            self.close_connection = True
+
+
+class HSMServer(ThreadingHTTPServer):
+    """HTTPS stand-in for a NetHSM appliance."""
+
+    daemon_threads = True
+
+    def __init__(self, certificate: Path, key: Path):
+        super().__init__(("127.0.0.1", 0), HSMHandler)
+        self.connections = 0
+        self.close_next = False
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(certificate, key)
+        self.socket = context.wrap_socket(self.socket, server_side=True)
+
+    @property
+    def address(self) -> str:
+        """host:port of the server."""
+        host, port = self.server_address[:2]
+        return f"{host}:{port}"
+
+
+@pytest.fixture(name="hsm")
+def fixture_hsm(tmp_path: Path) -> Any:
+    if not shutil.which("openssl"):
+        pytest.skip("openssl is not installed")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1"]
+        + ["-subj", "/CN=hsm", "-keyout", str(tmp_path / "hsm.key")]
+        + ["-out", str(tmp_path / "hsm.pem")],
+        check=True,
+        capture_output=True,
+    )
+    server = HSMServer(tmp_path / "hsm.pem", tmp_path / "hsm.key")
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _families(collector: nethsm_exporter.HSMCollector) -> dict[str, Any]:
+    return {family.name: family for family in collector.collect()}
+
+
+def _value(families: dict[str, Any], name: str) -> float:
+    return families[name].samples[0].value
+
+
+def test_scrapes_serve_the_polled_snapshot(monkeypatch: pytest.MonkeyPatch) -> None:
+    collector = nethsm_exporter.HSMCollector("hsm", "user", "secret", interval=60)
+    fetches: list[int] = []
+
+    def fetch() -> dict[str, str]:
+        fetches.append(1)
+        if len(fetches) > 1:
+            raise requests.exceptions.ConnectionError("unreachable")
+        return PAYLOAD
+
+    monkeypatch.setattr(collector, "fetch", fetch)
+    first = _families(collector)
+    second = _families(collector)
+    assert len(fetches) == 1
+    assert _value(second, "nethsm_up") == 1
+    assert _value(second, "nethsm_uptime") == 1000
+    assert "nethsm_system_state" not in first
+    assert sorted(
+        (sample.labels["code"], sample.value)
+        for sample in second["nethsm_http_response"].samples
+    ) == [("200", 42), ("401", 3)]
+
+    # A failed poll keeps serving the last good values, marked stale.
+    success_time = collector.snapshot.success_time
+    collector.refresh()
+    failed = _families(collector)
+    assert _value(failed, "nethsm_up") == 0
+    assert _value(failed, "nethsm_last_success_timestamp") == success_time
+    assert _value(failed, "nethsm_snapshot_age_seconds") >= 0
+    assert _value(failed, "nethsm_uptime") == 1000
+
+
+def test_concurrent_scrapes_share_one_fetch(monkeypatch: pytest.MonkeyPatch) -> None:
+    collector = nethsm_exporter.HSMCollector("hsm", "user", "secret", interval=0)
+    fetches: list[int] = []
+    release = threading.Event()
+
+    def slow_fetch() -> dict[str, str]:
+        fetches.append(1)
+        release.wait(5)
+        return PAYLOAD
+
+    monkeypatch.setattr(collector, "fetch", slow_fetch)
+    results: list[dict[str, Any]] = []
+    threads = [
+        threading.Thread(target=lambda: results.append(_families(collector)))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    while not fetches:
+        time.sleep(0.01)
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(fetches) == 1
+    assert [_value(families, "nethsm_up") for families in results] == [1] * 4
+
+
+def test_poller_refreshes_in_the_background(monkeypatch: pytest.MonkeyPatch) -> None:
+    collector = nethsm_exporter.HSMCollector("hsm", "user", "secret", interval=0.01)
+    fetches: list[int] = []
+
+    def fetch() -> dict[str, str]:
+        fetches.append(1)
+        return PAYLOAD
+
+    monkeypatch.setattr(collector, "fetch", fetch)
+    collector.start()
+    try:
+        deadline = time.monotonic() + 5
+        while len(fetches) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        collector.stop()
+    assert len(fetches) >= 3
+    assert collector.snapshot.up
+
+
+@pytest.mark.filterwarnings("ignore::urllib3.exceptions.InsecureRequestWarning")
+def test_fetches_reuse_one_keep_alive_connection(hsm: Any) -> None:
+    collector = nethsm_exporter.HSMCollector(hsm.address, "user", "secret", interval=0)
+    for _ in range(3):
+        assert _value(_families(collector), "nethsm_up") == 1
+    assert hsm.connections == 1
+
+    # The HSM closes the connection: the next fetch reconnects by itself.
+    hsm.close_next = True
+    _families(collector)
+    families = _families(collector)
+    assert _value(families, "nethsm_up") == 1
+    assert hsm.connections == 2
+    connections = {
+        sample.labels["state"]: sample.value
+        for sample in families["nethsm_exporter_connections"].samples
+        if sample.name.endswith("_total")
+    }
+    assert connections == {"new": 2, "reused": 3}
+
+
+def test_slow_hsm_does_not_delay_the_others(monkeypatch: pytest.MonkeyPatch) -> None:
+    fast = nethsm_exporter.HSMCollector("hsm-a", "user", "secret", interval=0)
+    slow = nethsm_exporter.HSMCollector("hsm-b", "user", "secret", interval=0)
+    release = threading.Event()
+
+    def hanging_fetch() -> dict[str, str]:
+        release.wait(5)
+        return PAYLOAD
+
+    monkeypatch.setattr(fast, "fetch", lambda: PAYLOAD)
+    monkeypatch.setattr(slow, "fetch", hanging_fetch)
+    collector = nethsm_exporter.MultiHSMCollector([fast, slow], timeout=0.2)
+    try:
+        started = time.monotonic()
+        families = _families(collector)
+        assert time.monotonic() - started < 2
+    finally:
+        release.set()
+
+    assert {
+        sample.labels["instance"]: sample.value
+        for sample in families["nethsm_up"].samples
+    } == {"hsm-a": 1, "hsm-b": 0}
+    assert [sample.labels for sample in families["nethsm_uptime"].samples] == [
+        {"instance": "hsm-a"}
+    ]
+
+
+def test_polled_hsm_serves_its_snapshot_while_fetching(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    polled = nethsm_exporter.HSMCollector("hsm-a", "user", "secret", interval=60)
+    release = threading.Event()
+
+    def hanging_fetch() -> dict[str, str]:
+        release.wait(5)
+        return PAYLOAD
+
+    monkeypatch.setattr(polled, "fetch", lambda: PAYLOAD)
+    _ = polled.refresh()
+    monkeypatch.setattr(polled, "fetch", hanging_fetch)
+    poll = threading.Thread(target=polled.refresh)
+    poll.start()
+    collector = nethsm_exporter.MultiHSMCollector([polled], timeout=0.2)
+    try:
+        while not polled.fetching:
+            time.sleep(0.01)
+        families = _families(collector)
+    finally:
+        release.set()
+        poll.join()
+
+    assert _value(families, "nethsm_up") == 1
+    assert _value(families, "nethsm_uptime") == 1000
+
+
+def test_probe_serves_one_configured_target(monkeypatch: pytest.MonkeyPatch) -> None:
+    collector = nethsm_exporter.HSMCollector("hsm-a", "user", "secret", interval=0)
+    monkeypatch.setattr(collector, "fetch", lambda: PAYLOAD)
+    app = nethsm_exporter.make_app({"hsm-a": collector})
+
+    def probe(target: str) -> tuple[str, str]:
+        environ: dict[str, Any] = {}
+        setup_testing_defaults(environ)
+        environ.update(PATH_INFO="/probe", QUERY_STRING=f"target={target}")
+        statuses: list[str] = []
+        body = b"".join(app(environ, lambda status, _: statuses.append(status)))
+        return statuses[0], body.decode()
+
+    status, body = probe("hsm-a")
+    assert status.startswith("200")
+    assert "nethsm_up 1.0" in body
+    assert "nethsm_uptime 1000.0" in body
+    status, _ = probe("attacker.example")
+    assert status.startswith("400")
+
+
+def test_translations_are_built_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    collector = nethsm_exporter.HSMCollector("hsm", "user", "secret", interval=0)
+    payload = PAYLOAD | {"tls certificate": "valid"}
+    monkeypatch.setattr(collector, "fetch", lambda: dict(payload))
+    translated: list[str] = []
+    translate = nethsm_exporter.translate
+
+    def counting_translate(key: str, value: str) -> Any:
+        translated.append(key)
+        return translate(key, value)
+
+    monkeypatch.setattr(nethsm_exporter, "translate", counting_translate)
+    _families(collector)
+    assert sorted(translated) == sorted(payload)
+    assert collector.translations["tls certificate"] is None
+    assert collector.translations["http response 401"][-2:] == ("code", "401")
+
+    _families(collector)
+    assert len(translated) == len(payload)
+
+    payload["memory free"] = "7"
+    families = _families(collector)
+    assert translated[len(PAYLOAD) + 1 :] == ["memory free"]
+    assert _value(families, "nethsm_memory_free") == 7
+
+
+def test_keys_are_grouped_into_typed_families(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    collector = nethsm_exporter.HSMCollector("hsm", "user", "secret", interval=0)
+    payload = PAYLOAD | {
+        "gc minor collections": "12",
+        "gc major collections": "2",
+        "kv read": "30",
+        "kv write": "7",
+        "software version": "2.1",
+    }
+    monkeypatch.setattr(collector, "fetch", lambda: payload)
+    families = _families(collector)
+
+    assert {name: family.type for name, family in families.items()}.items() >= {
+        "nethsm_http_response": "counter",
+        "nethsm_gc_collections": "counter",
+        "nethsm_kv_operations": "counter",
+        "nethsm_uptime": "gauge",
+        "nethsm_system": "info",
+    }.items()
+    assert [
+        (sample.name, sample.labels, sample.value)
+        for sample in families["nethsm_gc_collections"].samples
+    ] == [
+        ("nethsm_gc_collections_total", {"generation": "minor"}, 12),
+        ("nethsm_gc_collections_total", {"generation": "major"}, 2),
+    ]
+    assert [sample.labels for sample in families["nethsm_system"].samples] == [
+        {"system_state": "Operational", "software_version": "2.1"}
+    ]
+    assert "nethsm_kv_read" not in families
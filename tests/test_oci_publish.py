@@ -0,0 +1,1409 @@
+# SPDX-FileCopyrightText: 2026 TII (SSRC) and the Ghaf contributors
+# SPDX-License-Identifier: Apache-2.0
+
+# pylint: disable=missing-function-docstring, protected-access, wrong-import-position, too-many-lines
+
+"""Tests for the oci-publish helper logic."""
+
+import argparse
+import io
+import gzip
+import hashlib
+import json
+import random
+import shutil
+import subprocess
+import sys
+import tarfile
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+sys.path.insert(
+    0, str(Path(__file__).resolve().parents[1] / "pkgs" / "oci-publish" / "src")
+)
+
+import oci_publish
+from oci_registry_stub import RegistryServer, RegistryState
+
+
+@pytest.fixture(autouse=True)
+def fixture_state_dir(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setenv("OCI_PUBLISH_STATE_DIR", str(tmp_path / "state"))
+
+
+def _attestation_manifest(roles: tuple[str, ...]) -> dict[str, Any]:
+    """Build a manifest declaring attestations for the given roles."""
+    return {
+        "attestations": {
+            role: {
+                "path": f"attestations/{role}.json" if role in roles else "",
+                "signature": {"path": f"attestations/{role}.json.sig"},
+            }
+            for role in oci_publish.ATTESTATION_ROLES
+        }
+    }
+
+
+def test_publish_attestations_keeps_role_order_when_concurrent(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """Concurrent attaches must still report referrers in role order."""
+    delays = {"provenance": 0.15, "sbom_cyclonedx": 0.1, "sbom_spdx": 0.05}
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def fake_publish_referrer(**kwargs: Any) -> dict[str, str]:
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(delays.get(kwargs["role"], 0))
+        with lock:
+            active -= 1
+        return {"path": kwargs["relpath"], "digest": f"sha256:{kwargs['role']}"}
+
+    monkeypatch.setattr(oci_publish, "publish_referrer", fake_publish_referrer)
+
+    referrers = oci_publish.publish_attestations(
+        target=oci_publish.TargetModel(
+            tmp_path, _attestation_manifest(oci_publish.ATTESTATION_ROLES)
+        ),
+        publisher=None,
+        subject_reference="example/repo@sha256:abc",
+        workers=4,
+    )
+
+    assert list(referrers) == list(oci_publish.ATTESTATION_ROLES)
+    assert peak > 1
+
+
+def test_publish_attestations_skips_missing_roles_and_limits_workers(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """Roles without a path are skipped and `workers=1` stays sequential."""
+    calls: list[str] = []
+
+    def fake_publish_referrer(**kwargs: Any) -> dict[str, str]:
+        calls.append(threading.current_thread().name)
+        return {"path": kwargs["relpath"], "digest": "sha256:0"}
+
+    monkeypatch.setattr(oci_publish, "publish_referrer", fake_publish_referrer)
+
+    referrers = oci_publish.publish_attestations(
+        target=oci_publish.TargetModel(
+            tmp_path, _attestation_manifest(("provenance", "sbom_csv"))
+        ),
+        publisher=None,
+        subject_reference="example/repo:tag",
+        workers=1,
+    )
+
+    assert list(referrers) == ["provenance", "sbom_csv"]
+    assert calls == [threading.main_thread().name] * 2
+
+
+def test_positive_int_rejects_zero() -> None:
+    with pytest.raises(argparse.ArgumentTypeError, match="positive integer"):
+        oci_publish.positive_int("0")
+    assert oci_publish.positive_int("3") == 3
+
+
+def _write_target(target_dir: Path, target: str) -> Path:
+    target_dir.mkdir(parents=True)
+    oci_publish.write_json(target_dir / "manifest.json", {"target": target})
+    return target_dir
+
+
+def test_publish_targets_aggregates_results_and_failures(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """One failing target is reported without hiding the others."""
+    _write_target(tmp_path / "out" / "a", "Target-A")
+    _write_target(tmp_path / "out" / "b", "target-b")
+    _write_target(tmp_path / "out" / "c", "target-c")
+    (tmp_path / "out" / "not-a-target").mkdir()
+    logins: list[str] = []
+
+    @oci_publish.contextmanager
+    def fake_context(_backend: str, _options: Any):
+        logins.append("login")
+        yield None, "registry.example/", True
+
+    def fake_publish_target_dir(**kwargs: Any) -> dict[str, Any]:
+        if kwargs["target"].name == "target-b":
+            oci_publish.fail("push failed")
+        if kwargs["target"].name == "target-c":
+            raise KeyError("root")
+        return {"target": kwargs["target"].name, "ref": kwargs["repository"]}
+
+    monkeypatch.setattr(oci_publish, "publish_context", fake_context)
+    monkeypatch.setattr(oci_publish, "publish_target_dir", fake_publish_target_dir)
+
+    args = oci_publish.build_parser().parse_args(
+        [
+            "targets",
+            "--glob",
+            str(tmp_path / "out" / "*"),
+            "--repository-template",
+            "ghaf/main/{target}",
+            "--primary-tag",
+            "build-1",
+            "--result-json",
+            str(tmp_path / "batch.json"),
+            "--jobs",
+            "2",
+        ]
+    )
+    with pytest.raises(oci_publish.PublishError, match="2 of 3"):
+        args.handler(args)
+
+    batch = oci_publish.read_json(tmp_path / "batch.json")
+    assert logins == ["login"]
+    assert (batch["published"], batch["failed"]) == (1, 2)
+    assert [entry["status"] for entry in batch["targets"]] == [
+        "published",
+        "failed",
+        "failed",
+    ]
+    assert batch["targets"][0]["result"]["ref"] == "ghaf/main/target-a"
+    assert batch["targets"][1]["error"] == "push failed"
+    assert batch["targets"][2]["error"] == "KeyError: 'root'"
+
+
+def test_resolve_target_dirs_requires_matches(tmp_path: Path) -> None:
+    with pytest.raises(oci_publish.PublishError, match="matched nothing"):
+        oci_publish.resolve_target_dirs([], [str(tmp_path / "missing-*")])
+
+
+def _make_target(target_dir: Path, *, image_size: int = 4096) -> Path:
+    """Create a signed disk image target with all attestations."""
+    (target_dir / "images").mkdir(parents=True)
+    (target_dir / "attestations").mkdir()
+    (target_dir / "images" / "disk.raw").write_bytes(
+        bytes(range(256)) * (image_size // 256)
+    )
+    (target_dir / "images" / "disk.raw.sig").write_bytes(b"signature")
+    attestations = {}
+    for role, name in (
+        ("provenance", "provenance.json"),
+        ("sbom_cyclonedx", "sbom.cdx.json"),
+        ("sbom_spdx", "sbom.spdx.json"),
+        ("sbom_csv", "sbom.csv"),
+    ):
+        (target_dir / "attestations" / name).write_text(f"{role}\n", encoding="utf-8")
+        attestations[role] = {"path": f"attestations/{name}"}
+    (target_dir / "attestations" / "provenance.json.sig").write_bytes(b"sig")
+    attestations["provenance"]["signature"] = {
+        "path": "attestations/provenance.json.sig"
+    }
+    oci_publish.write_json(
+        target_dir / "manifest.json",
+        {
+            "target": "lenovo-x1",
+            "source": {"repository": "https://example.com/ghaf", "revision": "abc"},
+            "images": [
+                {
+                    "path": "images/disk.raw",
+                    "role": "image",
+                    "signature": {"path": "images/disk.raw.sig"},
+                }
+            ],
+            "attestations": attestations,
+        },
+    )
+    return target_dir
+
+
+def _publish(args: list[str]) -> int:
+    parsed = oci_publish.build_parser().parse_args(["--backend", "native", *args])
+    return parsed.handler(parsed)
+
+
+@pytest.fixture(name="registry")
+def fixture_registry(monkeypatch: pytest.MonkeyPatch) -> Any:
+    state = RegistryState(username="jenkins", password="secret")
+    with RegistryServer(state) as server:
+        monkeypatch.setenv("OCI_REGISTRY", server.address)
+        monkeypatch.setenv("OCI_USERNAME", "jenkins")
+        monkeypatch.setenv("OCI_PASSWORD", "secret")
+        monkeypatch.setenv("OCI_PLAIN_HTTP", "1")
+        monkeypatch.delenv("OCI_LAYOUT_PATH", raising=False)
+        yield server
+
+
+def test_parse_reference_splits_registry_repository_and_ref() -> None:
+    parsed = oci_publish.parse_reference("localhost:5000/ghaf/main/x:build-1")
+    assert (parsed.registry, parsed.repository, parsed.tag) == (
+        "localhost:5000",
+        "ghaf/main/x",
+        "build-1",
+    )
+    parsed = oci_publish.parse_reference("ghaf/x@sha256:abc")
+    assert (parsed.registry, parsed.repository, parsed.reference) == (
+        "",
+        "ghaf/x",
+        "sha256:abc",
+    )
+    with pytest.raises(oci_publish.PublishError, match="tag or digest"):
+        oci_publish.parse_reference("registry.example/ghaf/x")
+
+
+def test_native_publisher_refuses_references_on_other_registries(
+    tmp_path: Path,
+) -> None:
+    remote = oci_publish.NativePublisher(oci_publish.RegistryClient("registry.example"))
+    assert remote.parse("registry.example/ghaf/x:v1").repository == "ghaf/x"
+    assert remote.parse("ghaf/x:v1").repository == "ghaf/x"
+    with pytest.raises(oci_publish.PublishError, match="registry other.example"):
+        remote.parse("other.example/ghaf/x:v1")
+
+    layout = oci_publish.NativePublisher(oci_publish.LayoutClient(tmp_path / "oci"))
+    assert layout.parse("ghaf/x:v1").repository == "ghaf/x"
+    with pytest.raises(oci_publish.PublishError, match="OCI layout"):
+        layout.parse("registry.example/ghaf/x:v1")
+
+
+def test_native_publish_target_uses_pooled_connections(
+    registry: RegistryServer, tmp_path: Path
+) -> None:
+    target_dir = _make_target(tmp_path / "target")
+    result_json = tmp_path / "result.json"
+
+    _publish(
+        [
+            "target",
+            "-d",
+            str(target_dir),
+            "-r",
+            "ghaf/main/lenovo-x1",
+            "--primary-tag",
+            "build-1",
+            "-o",
+            str(result_json),
+            "-t",
+            "main-latest",
+        ]
+    )
+
+    state = registry.state
+    result = oci_publish.read_json(result_json)
+    digest = result["primary"]["digest"]
+    assert result["primary"]["media_type"] == oci_publish.OCI_MANIFEST_MEDIA_TYPE
+    assert (
+        result["primary"]["reference"]
+        == f"{registry.address}/ghaf/main/lenovo-x1@{digest}"
+    )
+    assert state.tags[("ghaf/main/lenovo-x1", "build-1")] == digest
+    assert state.tags[("ghaf/main/lenovo-x1", "main-latest")] == digest
+
+    manifest = json.loads(state.manifests[("ghaf/main/lenovo-x1", digest)][0])
+    assert manifest["artifactType"] == oci_publish.TARGET_ARTIFACT_TYPE
+    assert [
+        layer["annotations"][oci_publish.TITLE_ANNOTATION]
+        for layer in manifest["layers"]
+    ] == [
+        "images/disk.raw",
+        "images/disk.raw.sig",
+    ]
+
+    referrers = state.referrers("ghaf/main/lenovo-x1", digest)
+    assert sorted(item["digest"] for item in referrers) == sorted(
+        item["digest"] for item in result["referrers"].values()
+    )
+    assert len(referrers) == 4
+    assert state.connections < state.count("PUT") + state.count("POST")
+
+
+def test_native_client_chunked_upload_and_bearer_auth(tmp_path: Path) -> None:
+    state = RegistryState(username="jenkins", password="secret", token_auth=True)
+    blob_file = tmp_path / "root.raw"
+    blob_file.write_bytes(b"0123456789" * 100)
+    with RegistryServer(state) as server:
+        client = oci_publish.RegistryClient(
+            server.address,
+            username="jenkins",
+            password="secret",
+            plain_http=True,
+            chunk_size=256,
+        )
+        blob = oci_publish.Blob.from_file(blob_file, "application/octet-stream")
+        client.push_blob("ghaf", blob)
+        assert client.blob_exists("ghaf", blob.digest)
+        client.close()
+
+    assert state.blobs[blob.digest] == blob_file.read_bytes()
+    assert state.count("PATCH") == 4
+    assert state.count("GET", "/token") == 1
+
+
+def test_native_attach_falls_back_to_referrers_tag(tmp_path: Path) -> None:
+    state = RegistryState(referrers_api=False)
+    target_dir = _make_target(tmp_path / "target")
+    with RegistryServer(state) as server:
+        client = oci_publish.RegistryClient(server.address, plain_http=True)
+        publisher = oci_publish.NativePublisher(client)
+        pushed = publisher.push(
+            reference=f"{server.address}/ghaf/x:build-1",
+            artifact_type=oci_publish.TARGET_ARTIFACT_TYPE,
+            config=oci_publish.PublishFile(
+                "manifest.json", oci_publish.TARGET_CONFIG_MEDIA_TYPE
+            ),
+            files=[
+                oci_publish.PublishFile("images/disk.raw", "application/octet-stream")
+            ],
+            annotations={},
+            cwd=target_dir,
+        )
+        subject = f"{server.address}/ghaf/x@{pushed['digest']}"
+        attached = oci_publish.publish_referrer(
+            publisher=publisher,
+            subject_reference=subject,
+            target_dir=target_dir,
+            role="sbom_csv",
+            relpath="attestations/sbom.csv",
+        )
+        listed = client.referrers("ghaf/x", pushed["digest"])
+        client.close()
+
+    assert [item["digest"] for item in listed] == [attached["digest"]]
+    assert listed[0]["artifactType"] == "text/csv"
+
+
+def test_native_publish_target_to_oci_layout(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    layout = tmp_path / "layout"
+    monkeypatch.setenv("OCI_LAYOUT_PATH", str(layout))
+    target_dir = _make_target(tmp_path / "target")
+
+    _publish(
+        [
+            "target",
+            "-d",
+            str(target_dir),
+            "-r",
+            "ghaf/x",
+            "--primary-tag",
+            "build-1",
+            "-o",
+            str(tmp_path / "result.json"),
+            "-t",
+            "latest",
+        ]
+    )
+
+    result = oci_publish.read_json(tmp_path / "result.json")
+    client = oci_publish.LayoutClient(layout)
+    index = oci_publish.read_json(layout / "index.json")
+    ref_names = {
+        item["annotations"][oci_publish.REF_NAME_ANNOTATION]
+        for item in index["manifests"]
+        if "annotations" in item
+    }
+    assert ref_names == {"ghaf/x:build-1", "ghaf/x:latest"}
+    assert client.resolve("ghaf/x", "latest")["digest"] == result["primary"]["digest"]
+    assert len(client.referrers("ghaf/x", result["primary"]["digest"])) == 4
+    assert client.blob_exists(
+        "ghaf/x", oci_publish.file_digest(target_dir / "images" / "disk.raw")
+    )
+
+
+def test_native_republish_skips_present_blobs(
+    registry: RegistryServer, tmp_path: Path
+) -> None:
+    target_dir = _make_target(tmp_path / "target", image_size=64 * 1024)
+    args = [
+        "target",
+        "-d",
+        str(target_dir),
+        "-r",
+        "ghaf/x",
+        "--primary-tag",
+        "build-1",
+        "-o",
+        str(tmp_path / "first.json"),
+    ]
+    _publish(args)
+    uploads = registry.state.count("POST", "/blobs/uploads/")
+
+    _publish([*args[:-1], str(tmp_path / "second.json")])
+
+    first = oci_publish.read_json(tmp_path / "first.json")["transfer"]
+    second = oci_publish.read_json(tmp_path / "second.json")["transfer"]
+    assert first["uploaded_bytes"] > 64 * 1024
+    assert (second["uploaded_blobs"], second["uploaded_bytes"]) == (0, 0)
+    assert second["skipped_bytes"] == first["uploaded_bytes"] + first["skipped_bytes"]
+    assert registry.state.count("POST", "/blobs/uploads/") == uploads
+
+
+def test_digest_cache_persists_and_invalidates(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    image = tmp_path / "root.raw"
+    image.write_bytes(b"a" * (oci_publish.DIGEST_READ_SIZE + 7))
+    expected = oci_publish.file_digest(image)
+    reads: list[Path] = []
+    real_file_digest = oci_publish.file_digest
+
+    def counting_file_digest(path: Path) -> str:
+        reads.append(path)
+        return real_file_digest(path)
+
+    monkeypatch.setattr(oci_publish, "file_digest", counting_file_digest)
+    index_path = tmp_path / oci_publish.DIGEST_CACHE_NAME
+    cache = oci_publish.DigestCache(index_path)
+
+    assert cache.digest(image) == expected
+    assert not index_path.exists()
+    cache.flush()
+    # A fresh instance stands in for a later retry in a new process.
+    retry = oci_publish.DigestCache(index_path)
+    assert retry.digest(image) == expected
+    assert (retry.hits, len(reads)) == (1, 1)
+
+    image.write_bytes(b"b" * 10)
+    assert retry.digest(image) == real_file_digest(image)
+    assert len(reads) == 2
+
+    # Shared instances only live while a publish holds them.
+    shared = oci_publish.DigestCache.for_directory(tmp_path)
+    assert oci_publish.DigestCache.for_directory(tmp_path) is shared
+    del shared
+    shared_path = oci_publish.state_file(tmp_path, oci_publish.DIGEST_CACHE_NAME)
+    assert shared_path not in oci_publish.DigestCache._instances
+
+
+def test_chunked_upload_resumes_from_checkpoint(tmp_path: Path) -> None:
+    state = RegistryState()
+    root_image = tmp_path / "root.raw"
+    root_image.write_bytes(bytes(range(256)) * 40)
+    upload_state = oci_publish.UploadState.for_directory(tmp_path)
+    # Checkpoints stay out of the served target directory.
+    assert upload_state.state_path.is_relative_to(oci_publish.state_dir())
+    with RegistryServer(state) as server:
+        client = oci_publish.RegistryClient(
+            server.address, plain_http=True, chunk_size=1024
+        )
+        blob = oci_publish.Blob.from_file(root_image, "application/octet-stream")
+        # Simulate the connection dropping while sending the fourth chunk.
+        patches: list[int] = []
+        original_request = client.request
+
+        def flaky_request(method: str, url: str, **kwargs: Any) -> Any:
+            if method == "PATCH":
+                patches.append(1)
+                if len(patches) == 4:
+                    raise oci_publish.RegistryError("connection reset")
+            return original_request(method, url, **kwargs)
+
+        client.request = flaky_request  # type: ignore[method-assign]
+        with pytest.raises(oci_publish.RegistryError):
+            client.push_blob("ghaf/x", blob, state=upload_state)
+
+        key = f"{server.address}/ghaf/x@{blob.digest}"
+        assert upload_state.get(key)["offset"] == 3 * 1024
+
+        # A re-run in a new process reads the checkpoint from disk.
+        resumed_state = oci_publish.UploadState(upload_state.state_path)
+        client.request = original_request  # type: ignore[method-assign]
+        client.push_blob("ghaf/x", blob, state=resumed_state)
+        client.close()
+
+    assert state.blobs[blob.digest] == root_image.read_bytes()
+    assert state.count("POST", "/blobs/uploads/") == 1
+    assert state.count("PATCH") == 3 + 7
+    assert not upload_state.state_path.exists()
+
+
+def test_retry_policy_backs_off_on_transient_errors_only(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    slept: list[float] = []
+    monkeypatch.setattr(oci_publish.time, "sleep", slept.append)
+    monkeypatch.setattr(oci_publish.random, "uniform", lambda _low, high: high)
+    policy = oci_publish.RetryPolicy(retries=3, base_delay=0.5, max_delay=1.5)
+    calls: list[int] = []
+
+    def flaky(*errors: oci_publish.RegistryError) -> str:
+        calls.append(1)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return "ok"
+
+    busy = oci_publish.RegistryError("busy", status=429, retry_after=7)
+    reset = oci_publish.RegistryError("reset", transient=True)
+    bad_gateway = oci_publish.RegistryError("bad gateway", status=502)
+    assert policy.call("op", flaky, bad_gateway, busy, reset) == "ok"
+    assert slept == [0.5, 7, 1.5]
+
+    calls.clear()
+    with pytest.raises(oci_publish.RegistryError, match="denied"):
+        policy.call("op", flaky, oci_publish.RegistryError("denied", status=403))
+    assert len(calls) == 1
+
+    calls.clear()
+    with pytest.raises(oci_publish.RegistryError, match="bad gateway"):
+        policy.call("op", flaky, *[bad_gateway] * 4)
+    assert len(calls) == 4
+
+    assert oci_publish.retry_after_seconds("12") == 12
+    assert oci_publish.retry_after_seconds("Thu, 01 Jan 1970 00:00:00 GMT") == 0
+    assert oci_publish.retry_after_seconds("soon") is None
+
+
+def test_publish_retries_transient_registry_failures(
+    registry: RegistryServer, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    slept: list[float] = []
+    monkeypatch.setattr(oci_publish.time, "sleep", slept.append)
+    target_dir = _make_target(tmp_path / "target")
+    state = registry.state
+    state.inject_fault("POST", "/blobs/uploads/", 502)
+    state.inject_fault("HEAD", "/blobs/", 429, {"Retry-After": "7"})
+    # Drop the connection twice, so the reconnect in _send fails as well.
+    state.inject_fault("PUT", "/manifests/build-1", 0)
+    state.inject_fault("PUT", "/manifests/build-1", 0)
+    _publish(
+        ["target", "-d", str(target_dir), "-r", "ghaf/x", "--primary-tag", "build-1"]
+        + ["-o", str(tmp_path / "result.json")]
+    )
+
+    assert not state.faults
+    assert 7 in slept and len(slept) >= 3
+    assert state.tags[("ghaf/x", "build-1")]
+    assert len(oci_publish.read_json(tmp_path / "result.json")["referrers"]) == 4
+
+
+def test_failed_publish_resumes_after_last_completed_step(
+    registry: RegistryServer, tmp_path: Path
+) -> None:
+    target_dir = _make_target(tmp_path / "target")
+    args = ["target", "-d", str(target_dir), "-r", "ghaf/x", "--primary-tag", "v1"]
+    args += ["-o", str(tmp_path / "result.json"), "--referrer-workers", "1"]
+    # The third referrer keeps failing after the primary and two referrers.
+    spdx = oci_publish.bytes_digest(b"sbom_spdx\n")
+    registry.state.inject_fault("HEAD", spdx, 502)
+    with pytest.raises(oci_publish.RegistryError, match="HTTP 502"):
+        _publish(["--retries", "0", *args])
+
+    progress_path = oci_publish.state_file(
+        target_dir, oci_publish.PUBLISH_PROGRESS_NAME
+    )
+    assert not list(target_dir.glob(".*"))
+    key = f"{registry.address}/ghaf/x:v1"
+    record = oci_publish.read_json(progress_path)["publishes"][key]
+    assert list(record["steps"]) == [
+        "push",
+        "referrer:provenance",
+        "referrer:sbom_cyclonedx",
+    ]
+    stale = oci_publish.PublishProgress(progress_path, key, "other fingerprint")
+    assert not stale.completed
+
+    _publish(args)
+    result = oci_publish.read_json(tmp_path / "result.json")
+    assert result["resumed"] == [
+        "push",
+        "referrer:provenance",
+        "referrer:sbom_cyclonedx",
+    ]
+    assert registry.state.count("PUT", "/manifests/v1") == 1
+    assert list(result["referrers"]) == list(oci_publish.ATTESTATION_ROLES)
+    assert result["referrers"]["provenance"] == record["steps"]["referrer:provenance"]
+    assert not progress_path.exists()
+
+
+def test_byte_size_accepts_suffixes() -> None:
+    assert oci_publish.byte_size("16M") == 16 * 1024 * 1024
+    assert oci_publish.byte_size("512kib") == 512 * 1024
+    with pytest.raises(argparse.ArgumentTypeError):
+        oci_publish.byte_size("0")
+
+
+def test_native_upload_runs_largest_blob_first(tmp_path: Path) -> None:
+    pushed: list[int] = []
+    active = [0, 0]
+    lock = threading.Lock()
+
+    class SlowLayout(oci_publish.LayoutClient):
+        """Layout client recording upload order and peak concurrency."""
+
+        def push_blob(self, repository: str, blob: oci_publish.Blob, **kwargs: Any):
+            with lock:
+                pushed.append(blob.size)
+                active[0] += 1
+                active[1] = max(active[1], active[0])
+            time.sleep(0.05)
+            super().push_blob(repository, blob, **kwargs)
+            with lock:
+                active[0] -= 1
+
+    blobs = [
+        oci_publish.Blob.from_bytes(b"x" * size, "application/octet-stream")
+        for size in (10, 300, 20, 4000)
+    ]
+    sequential = oci_publish.NativePublisher(
+        SlowLayout(tmp_path / "seq"), blob_workers=1
+    )
+    sequential._upload("ghaf/x", blobs, oci_publish.TransferStats(), tmp_path)
+    assert pushed == [4000, 300, 20, 10]
+    assert active[1] == 1
+
+    pushed.clear()
+    parallel = oci_publish.NativePublisher(SlowLayout(tmp_path / "par"), blob_workers=3)
+    parallel._upload("ghaf/x", blobs, oci_publish.TransferStats(), tmp_path)
+    # The three largest start together; the smallest waits for a free slot.
+    assert sorted(pushed[:3]) == [20, 300, 4000]
+    assert pushed[3] == 10
+    assert active[1] == 3
+
+
+def test_bandwidth_limiter_sleeps_off_debt(monkeypatch: pytest.MonkeyPatch) -> None:
+    clock = [100.0]
+    slept: list[float] = []
+    monkeypatch.setattr(oci_publish.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(oci_publish.time, "sleep", slept.append)
+    limiter = oci_publish.BandwidthLimiter(1000)
+
+    limiter.consume(1000)
+    assert not slept
+    limiter.consume(500)
+    assert slept == [pytest.approx(0.5)]
+    clock[0] += 2.0
+    limiter.consume(200)
+    assert len(slept) == 1
+
+
+def _make_test_results(root: Path) -> Path:
+    results_dir = root / "test-results"
+    (results_dir / "screenshots").mkdir(parents=True)
+    (results_dir / "output.xml").write_text("<robot/>\n" * 500, encoding="utf-8")
+    (results_dir / "screenshots" / "boot.png").write_bytes(bytes(range(256)) * 64)
+    (root / "test-results.json").write_text('{"passed": 3}', encoding="utf-8")
+    return results_dir
+
+
+def test_test_results_stream_into_registry_without_staging(
+    registry: RegistryServer, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    target_dir = _make_target(tmp_path / "target")
+    _publish(
+        [
+            "target",
+            "-d",
+            str(target_dir),
+            "-r",
+            "ghaf/x",
+            "--primary-tag",
+            "build-1",
+            "-o",
+            str(tmp_path / "result.json"),
+        ]
+    )
+    results_dir = _make_test_results(tmp_path / "run")
+
+    def no_staging(*_args: Any, **_kwargs: Any) -> None:
+        raise AssertionError("test results must not be staged on disk")
+
+    monkeypatch.setattr(oci_publish.tempfile, "TemporaryDirectory", no_staging)
+    state = registry.state
+    patches_before = state.count("PATCH")
+    _publish(
+        [
+            "--chunk-size",
+            "4096",
+            "test-results",
+            "-d",
+            str(results_dir),
+            "-s",
+            f"{registry.address}/ghaf/x:build-1",
+        ]
+    )
+
+    assert state.count("PATCH") - patches_before > 2
+    subject = state.tags[("ghaf/x", "build-1")]
+    (referrer,) = [
+        item
+        for item in state.referrers("ghaf/x", subject)
+        if item["artifactType"] == oci_publish.TEST_RESULTS_ARTIFACT_TYPE
+    ]
+    manifest = json.loads(state.manifests[("ghaf/x", referrer["digest"])][0])
+    (layer,) = manifest["layers"]
+    assert layer["mediaType"] == oci_publish.TEST_RESULTS_MEDIA_TYPE
+    assert layer["annotations"][oci_publish.TITLE_ANNOTATION] == "test-results.tar"
+    data = state.blobs[layer["digest"]]
+    assert layer["size"] == len(data)
+    with tarfile.open(fileobj=io.BytesIO(data)) as archive:
+        assert sorted(archive.getnames()) == [
+            "test-results",
+            "test-results.json",
+            "test-results/output.xml",
+            "test-results/screenshots",
+            "test-results/screenshots/boot.png",
+        ]
+
+
+def test_test_results_stream_into_oci_layout(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    layout = tmp_path / "layout"
+    monkeypatch.setenv("OCI_LAYOUT_PATH", str(layout))
+    target_dir = _make_target(tmp_path / "target")
+    _publish(
+        [
+            "target",
+            "-d",
+            str(target_dir),
+            "-r",
+            "ghaf/x",
+            "--primary-tag",
+            "build-1",
+            "-o",
+            str(tmp_path / "result.json"),
+        ]
+    )
+    results_dir = _make_test_results(tmp_path / "run")
+
+    _publish(["test-results", "-d", str(results_dir), "-s", "ghaf/x:build-1"])
+
+    client = oci_publish.LayoutClient(layout)
+    subject = client.resolve("ghaf/x", "build-1")["digest"]
+    (referrer,) = [
+        item
+        for item in client.referrers("ghaf/x", subject)
+        if item["artifactType"] == oci_publish.TEST_RESULTS_ARTIFACT_TYPE
+    ]
+    manifest = oci_publish.read_json(client.blob_file(referrer["digest"]))
+    blob_file = client.blob_file(manifest["layers"][0]["digest"])
+    assert oci_publish.file_digest(blob_file) == manifest["layers"][0]["digest"]
+    assert not list(blob_file.parent.glob(".stream.*"))
+
+
+@pytest.mark.parametrize(
+    "codec",
+    [
+        "gzip",
+        pytest.param(
+            "zstd",
+            marks=pytest.mark.skipif(
+                shutil.which("zstd") is None, reason="zstd is not installed"
+            ),
+        ),
+    ],
+)
+def test_compressed_writer_round_trips(codec: str, tmp_path: Path) -> None:
+    results_dir = _make_test_results(tmp_path / "run")
+    produce, layer = oci_publish.compressed_writer(
+        oci_publish.test_results_archive_writer(results_dir), codec, 1
+    )
+    assert layer.media_type.endswith(f"+{codec}")
+    plain, compressed = io.BytesIO(), io.BytesIO()
+    oci_publish.test_results_archive_writer(results_dir)(plain)
+    produce(compressed)
+
+    if codec == "gzip":
+        restored = gzip.decompress(compressed.getvalue())
+    else:
+        restored = subprocess.run(
+            ["zstd", "-d", "-c"],
+            input=compressed.getvalue(),
+            stdout=subprocess.PIPE,
+            check=True,
+        ).stdout
+    assert restored == plain.getvalue()
+    assert len(compressed.getvalue()) < len(plain.getvalue())
+
+
+def test_compressed_writer_validates_codec_level(tmp_path: Path) -> None:
+    produce = oci_publish.test_results_archive_writer(_make_test_results(tmp_path))
+    assert oci_publish.compressed_writer(produce, "none")[0] is produce
+    with pytest.raises(oci_publish.PublishError, match="not 'none'"):
+        oci_publish.compressed_writer(produce, "none", 9)
+    with pytest.raises(oci_publish.PublishError, match="between 1 and 9"):
+        oci_publish.compressed_writer(produce, "gzip", 12)
+
+
+def test_test_results_publish_with_gzip_layer(
+    registry: RegistryServer, tmp_path: Path
+) -> None:
+    target_dir = _make_target(tmp_path / "target")
+    _publish(
+        [
+            "target",
+            "-d",
+            str(target_dir),
+            "-r",
+            "ghaf/x",
+            "--primary-tag",
+            "build-1",
+            "-o",
+            str(tmp_path / "result.json"),
+        ]
+    )
+    results_dir = _make_test_results(tmp_path / "run")
+    _publish(
+        [
+            "test-results",
+            "-d",
+            str(results_dir),
+            "-s",
+            f"{registry.address}/ghaf/x:build-1",
+            "--compression",
+            "gzip",
+            "--compression-level",
+            "9",
+        ]
+    )
+
+    state = registry.state
+    subject = state.tags[("ghaf/x", "build-1")]
+    (referrer,) = [
+        item
+        for item in state.referrers("ghaf/x", subject)
+        if item["artifactType"] == oci_publish.TEST_RESULTS_ARTIFACT_TYPE
+    ]
+    manifest = json.loads(state.manifests[("ghaf/x", referrer["digest"])][0])
+    (layer,) = manifest["layers"]
+    assert layer["mediaType"] == oci_publish.TEST_RESULTS_GZIP_MEDIA_TYPE
+    assert layer["annotations"][oci_publish.TITLE_ANNOTATION] == "test-results.tar.gz"
+    with tarfile.open(fileobj=io.BytesIO(state.blobs[layer["digest"]])) as archive:
+        assert "test-results/output.xml" in archive.getnames()
+
+
+def test_oras_session_cache_skips_repeated_login(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    logins: list[list[str]] = []
+
+    def fake_run_command(args: list[str], **kwargs: Any) -> Any:
+        assert "secret" not in " ".join(args)
+        assert kwargs["stdin_text"] == "secret\n"
+        logins.append(args)
+        Path(args[args.index("--registry-config") + 1]).write_text(
+            "{}", encoding="utf-8"
+        )
+
+    monkeypatch.setattr(oci_publish, "run_command", fake_run_command)
+    monkeypatch.setenv("OCI_REGISTRY", "registry.example")
+    monkeypatch.setenv("OCI_USERNAME", "ghaf")
+    monkeypatch.setenv("OCI_PASSWORD", "secret")
+    monkeypatch.delenv("OCI_LAYOUT_PATH", raising=False)
+    cache_dir = tmp_path / "sessions"
+    options = oci_publish.ClientOptions(session_cache=cache_dir, session_ttl=60)
+
+    configs = []
+    for _ in range(2):
+        with oci_publish.oras_publish_context(options) as (publisher, _, _):
+            configs.append(publisher.common_args[1])
+    assert len(logins) == 1
+    assert configs[0] == configs[1]
+    assert cache_dir.stat().st_mode & 0o777 == 0o700
+    session_dir = Path(configs[0]).parent
+    unsalted = hashlib.sha256(b"registry.example\0ghaf\0secret").hexdigest()
+    assert session_dir.name != unsalted[:32]
+
+    stale = cache_dir / "stale"
+    stale.mkdir()
+    (stale / "config.json").write_text("{}", encoding="utf-8")
+    oci_publish.write_json_atomic(
+        stale / oci_publish.SESSION_RECORD_NAME, {"created": time.time() - 61}
+    )
+    with oci_publish.oras_publish_context(options):
+        pass
+    assert not stale.exists()
+    assert session_dir.is_dir()
+
+    clock = time.time() + 61
+    monkeypatch.setattr(oci_publish.time, "time", lambda: clock)
+    with oci_publish.oras_publish_context(options):
+        pass
+    assert len(logins) == 2
+
+
+def test_native_session_cache_skips_ping(
+    registry: RegistryServer, tmp_path: Path
+) -> None:
+    options = oci_publish.ClientOptions(session_cache=tmp_path / "sessions")
+    for _ in range(3):
+        with oci_publish.native_publish_context(options) as (publisher, _, _):
+            assert publisher.client.blob_exists("ghaf/x", "sha256:00") is False
+    assert registry.state.count("GET", "/v2/") == 1
+
+    shared = tmp_path / "shared"
+    shared.mkdir(mode=0o755)
+    shared.chmod(0o755)
+    with pytest.raises(oci_publish.PublishError, match="private"):
+        with oci_publish.native_publish_context(
+            oci_publish.ClientOptions(session_cache=shared)
+        ):
+            pass
+
+
+def test_fair_scheduler_alternates_between_jobs() -> None:
+    scheduler = oci_publish.FairScheduler(1)
+    order: list[str] = []
+    release = threading.Event()
+
+    def hold() -> None:
+        with scheduler.slot("a"):
+            release.wait()
+
+    def upload(job: str) -> None:
+        with scheduler.slot(job):
+            order.append(job)
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    waiters = []
+    for job in ("a", "a", "b", "b"):
+        waiter = threading.Thread(target=upload, args=(job,))
+        waiter.start()
+        waiters.append(waiter)
+        while sum(scheduler._waiting.values()) < len(waiters):
+            time.sleep(0.001)
+    release.set()
+    for thread in (holder, *waiters):
+        thread.join()
+
+    assert order == ["a", "b", "a", "b"]
+
+
+def test_daemon_runs_submitted_jobs(
+    registry: RegistryServer, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    target_dir = _make_target(tmp_path / "target")
+    results_dir = _make_test_results(tmp_path / "run")
+    socket_path = tmp_path / "daemon.sock"
+    parser = oci_publish.build_parser()
+
+    with oci_publish.native_publish_context() as session:
+        daemon = oci_publish.PublishDaemon(
+            session,
+            settings=oci_publish.daemon_settings(parser.parse_args(["serve"])),
+            jobs=2,
+            upload_slots=2,
+        )
+        server = oci_publish.DaemonServer(socket_path, daemon)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            assert socket_path.stat().st_mode & 0o777 == 0o600
+            target_args = parser.parse_args(
+                ["--socket", str(socket_path), "target", "-d", str(target_dir)]
+                + ["-r", "ghaf/x", "--primary-tag", "build-1", "-o", "result.json"]
+            )
+            monkeypatch.chdir(tmp_path)
+            assert oci_publish.submit_to_daemon(target_args) == 0
+            result = oci_publish.read_json(tmp_path / "result.json")
+            assert (
+                registry.state.tags[("ghaf/x", "build-1")]
+                == (result["primary"]["digest"])
+            )
+
+            results_args = parser.parse_args(
+                ["--socket", str(socket_path), "test-results", "-d", str(results_dir)]
+                + ["-s", f"{registry.address}/ghaf/x:build-1"]
+            )
+            assert oci_publish.submit_to_daemon(results_args) == 0
+            jobs = oci_publish.daemon_request(socket_path, {"action": "list"})["jobs"]
+            assert [job["status"] for job in jobs] == ["succeeded", "succeeded"]
+            assert jobs[1]["result"]["layer"]["title"] == "test-results.tar"
+
+            missing_args = parser.parse_args(
+                ["--socket", str(socket_path), "release-attestation"]
+                + ["-d", str(tmp_path / "missing"), "-s", "ghaf/x:build-1"]
+            )
+            with pytest.raises(oci_publish.PublishError, match="failed"):
+                oci_publish.submit_to_daemon(missing_args)
+        finally:
+            server.shutdown()
+            server.server_close()
+            daemon.close()
+
+    assert not socket_path.exists()
+    assert registry.state.count("GET", "/v2/") == 1
+
+
+def test_daemon_refuses_jobs_with_other_settings(
+    registry: RegistryServer, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    parser = oci_publish.build_parser()
+    socket_path = str(tmp_path / "daemon.sock")
+    for jobs_args in (["jobs"], ["jobs", "0123456789ab"]):
+        with pytest.raises(oci_publish.PublishError, match="daemon is not running"):
+            oci_publish.show_jobs(
+                parser.parse_args(["--socket", socket_path, *jobs_args])
+            )
+
+    target_args = ["target", "-d", str(tmp_path), "-r", "ghaf/x"]
+    target_args += ["--primary-tag", "build-1", "-o", "result.json"]
+    with oci_publish.native_publish_context() as session:
+        daemon = oci_publish.PublishDaemon(
+            session, settings=oci_publish.daemon_settings(parser.parse_args(["serve"]))
+        )
+        try:
+            monkeypatch.setenv("OCI_REGISTRY", "other.example")
+            with pytest.raises(oci_publish.PublishError, match="registry 'other"):
+                daemon.handle(
+                    {
+                        "action": "submit",
+                        "command": "target",
+                        "args": {},
+                        "settings": oci_publish.daemon_settings(
+                            parser.parse_args(target_args)
+                        ),
+                    }
+                )
+            monkeypatch.setenv("OCI_REGISTRY", registry.address)
+            retry_args = parser.parse_args(["--retries", "0", *target_args])
+            with pytest.raises(oci_publish.PublishError, match="retries 0"):
+                daemon.submit("target", {}, oci_publish.daemon_settings(retry_args))
+            assert not daemon.jobs()
+        finally:
+            daemon.close()
+
+
+@pytest.mark.usefixtures("registry")
+def test_target_publish_records_timing_spans_and_trace(tmp_path: Path) -> None:
+    target_dir = _make_target(tmp_path / "target")
+    result_json = tmp_path / "result.json"
+    trace_json = tmp_path / "trace.json"
+    _publish(
+        [
+            "target",
+            "-d",
+            str(target_dir),
+            "-r",
+            "ghaf/x",
+            "--primary-tag",
+            "build-1",
+            "-o",
+            str(result_json),
+            "-t",
+            "latest",
+            "--trace-json",
+            str(trace_json),
+        ]
+    )
+
+    spans = oci_publish.read_json(result_json)["spans"]
+    names = [span["name"] for span in spans]
+    assert names[0] == "publish"
+    for name in ("login", "push", "digest", "blob.upload", "manifest.put", "tag"):
+        assert name in names
+    assert names.count("referrer") == 4
+    image_upload = next(
+        span
+        for span in spans
+        if span["name"] == "blob.upload"
+        and span["attributes"]["title"] == "images/disk.raw"
+    )
+    assert image_upload["attributes"]["bytes"] == 4096
+    assert image_upload["attributes"]["throughput_bytes_per_second"] > 0
+    assert spans[0]["duration_ms"] >= max(span["duration_ms"] for span in spans[1:])
+
+    (resource,) = oci_publish.read_json(trace_json)["resourceSpans"]
+    otlp_spans = resource["scopeSpans"][0]["spans"]
+    assert len(otlp_spans) == len(spans)
+    span_ids = {span["spanId"] for span in otlp_spans}
+    assert len({span["traceId"] for span in otlp_spans}) == 1
+    assert all(
+        span.get("parentSpanId", span["spanId"]) in span_ids for span in otlp_spans
+    )
+    assert int(otlp_spans[0]["endTimeUnixNano"]) > int(
+        otlp_spans[0]["startTimeUnixNano"]
+    )
+
+
+def test_native_tags_skip_unchanged_and_run_beside_referrers(
+    registry: RegistryServer, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Both runs must render the same primary manifest, creation time included.
+    created = time.gmtime()
+    monkeypatch.setattr(time, "gmtime", lambda *_: created)
+    target_dir = _make_target(tmp_path / "target")
+    args = ["target", "-d", str(target_dir), "-r", "ghaf/x", "--primary-tag"]
+    args += ["build-1", "-t", "latest", "-t", "main-latest", "-o"]
+    _publish([*args, str(tmp_path / "first.json")])
+    first = oci_publish.read_json(tmp_path / "first.json")
+    assert first["tags_unchanged"] == []
+    state = registry.state
+    digest = first["primary"]["digest"]
+    assert state.tags[("ghaf/x", "latest")] == digest
+    assert state.tags[("ghaf/x", "main-latest")] == digest
+
+    tag_puts = state.count("PUT", "/manifests/latest") + state.count(
+        "PUT", "/manifests/main-latest"
+    )
+    _publish([*args, str(tmp_path / "second.json")])
+    second = oci_publish.read_json(tmp_path / "second.json")
+    assert second["tags_unchanged"] == ["latest", "main-latest"]
+    assert (
+        state.count("PUT", "/manifests/latest")
+        + state.count("PUT", "/manifests/main-latest")
+        == tag_puts
+    )
+
+    spans = {span["name"]: span for span in second["spans"]}
+    tag_start = spans["tag"]["start"]
+    referrers = spans["referrers"]
+    assert tag_start < referrers["start"] + referrers["duration_ms"] / 1000
+
+
+def test_incremental_republish_reuses_manifest_and_referrers(
+    registry: RegistryServer, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    target_dir = _make_target(tmp_path / "target")
+    args = ["target", "-d", str(target_dir), "-r", "ghaf/x", "--primary-tag"]
+    args += ["build-1", "-t", "latest", "--incremental", "-o"]
+    epoch, minute_later = time.gmtime(0), time.gmtime(60)
+    monkeypatch.setattr(time, "gmtime", lambda *_: epoch)
+    _publish([*args, str(tmp_path / "first.json")])
+    first = oci_publish.read_json(tmp_path / "first.json")
+    assert first["reused"]["primary"] is False
+    assert len(first["reused"]["attached"]) == 4
+
+    state = registry.state
+    manifest_puts = state.count("PUT", "/manifests/")
+    uploads = state.count("POST", "/blobs/uploads/")
+    monkeypatch.setattr(time, "gmtime", lambda *_: minute_later)
+    _publish([*args, str(tmp_path / "second.json")])
+    second = oci_publish.read_json(tmp_path / "second.json")
+    assert second["primary"]["digest"] == first["primary"]["digest"]
+    assert second["reused"] == {
+        "primary": True,
+        "referrers": list(first["referrers"]),
+        "attached": [],
+        "tags": ["latest"],
+    }
+    assert state.count("PUT", "/manifests/") == manifest_puts
+    assert state.count("POST", "/blobs/uploads/") == uploads
+    assert second["transfer"]["uploaded_blobs"] == 0
+
+    (target_dir / "attestations" / "sbom.csv").write_text("changed\n", encoding="utf-8")
+    _publish([*args, str(tmp_path / "third.json")])
+    third = oci_publish.read_json(tmp_path / "third.json")
+    assert third["reused"]["primary"] is True
+    assert third["reused"]["attached"] == ["sbom_csv"]
+    assert third["transfer"]["uploaded_blobs"] == 1
+    subject = first["primary"]["digest"]
+    assert len(state.referrers("ghaf/x", subject)) == 5
+
+
+def test_place_file_links_and_falls_back_to_copy(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    source = tmp_path / "disk.raw"
+    source.write_bytes(b"image" * 1024)
+
+    method = oci_publish.place_file(source, tmp_path / "auto")
+    assert method in ("reflink", "hardlink")
+    assert (tmp_path / "auto").read_bytes() == source.read_bytes()
+    assert oci_publish.place_file(source, tmp_path / "linked", "hardlink") == "hardlink"
+    assert (tmp_path / "linked").stat().st_ino == source.stat().st_ino
+    assert oci_publish.place_file(source, tmp_path / "copied", "copy") == "copy"
+    assert (tmp_path / "copied").stat().st_ino != source.stat().st_ino
+
+    def unsupported(*_args: Any) -> None:
+        raise OSError("not supported")
+
+    monkeypatch.setattr(oci_publish, "reflink_file", unsupported)
+    monkeypatch.setattr(oci_publish.os, "link", unsupported)
+    assert oci_publish.place_file(source, tmp_path / "fallback") == "copy"
+    assert (tmp_path / "fallback").read_bytes() == source.read_bytes()
+
+
+def test_layout_places_file_blobs_without_copying(tmp_path: Path) -> None:
+    source = tmp_path / "disk.raw"
+    source.write_bytes(b"image" * 1024)
+    client = oci_publish.LayoutClient(tmp_path / "layout", "hardlink")
+    blob = oci_publish.Blob.from_file(source, "application/octet-stream")
+    client.push_blob("ghaf/x", blob)
+    client.push_blob("ghaf/x", oci_publish.EMPTY_CONFIG)
+    assert client.blob_file(blob.digest).stat().st_ino == source.stat().st_ino
+    assert client.placements == {"hardlink": 1, "write": 1}
+
+
+def _signing_certificate(directory: Path, name: str, algorithm: list[str]) -> Path:
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", *algorithm, "-nodes", "-days", "1"]
+        + ["-subj", f"/CN={name}", "-keyout", str(directory / f"{name}.key")]
+        + ["-out", str(directory / f"{name}.pem")],
+        check=True,
+        capture_output=True,
+    )
+    return directory / f"{name}.pem"
+
+
+@pytest.mark.skipif(not shutil.which("openssl"), reason="openssl is not installed")
+def test_signature_preflight_fails_before_upload(
+    registry: RegistryServer, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    target_dir = _make_target(tmp_path / "target")
+    image_cert = _signing_certificate(
+        tmp_path, "img", ["ec", "-pkeyopt", "ec_paramgen_curve:P-256"]
+    )
+    prov_cert = _signing_certificate(tmp_path, "prov", ["ed25519"])
+    monkeypatch.setenv("IMG_CERT", str(image_cert))
+    monkeypatch.setenv("PROV_CERT", str(prov_cert))
+    image = target_dir / "images" / "disk.raw"
+    provenance = target_dir / "attestations" / "provenance.json"
+    subprocess.run(
+        ["openssl", "dgst", "-sha256", "-sign", str(tmp_path / "img.key")]
+        + ["-out", f"{image}.sig", str(image)],
+        check=True,
+    )
+    subprocess.run(
+        ["openssl", "pkeyutl", "-sign", "-rawin", "-inkey", str(tmp_path / "prov.key")]
+        + ["-in", str(provenance), "-out", f"{provenance}.sig"],
+        check=True,
+    )
+
+    args = ["target", "-d", str(target_dir), "-r", "ghaf/x", "--primary-tag"]
+    args += ["build-1", "--verify-signatures", "-o", str(tmp_path / "result.json")]
+    _publish(args)
+    result = oci_publish.read_json(tmp_path / "result.json")
+    assert [item["path"] for item in result["verification"]] == [
+        "images/disk.raw",
+        "attestations/provenance.json",
+    ]
+    cache = oci_publish.DigestCache(
+        oci_publish.state_file(target_dir, oci_publish.DIGEST_CACHE_NAME)
+    )
+    assert cache.lookup(image, oci_publish.file_identity(image))
+    assert not list(target_dir.glob(".*"))
+
+    provenance.write_text("tampered\n", encoding="utf-8")
+    uploads = registry.state.count("POST", "/blobs/uploads/")
+    with pytest.raises(oci_publish.PublishError, match="provenance.json"):
+        _publish(args)
+    assert registry.state.count("POST", "/blobs/uploads/") == uploads
+
+
+def test_target_model_indexes_images_and_sysupdate_files(tmp_path: Path) -> None:
+    parts = [f"images/root.raw.{index:03}" for index in range(3)]
+    images = [
+        {"path": path, "role": "root-part", "signature": {"path": f"{path}.sig"}}
+        for path in parts
+    ]
+    images += [
+        {"path": "images/ghaf.manifest", "role": "sysupdate-manifest"},
+        {"path": "images/ghaf.efi", "signature": {"path": "images/ghaf.efi.sig"}},
+        {"path": "images/root.raw"},
+        {"path": "images/verity.raw", "signature": {"path": None}},
+    ]
+    oci_publish.write_json(
+        tmp_path / "images" / "ghaf.manifest",
+        {
+            "version": "1.0",
+            "kernel": {"file": "ghaf.efi"},
+            "root": {"file": "root.raw"},
+            "verity": {"file": "verity.raw"},
+        },
+    )
+    target = oci_publish.TargetModel(tmp_path, {"target": "x1", "images": images})
+
+    assert [image.path for image in target.images_by_role["root-part"]] == parts
+    assert target.images_by_name["root.raw.001"].path == parts[1]
+    sysupdate = target.sysupdate
+    assert sysupdate.manifest_path == "images/ghaf.manifest"
+    assert [(item["role"], item.get("signature_path")) for item in sysupdate.files] == [
+        ("kernel", "images/ghaf.efi.sig"),
+        ("root", None),
+        ("verity", None),
+    ]
+    assert target.sysupdate is sysupdate
+
+    oci_publish.write_json(
+        tmp_path / "images" / "ghaf.manifest", {"kernel": {"file": "ghaf.efi"}}
+    )
+    incomplete = oci_publish.TargetModel(tmp_path, {"target": "x1", "images": images})
+    with pytest.raises(
+        oci_publish.PublishError, match=f"in {tmp_path} has no 'root.file' entry"
+    ):
+        _ = incomplete.sysupdate
+
+    with pytest.raises(oci_publish.PublishError, match="no path"):
+        _ = oci_publish.TargetModel(tmp_path, {"images": [{"role": "x"}]}).images
+    with pytest.raises(oci_publish.PublishError, match="no sysupdate manifest"):
+        _ = oci_publish.TargetModel(
+            tmp_path, {"target": "x1", "images": images[:3]}
+        ).sysupdate
+
+
+def _make_sysupdate_target(target_dir: Path, root: bytes) -> Path:
+    (target_dir / "images").mkdir(parents=True, exist_ok=True)
+    files = {"ghaf.efi": b"kernel", "root.raw": root, "verity.raw": b"verity"}
+    for name, data in files.items():
+        (target_dir / "images" / name).write_bytes(data)
+    oci_publish.write_json(
+        target_dir / "images" / "ghaf.manifest",
+        {
+            "version": "1.0",
+            "kernel": {"file": "ghaf.efi"},
+            "root": {"file": "root.raw"},
+            "verity": {"file": "verity.raw"},
+        },
+    )
+    images = [{"path": "images/ghaf.manifest", "role": "sysupdate-manifest"}]
+    images += [{"path": f"images/{name}"} for name in files]
+    oci_publish.write_json(
+        target_dir / "manifest.json", {"target": "x1", "images": images}
+    )
+    return target_dir
+
+
+def test_chunked_root_uploads_changed_chunks_and_reassembles(
+    registry: RegistryServer, tmp_path: Path
+) -> None:
+    block = oci_publish.ROOT_CHUNK_BLOCK_SIZE
+    root = random.Random(0).randbytes(512 * block)
+    target_dir = _make_sysupdate_target(tmp_path / "target", root)
+    args = ["target", "--sysupdate", "--root-chunk-size", "64K", "-d"]
+    args += [str(target_dir), "-r", "ghaf/ota", "-o", str(tmp_path / "result.json")]
+    _publish([*args, "--primary-tag", "v1"])
+    first = oci_publish.read_json(tmp_path / "result.json")
+    assert first["transfer"]["uploaded_bytes"] > len(root)
+
+    # Insert three blocks and rewrite one: only chunks around both change.
+    updated = bytearray(root)
+    updated[100 * block : 100 * block] = b"\1" * (3 * block)
+    updated[-10 * block : -9 * block] = b"\2" * block
+    (target_dir / "images" / "root.raw").write_bytes(updated)
+    _publish([*args, "--primary-tag", "v2"])
+    second = oci_publish.read_json(tmp_path / "result.json")
+    assert second["sysupdate"]["root_chunk_size"] == 64 * 1024
+    assert second["transfer"]["uploaded_bytes"] < len(updated) // 4
+
+    reference = f"{registry.address}/ghaf/ota:v2"
+    _publish(["reassemble", "-s", reference, "-o", str(tmp_path / "root.raw")])
+    assert (tmp_path / "root.raw").read_bytes() == bytes(updated)
+
+    manifest = json.loads(
+        registry.state.manifests[("ghaf/ota", second["primary"]["digest"])][0]
+    )
+    root_file = next(
+        file for file in second["sysupdate"]["files"] if file["role"] == "root"
+    )
+    assert root_file["media_type"] == oci_publish.SYSUPDATE_ROOT_INDEX_MEDIA_TYPE
+    index_layer, *chunk_layers = root_file["layers"]
+    assert index_layer["annotations"][oci_publish.TITLE_ANNOTATION] == (
+        "images/root.raw.chunks.json"
+    )
+    assert chunk_layers == [
+        layer
+        for layer in manifest["layers"]
+        if layer["mediaType"] == oci_publish.SYSUPDATE_ROOT_CHUNK_MEDIA_TYPE
+    ]
+    chunk = next(
+        layer
+        for layer in manifest["layers"]
+        if layer["mediaType"] == oci_publish.SYSUPDATE_ROOT_CHUNK_MEDIA_TYPE
+    )
+    registry.state.blobs[chunk["digest"]] = b"corrupt"
+    with pytest.raises(oci_publish.PublishError, match="does not match"):
+        _publish(["reassemble", "-s", reference])